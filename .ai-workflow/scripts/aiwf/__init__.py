@@ -0,0 +1,5 @@
+"""
+aiwf - Shared helpers for the AI workflow scripts
+The entry-point scripts live next to this package in scripts/ and import
+from it directly (their own directory is always first on sys.path).
+"""
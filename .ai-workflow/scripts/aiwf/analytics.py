@@ -0,0 +1,243 @@
+"""
+Audit Analytics - Counters over audit.log, kept in audit-logs/audit-summary.json
+Used by audit-stats.py
+
+update() reads only the bytes appended to audit.log since the offset saved
+with the counters. The first and last 4 KiB read so far are checksummed:
+when they no longer match, the log was rotated, and the rest of the old
+log is read from the newest archive (audit.log.N.gz) that still matches
+before starting over on the new file. Only complete lines are consumed.
+
+The counters live under "log" in the summary: totals and per-day counts by
+status, per-source counts, findings per rule and a latency histogram per
+source. Queries read them without touching the log. Legacy free-form
+"[time] [STATUS] [target] details" lines are counted by day and status.
+"""
+import hashlib
+import json
+import math
+import re
+from bisect import bisect_left
+from datetime import datetime
+
+from aiwf.auditlog import AUDIT_LOG, archive_path
+from aiwf.summary import SUMMARY_FILE, load_summary, save_summary, summary_lock
+
+# Bump when the counter layout changes (counters are rebuilt from offset 0)
+STATS_FORMAT = 1
+
+# Leading and trailing bytes checksummed to recognize the log after rotation
+HEAD_BYTES = 4096
+
+READ_SIZE = 1 << 20
+
+# Upper bounds of the latency histogram buckets, in ms (plus one overflow bucket)
+LATENCY_BUCKETS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+# Archives searched for the rest of a rotated log
+MAX_ARCHIVES = 20
+
+LEGACY_LINE = re.compile(r'^\[(\d{4}-\d\d-\d\d)[^\]]*\] \[(\w+)\] \[([^\]]*)\]')
+
+FAILING = ("FAIL",)
+
+def empty_stats() -> dict:
+    return {
+        "format": STATS_FORMAT,
+        "offset": 0,
+        "head": None,
+        "tail": None,
+        "records": 0,
+        "skipped": 0,
+        "first": None,
+        "last": None,
+        "totals": {},
+        "days": {},
+        "sources": {},
+        "rules": {},
+        "latency_buckets": LATENCY_BUCKETS,
+        "latency": {},
+    }
+
+def _bump(counts: dict, key: str, n: int = 1):
+    counts[key] = counts.get(key, 0) + n
+
+def _head(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+class Aggregator:
+    """Folds log lines into a stats dict (empty_stats() layout)."""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def line(self, raw: bytes):
+        stats = self.stats
+        text = raw.decode("utf-8", errors="replace").strip()
+        if not text:
+            return
+        record = None
+        if text.startswith("{"):
+            try:
+                record = json.loads(text)
+            except ValueError:
+                pass
+        if isinstance(record, dict) and isinstance(record.get("ts"), str):
+            ts = record["ts"]
+            status = str(record.get("status") or "?")
+            source = str(record.get("source") or "?")
+        else:
+            match = LEGACY_LINE.match(text)
+            if not match:
+                stats["skipped"] += 1
+                return
+            ts, status, source = match.group(1), match.group(2), "legacy"
+            record = {}
+
+        stats["records"] += 1
+        if stats["first"] is None or ts < stats["first"]:
+            stats["first"] = ts
+        if stats["last"] is None or ts > stats["last"]:
+            stats["last"] = ts
+        _bump(stats["totals"], status)
+        _bump(stats["days"].setdefault(ts[:10], {}), status)
+        _bump(stats["sources"].setdefault(source, {}), status)
+
+        rules = record.get("rules")
+        if isinstance(rules, dict):
+            for rule, n in rules.items():
+                if isinstance(n, int):
+                    _bump(stats["rules"], rule, n)
+        ms = record.get("ms")
+        if isinstance(ms, (int, float)):
+            histogram = stats["latency"].setdefault(source, [0] * (len(LATENCY_BUCKETS) + 1))
+            histogram[bisect_left(LATENCY_BUCKETS, ms)] += 1
+
+    def feed(self, f, complete: bool = False) -> int:
+        """
+        Fold the lines of f from its current position; returns the bytes
+        consumed. Without complete, a trailing line with no newline is left
+        for the next update.
+        """
+        consumed = 0
+        carry = b""
+        while True:
+            chunk = f.read(READ_SIZE)
+            if not chunk:
+                break
+            lines = (carry + chunk).split(b"\n")
+            carry = lines.pop()
+            for raw in lines:
+                self.line(raw)
+                consumed += len(raw) + 1
+        if complete and carry:
+            self.line(carry)
+            consumed += len(carry)
+        return consumed
+
+def _checksums(f, offset: int):
+    """Checksums of the first and the last HEAD_BYTES of f[:offset] (None if f is shorter)."""
+    f.seek(0)
+    head = f.read(min(offset, HEAD_BYTES))
+    start = max(0, offset - HEAD_BYTES)
+    f.seek(start)
+    tail = f.read(offset - start)
+    if len(tail) < offset - start:
+        return None
+    return _head(head), _head(tail)
+
+def _same_log(f, stats: dict) -> bool:
+    return _checksums(f, stats["offset"]) == (stats["head"], stats["tail"])
+
+def _rotated_rest(stats: dict, log_path, aggregator: Aggregator) -> bool:
+    """
+    Fold what was appended to the log before it was rotated away, from the
+    newest archive whose head matches, then every newer archive. Returns
+    False if no archive matches (the rest of the old log is lost).
+    """
+    import gzip
+
+    for n in range(1, MAX_ARCHIVES + 1):
+        path = archive_path(log_path, n)
+        try:
+            with gzip.open(path, "rb") as f:
+                if not _same_log(f, stats):
+                    continue
+                f.seek(stats["offset"])
+                aggregator.feed(f, complete=True)
+        except (OSError, EOFError):
+            continue
+        for newer in range(n - 1, 0, -1):
+            try:
+                with gzip.open(archive_path(log_path, newer), "rb") as f:
+                    aggregator.feed(f, complete=True)
+            except (OSError, EOFError):
+                pass
+        return True
+    return False
+
+def update_stats(stats: dict, log_path=AUDIT_LOG) -> dict:
+    """Bring stats up to date with log_path (in place); returns stats."""
+    if stats.get("format") != STATS_FORMAT:
+        stats.clear()
+        stats.update(empty_stats())
+    aggregator = Aggregator(stats)
+    try:
+        f = open(log_path, "rb")
+    except FileNotFoundError:
+        return stats
+    with f:
+        offset = stats["offset"]
+        if offset and not _same_log(f, stats):
+            _rotated_rest(stats, log_path, aggregator)
+            offset = 0
+        f.seek(offset)
+        offset += aggregator.feed(f)
+        stats["offset"] = offset
+        stats["head"], stats["tail"] = _checksums(f, offset)
+    stats["updated"] = datetime.now().isoformat()
+    return stats
+
+def update(log_path=AUDIT_LOG, path=SUMMARY_FILE) -> dict:
+    """Fold new audit.log lines into the summary's "log" counters and save them."""
+    with summary_lock(path):
+        data = load_summary(path)
+        stats = data.get("log")
+        if not isinstance(stats, dict):
+            stats = {}
+        before = (stats.get("offset"), stats.get("tail"), stats.get("records"))
+        update_stats(stats, log_path)
+        data["log"] = stats
+        if (stats["offset"], stats["tail"], stats["records"]) != before:
+            save_summary(data, path)
+    return stats
+
+def load_stats(path=SUMMARY_FILE) -> dict:
+    stats = load_summary(path).get("log")
+    return stats if isinstance(stats, dict) and stats.get("format") == STATS_FORMAT else empty_stats()
+
+def fail_rates(stats: dict, days: int = None) -> list:
+    """(day, failures, audits, rate) per day, oldest first; SKIP and SYNC records don't count."""
+    rows = []
+    for day in sorted(stats["days"])[-days if days else None:]:
+        counts = stats["days"][day]
+        audits = sum(n for status, n in counts.items() if status in ("PASS", "WARN", "FAIL"))
+        failures = sum(counts.get(status, 0) for status in FAILING)
+        rows.append((day, failures, audits, failures / audits if audits else 0.0))
+    return rows
+
+def top_rules(stats: dict, n: int = 10) -> list:
+    return sorted(stats["rules"].items(), key=lambda item: (-item[1], item[0]))[:n]
+
+def percentile(histogram: list, p: float, buckets: list = LATENCY_BUCKETS):
+    """Upper bound (ms) of the bucket holding the p-th percentile (inf past the last bucket, None if empty)."""
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = p / 100 * total
+    seen = 0
+    for bound, n in zip(buckets + [math.inf], histogram):
+        seen += n
+        if seen >= rank:
+            return bound
+    return math.inf
@@ -0,0 +1,257 @@
+"""
+Audit Server - Long-running file auditor on a local Unix socket
+Used by audit-server.py (server side) and audit-file.py --server (client side)
+
+The server compiles the rules once and keeps results for unchanged files
+(same mtime and size), so a save costs a socket round-trip instead of a
+fresh interpreter and regex compile. It also remembers each file's last
+scanned version, so an edited file only has its changed lines rescanned.
+
+The socket lives in a per-user 0700 directory ($XDG_RUNTIME_DIR/aiwf, or
+/tmp/aiwf-<uid>) and is bound under umask 077. Before sending anything the
+client checks that the socket and the process behind it belong to the same
+user, so file contents never go to someone else's listener.
+
+Protocol: one JSON object per line in each direction.
+  {"op": "audit", "cwd": "...", "paths": [...]}  -> {"results": [[issues, error], ...]}
+  {"op": "stats"}                                  -> {"requests": n, "cache_hits": n, ...}
+  {"op": "shutdown"}                               -> {"ok": true}
+"""
+import hashlib
+import json
+import os
+import socket
+import stat
+import struct
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Optional
+
+from aiwf.paths import CONTEXT_DIR
+
+PID_FILE = CONTEXT_DIR / ".audit-server.pid"
+
+# Per-file results kept in memory, and latencies kept for p50/p99
+CACHE_SIZE = 4096
+LATENCY_WINDOW = 2048
+
+def runtime_dir() -> Path:
+    """Per-user directory for the socket ($XDG_RUNTIME_DIR/aiwf or /tmp/aiwf-<uid>)."""
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if base and os.path.isdir(base):
+        return Path(base) / "aiwf"
+    return Path("/tmp") / f"aiwf-{os.getuid()}"
+
+def socket_path() -> Path:
+    """AUDIT_SERVER_SOCKET, or a per-project socket in the runtime dir."""
+    override = os.environ.get("AUDIT_SERVER_SOCKET")
+    if override:
+        return Path(override)
+    digest = hashlib.sha1(str(CONTEXT_DIR.resolve()).encode()).hexdigest()[:12]
+    return runtime_dir() / f"audit-{digest}.sock"
+
+def private_dir(path: Path):
+    """Create path as a 0700 directory; refuse one that someone else owns or can enter."""
+    old_umask = os.umask(0o077)
+    try:
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    finally:
+        os.umask(old_umask)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise RuntimeError(f"{path} must be a directory owned by you with mode 0700")
+
+def peer_uid(sock: socket.socket) -> Optional[int]:
+    """uid of the process at the other end (Linux SO_PEERCRED); None where unsupported."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", creds)[1]
+
+def owned_socket(path: Path) -> bool:
+    """True if path is a socket file owned by the current user."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+def request(payload: dict, path: Optional[Path] = None, timeout: float = 2.0) -> Optional[dict]:
+    """
+    Send one request to the server; returns its reply, or None if no server
+    answers (or the socket or its server belongs to another user).
+    """
+    path = path or socket_path()
+    if not owned_socket(path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(path))
+            uid = peer_uid(sock)
+            if uid is not None and uid != os.getuid():
+                return None
+            sock.sendall(json.dumps(payload).encode() + b"\n")
+            data = b""
+            while not data.endswith(b"\n"):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+        return json.loads(data)
+    except (OSError, ValueError):
+        return None
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[int(round(fraction * (len(sorted_values) - 1)))]
+
+class AuditServer:
+    """Accepts audit requests and answers them from a warm rule engine."""
+
+    def __init__(self, path: Path, scan=None, cache_size: int = CACHE_SIZE):
+        self.incremental = None
+        if scan is None:
+            from aiwf.fileaudit import IncrementalScanner, scan_file
+            self.incremental = IncrementalScanner()
+            scan = lambda path, name: scan_file(path, name, self.incremental)
+        self.path = Path(path)
+        self.scan = scan
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # abs path -> ((mtime_ns, size, name), result)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.started = time.time()
+        self.running = False
+        self.sock = None
+
+    # ── Auditing ──
+
+    def audit_path(self, path: str, name: str):
+        """Audit one file, reusing the last result while it is unchanged."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return [None, None]
+        key = (st.st_mtime_ns, st.st_size, name)
+
+        with self.lock:
+            entry = self.cache.get(path)
+            if entry is not None and entry[0] == key:
+                self.cache.move_to_end(path)
+                self.cache_hits += 1
+                return entry[1]
+            self.cache_misses += 1
+
+        result = list(self.scan(path, name))
+        with self.lock:
+            self.cache[path] = (key, result)
+            self.cache.move_to_end(path)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return result
+
+    def stats(self) -> dict:
+        incremental = self.incremental.stats() if self.incremental is not None else {}
+        with self.lock:
+            window = sorted(self.latencies)
+            return {
+                "lines_scanned": incremental.get("lines_scanned", 0),
+                "lines_reused": incremental.get("lines_reused", 0),
+                "requests": self.requests,
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "cached_files": len(self.cache),
+                "p50_ms": round(percentile(window, 0.50) * 1000, 3),
+                "p99_ms": round(percentile(window, 0.99) * 1000, 3),
+                "uptime_s": round(time.time() - self.started, 1),
+                "pid": os.getpid(),
+            }
+
+    def handle(self, message: dict) -> dict:
+        op = message.get("op")
+        if op == "audit":
+            started = time.perf_counter()
+            cwd = message.get("cwd") or os.getcwd()
+            results = [
+                self.audit_path(os.path.join(cwd, name), name)
+                for name in message.get("paths", [])
+            ]
+            with self.lock:
+                self.requests += 1
+                self.latencies.append(time.perf_counter() - started)
+            return {"results": results}
+        if op == "stats":
+            return self.stats()
+        if op == "shutdown":
+            self.running = False
+            return {"ok": True}
+        return {"error": f"unknown op: {op}"}
+
+    # ── Socket handling ──
+
+    def _serve_client(self, conn):
+        uid = peer_uid(conn)
+        if uid is not None and uid != os.getuid():
+            conn.close()
+            return
+        with conn, conn.makefile("rb") as reader:
+            for line in reader:
+                try:
+                    reply = self.handle(json.loads(line))
+                except ValueError as e:
+                    reply = {"error": str(e)}
+                conn.sendall(json.dumps(reply).encode() + b"\n")
+                if not self.running:
+                    # Wake the accept loop so it notices the shutdown
+                    request({"op": "stats"}, self.path, timeout=0.2)
+                    break
+
+    def _claim_socket(self):
+        """Remove a stale socket file; refuse to start if a server already answers."""
+        if self.path.parent == runtime_dir():
+            private_dir(self.path.parent)
+        if os.path.lexists(self.path):
+            if request({"op": "stats"}, self.path, timeout=0.5) is not None:
+                raise RuntimeError(f"audit server already listening on {self.path}")
+            self.path.unlink()
+
+    def serve_forever(self):
+        self._claim_socket()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Created 0600: no window where another user could connect
+        old_umask = os.umask(0o077)
+        try:
+            self.sock.bind(str(self.path))
+        finally:
+            os.umask(old_umask)
+        self.sock.listen(16)
+        self.running = True
+        try:
+            PID_FILE.write_text(f"{os.getpid()}\n")
+        except OSError:
+            pass
+
+        try:
+            while self.running:
+                conn, _ = self.sock.accept()
+                threading.Thread(target=self._serve_client, args=(conn,), daemon=True).start()
+        finally:
+            self.close()
+
+    def close(self):
+        self.running = False
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        for path in (self.path, PID_FILE):
+            try:
+                path.unlink()
+            except OSError:
+                pass
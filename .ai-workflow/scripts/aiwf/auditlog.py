@@ -0,0 +1,173 @@
+"""
+Audit Log - Shared, size-bounded writer for context/audit.log
+Used by local-audit.py, prompt-audit.py and context-sync.py
+
+Records are JSON lines ({"ts", "status", "source", "target", "details",
+"pid"}). A process buffers its records and appends them in one write:
+when AUDIT_LOG_BATCH records are pending, when the oldest is
+AUDIT_LOG_FLUSH_SECS old (a timer flushes an idle batch), at exit, and on
+SIGTERM or SIGINT before the previous handler runs; the exit and signal
+hooks go in on the first log_event(), not at import. Appends and rotation
+happen under an advisory lock (context/.audit-log.lock), so the watcher,
+hooks and inject never interleave or rotate under each other; shell
+scripts log through this writer too (post-push.sh runs log_event). Once audit.log passes
+AUDIT_LOG_MAX_BYTES it is gzipped to audit.log.1.gz, and the
+AUDIT_LOG_KEEP newest archives are kept. Logging never fails the caller.
+"""
+import atexit
+import json
+import os
+import signal
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are unlocked
+    fcntl = None
+
+from aiwf.paths import CONTEXT_DIR
+
+AUDIT_LOG = CONTEXT_DIR / "audit.log"
+LOCK_FILE = CONTEXT_DIR / ".audit-log.lock"
+
+MAX_BYTES = int(os.environ.get("AUDIT_LOG_MAX_BYTES", 4 * 1024 * 1024))
+KEEP = int(os.environ.get("AUDIT_LOG_KEEP", 5))
+BATCH = int(os.environ.get("AUDIT_LOG_BATCH", 64))
+FLUSH_SECS = float(os.environ.get("AUDIT_LOG_FLUSH_SECS", 2.0))
+
+def archive_path(path, n: int):
+    return path.with_name(f"{path.name}.{n}.gz")
+
+def rotate(path=AUDIT_LOG, keep: int = KEEP):
+    """audit.log -> audit.log.1.gz, shifting older archives up and dropping the oldest."""
+    import gzip
+    import shutil
+
+    for n in range(keep, 0, -1):
+        src = archive_path(path, n)
+        if not src.exists():
+            continue
+        if n == keep:
+            src.unlink()
+        else:
+            os.replace(src, archive_path(path, n + 1))
+    if keep < 1:
+        path.unlink()
+        return
+    tmp = path.with_name(path.name + f".{os.getpid()}.gz")
+    with open(path, "rb") as src, gzip.open(tmp, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp, archive_path(path, 1))
+    path.unlink()
+
+class AuditLog:
+    """Buffered JSON-lines appender; one per process is enough (see audit_log)."""
+
+    def __init__(self, path=AUDIT_LOG, lock_path=LOCK_FILE, max_bytes: int = MAX_BYTES,
+                 keep: int = KEEP, batch: int = BATCH, flush_secs: float = FLUSH_SECS):
+        self.path = path
+        self.lock_path = lock_path
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.batch = batch
+        self.flush_secs = flush_secs
+        self._pending = []
+        self._first_pending = 0.0
+        self._timer = None
+        self._lock = threading.RLock()  # The signal handler's flush can interrupt write()
+
+    def write(self, status: str, source: str, target: str = "", details: str = "", **extra):
+        record = {
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "status": status,
+            "source": source,
+            "target": target,
+            "details": details,
+            "pid": os.getpid(),
+        }
+        record.update(extra)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if not self._pending:
+                self._first_pending = time.monotonic()
+            self._pending.append(line)
+            due = (len(self._pending) >= self.batch
+                   or time.monotonic() - self._first_pending >= self.flush_secs)
+            if not due and self._timer is None:
+                # Flush a batch nothing else gets written after
+                self._timer = threading.Timer(self.flush_secs, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Append the pending records in one locked write, rotating first if the log is full."""
+        with self._lock:
+            if self._timer is not None:
+                if self._timer is not threading.current_thread():
+                    self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            data = "".join(self._pending).encode("utf-8")
+            self._pending = []
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.lock_path, "a") as lock:
+                    if fcntl is not None:
+                        fcntl.flock(lock, fcntl.LOCK_EX)
+                    try:
+                        size = self.path.stat().st_size
+                    except FileNotFoundError:
+                        size = 0
+                    if size and size + len(data) > self.max_bytes:
+                        rotate(self.path, self.keep)
+                    with open(self.path, "ab") as f:
+                        f.write(data)
+            except OSError:
+                pass  # Don't fail the caller if logging fails
+
+audit_log = AuditLog()
+
+# "atexit" and "signals" once installed (or declined), so each happens at most once
+_exit_hooks = set()
+_previous_handlers = {}
+
+def _flush_on_signal(signum, frame):
+    """Flush, then do what the signal did before: the old handler, or die of it."""
+    audit_log.flush()
+    previous = _previous_handlers.get(signum)
+    if callable(previous):
+        previous(signum, frame)
+    elif previous != signal.SIG_IGN:
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
+
+def install_exit_hooks(signals: bool = True):
+    """
+    Flush audit_log at exit and on SIGTERM/SIGINT. log_event calls this on
+    first use, so importing the module leaves the process alone. A process
+    with its own signal handling calls install_exit_hooks(signals=False)
+    before logging; handlers can only be set from the main thread.
+    """
+    if "atexit" not in _exit_hooks:
+        _exit_hooks.add("atexit")
+        atexit.register(audit_log.flush)
+    if "signals" in _exit_hooks or threading.current_thread() is not threading.main_thread():
+        return
+    _exit_hooks.add("signals")
+    if not signals:
+        return
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        _previous_handlers[signum] = signal.getsignal(signum)
+        if _previous_handlers[signum] != signal.SIG_IGN:
+            signal.signal(signum, _flush_on_signal)
+
+def log_event(status: str, source: str, target: str = "", details: str = "", **extra):
+    """Queue one record on the process-wide log."""
+    if "signals" not in _exit_hooks:
+        install_exit_hooks()
+    audit_log.write(status, source, target, details, **extra)
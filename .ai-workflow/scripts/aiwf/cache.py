@@ -0,0 +1,204 @@
+"""
+Findings Cache - Raw rule hits keyed by git blob SHA and rule-set version
+Shared by audit-file.py, audit-server.py and local-audit.py (commit and pre-push)
+
+A blob SHA names exact file content, so the watcher, the pre-commit hook and
+the pre-push check can all reuse one scan of the same content. Entries live
+in an SQLite file under context/ (safe for concurrent processes) and are
+evicted least-recently-used once the store grows past AUDIT_CACHE_MAX_BYTES.
+Set AUDIT_CACHE=0 to bypass it.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from aiwf.paths import CONTEXT_DIR
+
+CACHE_FILE = CONTEXT_DIR / ".audit-cache.db"
+MAX_BYTES = int(os.environ.get("AUDIT_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+
+# After eviction the store is trimmed to this fraction of MAX_BYTES
+EVICT_TO = 0.8
+
+def blob_sha(data: bytes) -> str:
+    """Same id `git hash-object` gives this content (without filters)."""
+    sha = hashlib.sha1(b"blob %d\0" % len(data))
+    sha.update(data)
+    return sha.hexdigest()
+
+def cache_enabled() -> bool:
+    return os.environ.get("AUDIT_CACHE", "1").lower() not in ("0", "false", "no")
+
+class FindingsCache:
+    """
+    Lookups are read-only; new entries, LRU touches and hit/miss counters
+    are written in one transaction by flush(). Any SQLite error turns the
+    cache into a no-op rather than failing an audit.
+    """
+
+    def __init__(self, path=CACHE_FILE, max_bytes: int = MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._touched = set()
+        self._pending = {}
+        self._db = None
+        self._broken = False
+        self._lock = threading.RLock()  # audit-server.py shares one instance across threads
+
+    def _conn(self) -> Optional[sqlite3.Connection]:
+        if self._db is None and not self._broken:
+            try:
+                db = sqlite3.connect(str(self.path), timeout=2.0, check_same_thread=False)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS hits ("
+                    " blob TEXT, version TEXT, data TEXT, size INTEGER, last_used REAL,"
+                    " PRIMARY KEY (blob, version))"
+                )
+                db.execute("CREATE INDEX IF NOT EXISTS hits_lru ON hits (last_used)")
+                db.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)")
+                db.commit()
+                self._db = db
+            except sqlite3.Error:
+                self._broken = True
+        return self._db
+
+    def get(self, blob: str, version: str) -> Optional[list]:
+        """Cached raw hits for this content, or None."""
+        with self._lock:
+            return self._get(blob, version)
+
+    def _get(self, blob: str, version: str) -> Optional[list]:
+        key = (blob, version)
+        if key in self._pending:
+            self.hits += 1
+            return self._pending[key]
+        db = self._conn()
+        row = None
+        if db is not None:
+            try:
+                row = db.execute(
+                    "SELECT data FROM hits WHERE blob = ? AND version = ?", key
+                ).fetchone()
+            except sqlite3.Error:
+                row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched.add(key)
+        return json.loads(row[0])
+
+    def put(self, blob: str, version: str, hits: list):
+        with self._lock:
+            self._pending[(blob, version)] = hits
+
+    def flush(self):
+        """Write pending entries, LRU touches and counters; evict if over budget."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        db = self._conn()
+        if db is None or not (self._pending or self._touched or self.hits or self.misses):
+            return
+        now = time.time()
+        try:
+            with db:
+                for (blob, version), hits in self._pending.items():
+                    data = json.dumps(hits, separators=(",", ":"))
+                    db.execute(
+                        "INSERT OR REPLACE INTO hits VALUES (?, ?, ?, ?, ?)",
+                        (blob, version, data, len(data), now),
+                    )
+                db.executemany(
+                    "UPDATE hits SET last_used = ? WHERE blob = ? AND version = ?",
+                    [(now, blob, version) for blob, version in self._touched],
+                )
+                for name, value in (("hits", self.hits), ("misses", self.misses)):
+                    db.execute(
+                        "INSERT INTO counters VALUES (?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                        (name, value),
+                    )
+                if self._pending:
+                    self._evict(db)
+        except sqlite3.Error:
+            pass
+        self._pending.clear()
+        self._touched.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM hits").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICT_TO
+        evicted = 0
+        for blob, version, size in db.execute(
+            "SELECT blob, version, size FROM hits ORDER BY last_used"
+        ).fetchall():
+            if total <= target:
+                break
+            db.execute("DELETE FROM hits WHERE blob = ? AND version = ?", (blob, version))
+            total -= size
+            evicted += 1
+        db.execute(
+            "INSERT INTO counters VALUES ('evictions', ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (evicted,),
+        )
+
+    def stats(self) -> dict:
+        """Persistent counters plus current store size."""
+        self.flush()
+        db = self._conn()
+        if db is None:
+            return {}
+        counters = dict(db.execute("SELECT name, value FROM counters").fetchall())
+        entries, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM hits").fetchone()
+        lookups = counters.get("hits", 0) + counters.get("misses", 0)
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "hit_rate": round(counters.get("hits", 0) / lookups, 3) if lookups else 0.0,
+            "evictions": counters.get("evictions", 0),
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        db = self._conn()
+        if db is None:
+            return
+        with db:
+            db.execute("DELETE FROM hits")
+            db.execute("DELETE FROM counters")
+
+    def close(self):
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+_shared = None
+_shared_pid = None
+
+def shared_cache() -> Optional[FindingsCache]:
+    """Process-wide cache instance, or None when AUDIT_CACHE=0."""
+    global _shared, _shared_pid
+    if not cache_enabled():
+        return None
+    # SQLite handles must not cross fork() into pool workers
+    if _shared is None or _shared_pid != os.getpid():
+        _shared = FindingsCache()
+        _shared_pid = os.getpid()
+    return _shared
@@ -0,0 +1,204 @@
+"""
+Diff Streaming - Incremental reader for unified diffs from git
+Used by local-audit.py so staged diffs never have to fit in memory
+
+Lines are read from git's stdout as they arrive. `diff --git`, `+++` and
+`@@` hunk headers are tracked along the way, so every added line comes out
+attributed to its path and its line number in the new file. `--numstat`
+gives the per-file line counts up front, so files can be left out of the
+diff before git produces it.
+"""
+import re
+import subprocess
+from typing import Collection, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+HUNK_HEADER = re.compile(r'^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+INDEX_HEADER = re.compile(r'^index ([0-9a-f]+)\.\.([0-9a-f]+)')
+NULL_SHA = re.compile(r'^0+$')
+
+# Options every audited diff is produced with (--full-index gives whole blob SHAs)
+DIFF_OPTIONS = ["--no-color", "--no-ext-diff", "--full-index"]
+
+# Backslash escapes git uses when it quotes a path (besides \NNN octal bytes)
+C_ESCAPES = {"a": 7, "b": 8, "t": 9, "n": 10, "v": 11, "f": 12, "r": 13, '"': 34, "\\": 92}
+OCTAL_DIGITS = "01234567"
+
+# More excluded paths than this are dropped while reading instead (command line length)
+MAX_EXCLUDES = 256
+
+class NumStat(NamedTuple):
+    """One `git diff --numstat` row."""
+    path: str  # New path (renames and copies included)
+    added: Optional[int]  # None for binary files
+    deleted: Optional[int]
+
+class DiffFile(NamedTuple):
+    """Header facts for one file in a diff."""
+    path: str
+    blob: Optional[str]  # New blob SHA (None if unknown, e.g. mode-only change)
+    is_new: bool
+
+def stream_git(args: List[str], cwd=None) -> Iterator[str]:
+    """
+    Yield git's stdout line by line (without trailing newlines).
+    Raises CalledProcessError once the output is exhausted if git failed.
+    """
+    proc = subprocess.Popen(
+        ["git"] + args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        cwd=cwd,
+    )
+    try:
+        # Binary mode: only '\n' ends a line (text mode would also split on '\r')
+        for raw in proc.stdout:
+            yield raw.decode("utf-8", errors="replace").rstrip('\n')
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, ["git"] + args)
+
+def exclude_pathspecs(paths: Collection[str]) -> List[str]:
+    """Pathspecs leaving repo-relative paths out of a diff ([] if there are too many)."""
+    if len(paths) > MAX_EXCLUDES:
+        return []
+    return [f":(top,exclude,literal){path}" for path in sorted(paths)]
+
+def stream_staged_diff(cwd=None, exclude: Collection[str] = ()) -> Iterator[str]:
+    """Yield the lines of `git diff --staged` as git produces them."""
+    return stream_git(["diff", "--staged"] + DIFF_OPTIONS + ["--"] + exclude_pathspecs(exclude), cwd=cwd)
+
+def stream_range_diff(rev_range: str, cwd=None, exclude: Collection[str] = ()) -> Iterator[str]:
+    """
+    Yield the lines of `git diff <rev_range>`. For the commits about to be
+    pushed use @{u}...HEAD: three dots diff from the merge base, where two
+    would also show whatever upstream changed since, reversed.
+    """
+    return stream_git(["diff"] + DIFF_OPTIONS + [rev_range, "--"] + exclude_pathspecs(exclude), cwd=cwd)
+
+def numstat(rev_range: Optional[str] = None, cwd=None) -> List[NumStat]:
+    """
+    Added/deleted line counts per file of the staged changes (or rev_range).
+    Raises CalledProcessError if git fails.
+    """
+    args = ["git", "diff", "--numstat", "-z", "--no-color", "--no-ext-diff"]
+    args += [rev_range, "--"] if rev_range else ["--staged"]
+    out = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                         cwd=cwd, check=True).stdout
+    # -z: "added\tdeleted\tpath\0", or "added\tdeleted\t\0old\0new\0" for renames
+    fields = out.decode("utf-8", errors="replace").split("\0")
+    stats = []
+    i = 0
+    while i < len(fields) and fields[i]:
+        added, deleted, path = fields[i].split("\t", 2)
+        if not path:
+            path = fields[i + 2]
+            i += 2
+        i += 1
+        stats.append(NumStat(
+            path,
+            None if added == "-" else int(added),
+            None if deleted == "-" else int(deleted),
+        ))
+    return stats
+
+def unquote_path(path: str) -> str:
+    """
+    Undo git's C-style quoting of a path (core.quotePath): strip the quotes,
+    resolve the backslash escapes and decode the octal-escaped bytes as
+    UTF-8, so "b/caf\\303\\251.py" becomes b/café.py. Unquoted paths are
+    returned as they are.
+    """
+    if len(path) < 2 or not (path.startswith('"') and path.endswith('"')):
+        return path
+    quoted = path[1:-1]
+    raw = bytearray()
+    i = 0
+    while i < len(quoted):
+        char = quoted[i]
+        if char == "\\" and i + 1 < len(quoted):
+            escape = quoted[i + 1]
+            octal = quoted[i + 1:i + 4]
+            if len(octal) == 3 and all(digit in OCTAL_DIGITS for digit in octal):
+                raw.append(int(octal, 8) & 0xFF)
+                i += 4
+                continue
+            if escape in C_ESCAPES:
+                raw.append(C_ESCAPES[escape])
+                i += 2
+                continue
+        raw += char.encode("utf-8")
+        i += 1
+    return raw.decode("utf-8", errors="replace")
+
+def _diff_path(header: str) -> Optional[str]:
+    """Path from a `+++ b/path` line; None for /dev/null."""
+    path = unquote_path(header[4:].rstrip('\t'))
+    if path == "/dev/null":
+        return None
+    return path[2:] if path.startswith("b/") else path
+
+def added_lines(
+    lines: Iterable[str],
+    files: Optional[Dict[str, DiffFile]] = None,
+) -> Iterator[Tuple[str, int, str]]:
+    """
+    Walk unified diff lines and yield (path, new_line_number, content)
+    for every added line. Hunk line counts decide where a hunk ends, so
+    added lines that happen to start with '++' are never taken for headers.
+    If files is given, each file's DiffFile is stored there before its
+    first added line is yielded.
+    """
+    path = None
+    new_line = 0
+    old_left = new_left = 0
+    blob = None
+    is_new = False
+
+    for line in lines:
+        if old_left > 0 or new_left > 0:
+            tag = line[:1]
+            if tag == '+':
+                if path is not None:
+                    yield path, new_line, line[1:]
+                new_line += 1
+                new_left -= 1
+            elif tag == '-':
+                old_left -= 1
+            elif tag == '\\':
+                pass  # "\ No newline at end of file"
+            else:
+                # Context line (some tools strip the leading space of blank ones)
+                new_line += 1
+                old_left -= 1
+                new_left -= 1
+            continue
+
+        if line.startswith("diff --git "):
+            # Fallback until the +++ header arrives (binary diffs never send one)
+            if line.endswith('"') and ' "b/' in line:
+                path = unquote_path(line[line.rindex(' "b/') + 1:])[2:]
+            else:
+                _, _, b_side = line.partition(" b/")
+                path = b_side or None
+            blob = None
+            is_new = False
+        elif line.startswith("new file mode"):
+            is_new = True
+        elif line.startswith("index "):
+            match = INDEX_HEADER.match(line)
+            if match:
+                blob = None if NULL_SHA.match(match.group(2)) else match.group(2)
+                is_new = is_new or bool(NULL_SHA.match(match.group(1)))
+        elif line.startswith("+++ "):
+            path = _diff_path(line)
+            if files is not None and path is not None:
+                files[path] = DiffFile(path, blob, is_new)
+        elif line.startswith("@@"):
+            match = HUNK_HEADER.match(line)
+            if match:
+                old_count, start, new_count = match.groups()
+                old_left = int(old_count) if old_count is not None else 1
+                new_left = int(new_count) if new_count is not None else 1
+                new_line = int(start)
@@ -0,0 +1,301 @@
+"""
+File Audit - Scan one file on disk against the file rule set
+Shared by audit-file.py (direct and pool workers) and audit-server.py
+
+An IncrementalScanner remembers the last content and raw hits per path, so a
+save that touches a few lines only re-runs the rules on those lines. Every rule
+matches within a single line, which makes the result identical to a rescan.
+
+Files with a NUL byte near the start are treated as binary and skipped. Large
+files are memory-mapped and decoded in newline-aligned chunks. Every scan runs
+within a time budget (AUDIT_FILE_MAX_SECONDS), checked between batches of
+lines, and large files also within a size budget (AUDIT_FILE_MAX_BYTES); a
+file that runs over gets a partial result and a note saying where it stopped.
+"""
+import mmap
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from aiwf.cache import blob_sha, shared_cache
+from aiwf.filetypes import disabled_rules
+from aiwf.rules import FILE_RULES, RuleEngine, decode_text
+
+ENGINE = RuleEngine(FILE_RULES)
+
+# Rules that don't apply to test files
+TEST_FILE_SKIPS = {"console-log"}
+
+def is_test_path(filepath: str) -> bool:
+    return any(x in filepath.lower() for x in ['test', 'spec', '__tests__', 'fixtures'])
+
+# Same heuristic as git: a NUL byte in the first 8000 bytes means binary
+SNIFF_BYTES = 8000
+
+# Files above LARGE_FILE_BYTES are mmapped and decoded CHUNK_BYTES at a time
+LARGE_FILE_BYTES = 4 * 1024 * 1024
+CHUNK_BYTES = 1024 * 1024
+
+# The time budget is checked after every BATCH_CHARS of text (cut at a newline)
+BATCH_CHARS = 64 * 1024
+
+# Per-file budget; whatever is past it is left unscanned and reported as partial
+MAX_FILE_BYTES = int(os.environ.get("AUDIT_FILE_MAX_BYTES", 64 * 1024 * 1024))
+MAX_FILE_SECONDS = float(os.environ.get("AUDIT_FILE_MAX_SECONDS", 2.0))
+
+# Bytes of previous file versions an IncrementalScanner keeps in memory
+INCREMENTAL_MAX_BYTES = int(os.environ.get("AUDIT_INCREMENTAL_MAX_BYTES", 64 * 1024 * 1024))
+
+def is_binary(head: bytes) -> bool:
+    return b'\0' in head[:SNIFF_BYTES]
+
+def start_deadline():
+    """monotonic() time at which a scan starting now runs out of budget, or None."""
+    return time.monotonic() + MAX_FILE_SECONDS if MAX_FILE_SECONDS > 0 else None
+
+def timed_hits(text: str, deadline=None, line_offset: int = 0, batch_chars: int = BATCH_CHARS):
+    """
+    Raw hits for text, scanned batch_chars at a time so the deadline is checked
+    between batches. Batches end just after a newline so no line is split.
+    Returns (hits, stopped_at_line), where stopped_at_line (relative to text)
+    is None unless the deadline cut the scan short.
+    """
+    hits = []
+    offset = 0
+    lines_before = 0
+    size = len(text)
+    while True:
+        end = min(offset + batch_chars, size)
+        if end < size:
+            newline = text.find('\n', end)
+            end = size if newline < 0 else newline + 1
+        part = text[offset:end]
+        if ENGINE.profile is not None:
+            ENGINE.profile.line_offset = line_offset + lines_before
+        for hit in ENGINE.raw_hits(part):
+            hit[1] += lines_before
+            hits.append(hit)
+        lines_before += part.count('\n')
+        offset = end
+        if offset >= size:
+            return hits, None
+        if deadline is not None and time.monotonic() > deadline:
+            return hits, lines_before
+
+def chunked_hits(buffer, limit: int, deadline=None, chunk_bytes: int = CHUNK_BYTES):
+    """
+    Raw hits for buffer[:limit] (bytes or mmap), decoded one chunk at a time.
+    Chunks end just after a newline so no line is split (a line longer than a
+    chunk is taken whole). Returns (hits, stopped_at_line), where
+    stopped_at_line is None unless the deadline cut the scan short.
+    """
+    hits = []
+    offset = 0
+    lines_before = 0
+    while offset < limit:
+        end = min(offset + chunk_bytes, limit)
+        if end < limit:
+            newline = buffer.rfind(b'\n', offset, end)
+            if newline < 0:
+                newline = buffer.find(b'\n', end, limit)
+            end = limit if newline < 0 else newline + 1
+        text = decode_text(buffer[offset:end])
+        chunk_hits, stopped_at = timed_hits(text, deadline, lines_before)
+        for hit in chunk_hits:
+            hit[1] += lines_before
+            hits.append(hit)
+        if stopped_at is not None:
+            return hits, lines_before + stopped_at
+        lines_before += text.count('\n')
+        offset = end
+        if deadline is not None and offset < limit and time.monotonic() > deadline:
+            return hits, lines_before
+    return hits, None
+
+def partial_note(stopped_at: int) -> str:
+    return f"⏳ Partial: time budget ({MAX_FILE_SECONDS:g}s) ran out after line {stopped_at}"
+
+def large_file_hits(f, size: int, deadline=None):
+    """
+    Raw hits for a large open file, via mmap and chunked scanning.
+    Returns (hits, note); note describes a partial scan, else None.
+    Only complete scans go into the findings cache.
+    """
+    limit = min(size, MAX_FILE_BYTES)
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        cache = shared_cache() if limit == size else None
+        blob = blob_sha(mm) if cache is not None else None
+        hits = cache.get(blob, ENGINE.version) if cache is not None else None
+        if hits is not None:
+            cache.flush()
+            return hits, None
+
+        hits, stopped_at = chunked_hits(mm, limit, deadline)
+        if stopped_at is not None:
+            return hits, partial_note(stopped_at)
+        if limit < size:
+            return hits, f"⏳ Partial: only the first {limit // (1024 * 1024)} MiB of {size // (1024 * 1024)} MiB scanned"
+        if cache is not None:
+            cache.put(blob, ENGINE.version, hits)
+            cache.flush()
+        return hits, None
+
+def changed_range(old_lines: list, new_lines: list):
+    """
+    (start, old_end, new_end) of the single line range that differs:
+    lines before start and after the ends are the same in both versions.
+    """
+    limit = min(len(old_lines), len(new_lines))
+    start = 0
+    while start < limit and old_lines[start] == new_lines[start]:
+        start += 1
+    old_end, new_end = len(old_lines), len(new_lines)
+    while old_end > start and new_end > start and old_lines[old_end - 1] == new_lines[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+    return start, old_end, new_end
+
+class IncrementalScanner:
+    """Per-path last version and hits; rescans only the lines that changed."""
+
+    def __init__(self, max_bytes: int = INCREMENTAL_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.files = OrderedDict()  # path -> (data, hits)
+        self.size = 0
+        self.lines_scanned = 0
+        self.lines_reused = 0
+        self.lock = threading.Lock()  # the audit server scans on several threads
+
+    def hits(self, path: str, data: bytes, deadline=None) -> tuple:
+        """
+        Raw hits for data, reusing the hits of path's previous version.
+        Returns (hits, stopped_at_line) like timed_hits; a partial result only
+        covers the lines up to stopped_at_line.
+        """
+        with self.lock:
+            previous = self.files.get(path)
+        new_lines = decode_text(data).split('\n')
+        if previous is None:
+            self.lines_scanned += len(new_lines)
+            return timed_hits('\n'.join(new_lines), deadline)
+
+        old_data, old_hits = previous
+        old_lines = decode_text(old_data).split('\n')
+        start, old_end, new_end = changed_range(old_lines, new_lines)
+        shift = new_end - old_end
+
+        # Hits keep their line unless they sit after the edit (line numbers are 1-based)
+        hits = [hit for hit in old_hits if hit[1] <= start]
+        if new_end > start:
+            region_hits, stopped_at = timed_hits('\n'.join(new_lines[start:new_end]), deadline, start)
+            for hit in region_hits:
+                hits.append([hit[0], hit[1] + start] + hit[2:])
+            if stopped_at is not None:
+                self.lines_scanned += stopped_at
+                return hits, start + stopped_at
+        hits.extend(
+            [hit[0], hit[1] + shift] + hit[2:] for hit in old_hits if hit[1] > old_end
+        )
+        self.lines_scanned += new_end - start
+        self.lines_reused += len(new_lines) - (new_end - start)
+        return hits, None
+
+    def remember(self, path: str, data: bytes, hits: list):
+        """Keep this version as the base for the next incremental scan of path."""
+        with self.lock:
+            previous = self.files.pop(path, None)
+            if previous is not None:
+                self.size -= len(previous[0])
+            if len(data) > self.max_bytes:
+                return
+            self.files[path] = (data, hits)
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, (old_data, _) = self.files.popitem(last=False)
+                self.size -= len(old_data)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "files": len(self.files),
+                "bytes": self.size,
+                "lines_scanned": self.lines_scanned,
+                "lines_reused": self.lines_reused,
+            }
+
+def file_hits(data: bytes, path=None, incremental: IncrementalScanner = None, deadline=None) -> tuple:
+    """
+    Raw rule hits for file content, from the findings cache when possible.
+    With an IncrementalScanner, a cache miss only rescans lines changed since
+    path was last scanned. Returns (hits, note) like large_file_hits; a scan
+    cut short by the deadline is neither cached nor remembered.
+    """
+    cache = shared_cache()
+    blob = blob_sha(data) if cache is not None else None
+    hits = cache.get(blob, ENGINE.version) if cache is not None else None
+    if hits is None:
+        if incremental is not None and path is not None:
+            hits, stopped_at = incremental.hits(path, data, deadline)
+        else:
+            hits, stopped_at = timed_hits(decode_text(data), deadline)
+        if stopped_at is not None:
+            if cache is not None:
+                cache.flush()
+            return hits, partial_note(stopped_at)
+        if cache is not None:
+            cache.put(blob, ENGINE.version, hits)
+    if incremental is not None and path is not None:
+        incremental.remember(path, data, hits)
+    if cache is not None:
+        cache.flush()
+    return hits, None
+
+def scan_file(filepath, name=None, incremental: IncrementalScanner = None):
+    """
+    Collect issues for one file without printing.
+    Returns (issues, error); issues is None if the file no longer exists.
+    name is the path as the user gave it (used for test-file and file-type detection).
+    Runs inside pool workers and the audit server, so it only returns plain data.
+    incremental (audit server, audit-file --batches) reuses hits from the previous version.
+    issues["notes"] says why a file was skipped or only partly scanned;
+    issues["findings"] holds [rule_id, line, column, matched_text] per finding.
+    """
+    if not os.path.exists(filepath):
+        return None, None
+
+    # Skip test files for some checks
+    is_test = is_test_path(name or filepath)
+
+    if ENGINE.profile is not None:
+        ENGINE.profile.path = name or filepath
+        ENGINE.profile.line_offset = 0
+
+    issues = {"critical": [], "warning": [], "notes": [], "findings": []}
+
+    deadline = start_deadline()
+    try:
+        with open(filepath, 'rb') as f:
+            head = f.read(SNIFF_BYTES)
+            if is_binary(head):
+                issues["notes"].append("⏭️  Binary file skipped")
+                return issues, None
+            size = os.fstat(f.fileno()).st_size
+            if size > LARGE_FILE_BYTES:
+                hits, note = large_file_hits(f, size, deadline)
+            else:
+                hits, note = file_hits(head + f.read(), filepath, incremental, deadline)
+            if note:
+                issues["notes"].append(note)
+    except Exception as e:
+        return None, str(e)
+
+    disabled = disabled_rules(name or filepath)
+    if is_test:
+        disabled = disabled | TEST_FILE_SKIPS
+    for finding in ENGINE.from_hits(hits, disabled=disabled):
+        rule = finding.rule
+        issues[rule.severity].append(f"{rule.icon} L{finding.line}: {rule.title}")
+        issues["findings"].append([rule.id, finding.line, finding.column, finding.text])
+
+    return issues, None
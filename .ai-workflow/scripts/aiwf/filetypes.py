@@ -0,0 +1,99 @@
+"""
+File Types - Path classification for the pattern audits
+Used by local-audit.py (staged diffs) and aiwf.fileaudit (single files)
+
+Lockfiles, vendored dependencies (node_modules/ and friends) and binary
+assets are not audited at all. Every other file gets a kind from its name,
+and a kind leaves out the rules that mean nothing in it. console.log,
+debugger and eslint-disable are JavaScript, so Python, Markdown, config and
+shell files skip them. Build output, minified bundles, source maps, test
+snapshots and SVGs are "generated": nobody wrote those lines by hand, so
+none of the code-quality warnings apply, but a key baked into a bundle is
+still a leak. The critical rules (secrets, SQL injection) run on every kind.
+Unknown kinds get every rule.
+"""
+import posixpath
+from typing import FrozenSet, Optional
+
+# Whole directories that hold someone else's code
+VENDORED_DIRS = frozenset({
+    "node_modules", "bower_components", "jspm_packages", "vendor", "third_party", ".yarn",
+})
+
+# Whole directories of build output and generated files
+GENERATED_DIRS = frozenset({"dist", "build", ".next", ".nuxt", "coverage", "__snapshots__", "__generated__"})
+
+LOCKFILES = frozenset({
+    "package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml", "bun.lockb",
+    "poetry.lock", "Pipfile.lock", "uv.lock", "Cargo.lock", "composer.lock", "Gemfile.lock",
+    "go.sum", "flake.lock",
+})
+
+GENERATED_SUFFIXES = (
+    ".min.js", ".min.mjs", ".min.css", ".map", ".snap", ".bundle.js", ".chunk.js",
+    ".pb.go", "_pb2.py", "_pb2_grpc.py", ".g.dart", ".designer.cs", ".svg",
+)
+
+# Binary assets (SVG is text, and counts as generated)
+ASSET_EXTENSIONS = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico", ".bmp", ".avif",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot", ".pdf", ".zip", ".gz",
+    ".mp3", ".mp4", ".webm", ".wasm",
+})
+
+KINDS = {
+    "js": {".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".mts", ".cts",
+           ".vue", ".svelte", ".astro", ".html", ".htm"},
+    "python": {".py", ".pyi", ".pyx"},
+    "docs": {".md", ".mdx", ".markdown", ".rst", ".txt", ".adoc"},
+    "config": {".json", ".jsonc", ".yaml", ".yml", ".toml", ".ini", ".cfg", ".conf",
+               ".properties", ".xml", ".env"},
+    "shell": {".sh", ".bash", ".zsh", ".fish", ".ps1"},
+    "style": {".css", ".scss", ".sass", ".less"},
+    "sql": {".sql"},
+}
+KIND_BY_EXTENSION = {ext: kind for kind, exts in KINDS.items() for ext in exts}
+
+# Rules that only mean something in JavaScript/TypeScript
+JS_ONLY = frozenset({"console-log", "debugger", "eslint-disable"})
+
+# Code-quality warnings; the critical rules are never left out
+CODE_RULES = JS_ONLY | {"todo"}
+
+# Rule ids each kind leaves out (kinds not listed run every rule)
+KIND_SKIPS = {
+    "generated": CODE_RULES,
+    "python": JS_ONLY,
+    "docs": JS_ONLY,
+    "config": JS_ONLY,
+    "shell": JS_ONLY,
+    "style": JS_ONLY,
+    "sql": JS_ONLY,
+}
+
+def skip_reason(path: str) -> Optional[str]:
+    """Why a file is not audited at all ("lockfile", "vendored", "asset"), or None."""
+    name = posixpath.basename(path)
+    if name in LOCKFILES:
+        return "lockfile"
+    if any(part in VENDORED_DIRS for part in path.split("/")[:-1]):
+        return "vendored"
+    if posixpath.splitext(name.lower())[1] in ASSET_EXTENSIONS:
+        return "asset"
+    return None
+
+def is_generated(path: str) -> bool:
+    return (any(part in GENERATED_DIRS for part in path.split("/")[:-1])
+            or posixpath.basename(path).lower().endswith(GENERATED_SUFFIXES))
+
+def file_kind(path: str) -> str:
+    if is_generated(path):
+        return "generated"
+    name = posixpath.basename(path).lower()
+    if name.startswith(".env"):
+        return "config"
+    return KIND_BY_EXTENSION.get(posixpath.splitext(name)[1], "other")
+
+def disabled_rules(path: str) -> FrozenSet[str]:
+    """Rule ids that don't apply to this file's kind."""
+    return KIND_SKIPS.get(file_kind(path), frozenset())
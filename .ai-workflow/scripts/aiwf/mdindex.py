@@ -0,0 +1,150 @@
+"""
+Markdown Index - One-pass index of the context markdown files
+Used by aiwf.snapshot for SESSION.md and MVP_MASTER_LIST.md (context-sync.py)
+
+Each file is read line by line exactly once. The index keeps what the
+context queries need: `| **Field** | value |` table fields, the bullet
+items of every heading's section and the checkbox counts. Indexes are
+persisted in context/.md-index.json and reused while a file's mtime and
+size are unchanged.
+"""
+import json
+import os
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from aiwf.paths import CONTEXT_DIR
+
+INDEX_FILE = CONTEXT_DIR / ".md-index.json"
+
+# Bump when the index layout changes (invalidates persisted indexes)
+INDEX_FORMAT = 1
+
+HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+FIELD = re.compile(r'\*\*([^*|]+?)\*\*\s*\|\s*([^|]*)')
+BULLET = re.compile(r'[-*]\s+(.+)')
+
+class Section(NamedTuple):
+    level: int
+    line: int  # 1-based line of the heading
+    items: List[str]  # Bullet texts, in order
+
+class MarkdownIndex(NamedTuple):
+    fields: Dict[str, str]  # First value seen for each **Field** table cell
+    sections: Dict[str, Section]  # Heading text -> section (first heading wins)
+    checked: int  # "[x]" / "[X]" occurrences
+    unchecked: int  # "[ ]" occurrences
+
+    def section_items(self, title: str) -> List[str]:
+        section = self.sections.get(title)
+        return section.items if section else []
+
+def parse_markdown(lines: Iterable[str]) -> MarkdownIndex:
+    """Build the index in a single pass over the lines."""
+    fields = {}
+    sections = {}
+    checked = unchecked = 0
+    open_sections = []  # Headings whose section the current line belongs to
+
+    for line_no, line in enumerate(lines, 1):
+        line = line.rstrip('\n')
+
+        if '[' in line:
+            checked += line.count('[x]') + line.count('[X]')
+            unchecked += line.count('[ ]')
+
+        if line.startswith('#'):
+            match = HEADING.match(line)
+            if match:
+                level = len(match.group(1))
+                # A heading closes every open section of the same or a deeper level
+                open_sections = [s for s in open_sections if s.level < level]
+                section = Section(level, line_no, [])
+                sections.setdefault(match.group(2), section)
+                open_sections.append(section)
+                continue
+
+        if '**' in line and '|' in line:
+            for key, value in FIELD.findall(line):
+                fields.setdefault(key.strip(), value.strip())
+
+        if open_sections and ('-' in line or '*' in line):
+            match = BULLET.search(line)
+            if match:
+                for section in open_sections:
+                    section.items.append(match.group(1))
+
+    return MarkdownIndex(fields, sections, checked, unchecked)
+
+def read_markdown(path) -> Optional[MarkdownIndex]:
+    """Parse one file (None if it doesn't exist)."""
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return parse_markdown(f)
+    except OSError:
+        return None
+
+def _to_json(index: MarkdownIndex) -> dict:
+    return {
+        "fields": index.fields,
+        "sections": {title: list(section) for title, section in index.sections.items()},
+        "checked": index.checked,
+        "unchecked": index.unchecked,
+    }
+
+def _from_json(data: dict) -> MarkdownIndex:
+    return MarkdownIndex(
+        data["fields"],
+        {title: Section(*section) for title, section in data["sections"].items()},
+        data["checked"],
+        data["unchecked"],
+    )
+
+class IndexStore:
+    """Persisted indexes for several files, keyed by path, mtime and size."""
+
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self.entries = None
+        self.dirty = False
+
+    def _load(self):
+        if self.entries is None:
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+                self.entries = data["files"] if data.get("format") == INDEX_FORMAT else {}
+            except (OSError, ValueError, KeyError, AttributeError):
+                self.entries = {}
+        return self.entries
+
+    def get(self, path) -> Optional[MarkdownIndex]:
+        """Index for path, reusing the persisted one while the file is unchanged."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = str(path)
+        stamp = [st.st_mtime_ns, st.st_size]
+        entry = self._load().get(key)
+        if entry is not None and entry.get("stamp") == stamp:
+            try:
+                return _from_json(entry["index"])
+            except (KeyError, TypeError, ValueError):
+                pass
+        index = read_markdown(path)
+        if index is not None:
+            self.entries[key] = {"stamp": stamp, "index": _to_json(index)}
+            self.dirty = True
+        return index
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp = self.path.with_name(self.path.name + f".{os.getpid()}")
+        try:
+            tmp.write_text(json.dumps({"format": INDEX_FORMAT, "files": self.entries}))
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except OSError:
+            pass  # Persisting is best-effort; the index is rebuilt next time
@@ -0,0 +1,11 @@
+"""
+Workflow Paths - Locations shared by the aiwf helpers
+Mirrors the SCRIPT_DIR / CONTEXT_DIR constants at the top of each script.
+"""
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).parent
+SCRIPT_DIR = PACKAGE_DIR.parent
+WORKFLOW_ROOT = SCRIPT_DIR.parent  # .ai-workflow
+PROJECT_ROOT = WORKFLOW_ROOT.parent  # project root
+CONTEXT_DIR = WORKFLOW_ROOT / "context"
@@ -0,0 +1,447 @@
+"""
+Prompt Index - Incremental index of PROMPT_HISTORY.md with similarity search
+Used by prompt-audit.py (duplicate detection, file conflicts)
+
+PROMPT_HISTORY.md only ever grows, so the index remembers how many bytes it
+has parsed and each run parses just the sections appended since. Every
+prompt's offset, date, title and mentioned files are stored with it.
+Checksums of the file's start and of the bytes just before the stored
+offset detect a rewritten or truncated history, which is then re-indexed
+from scratch.
+
+Mentioned files are keyed by their spelling and the repository path they
+resolve to (aiwf.repopaths) and kept in an inverted path -> prompt table.
+A conflict check is then one lookup over every prompt still open in
+PROMPT_TRACKER.log, not a scan of the last few prompts.
+
+Each prompt gets two MinHash signatures: one of its title's character
+3-grams and one of its full text's word 3-grams. Signatures are cut into
+bands and stored in an SQLite file under context/. A query only looks at
+prompts that share a band bucket with it, so lookups stay fast however long
+the history gets.
+Candidates are scored on titles with difflib's ratio (as the old last-10
+check did) and on text by signature agreement, an estimate of the Jaccard
+similarity of the two shingle sets.
+"""
+import bisect
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import struct
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from aiwf.paths import CONTEXT_DIR
+from aiwf.repopaths import PathResolver
+from aiwf.tracker import OPEN_STATUSES, read_tracker
+
+INDEX_FILE = CONTEXT_DIR / ".prompt-index.db"
+HISTORY_FILE = CONTEXT_DIR / "PROMPT_HISTORY.md"
+
+# Prompts without a tracker entry count as open among this many most recent
+UNTRACKED_WINDOW = 20
+
+# Bytes hashed at the start of the history and before the parsed offset
+CHECK_BYTES = 4096
+
+# Signature length and banding. Titles use 32 bands of 2 rows, which catches
+# pairs from about 0.2 Jaccard up; texts use 16 bands of 4 rows (about 0.5
+# up), which keeps long prompts that merely share boilerplate apart
+NUM_HASHES = 64
+TITLE_ROWS = 2
+TEXT_ROWS = 4
+
+# Candidates scored per query (most shared buckets first)
+MAX_CANDIDATES = 200
+
+# Bump when shingling, hashing, parsing or path keys change (rebuilds the index)
+INDEX_FORMAT = 5
+
+MASK = (1 << 64) - 1
+EMPTY = MASK
+SLOT_SHIFT = 64 - NUM_HASHES.bit_length() + 1
+VALUE_MASK = (1 << SLOT_SHIFT) - 1
+GOLDEN = 0x9E3779B97F4A7C15
+SIGNATURE = struct.Struct(f">{NUM_HASHES}Q")
+WORD = re.compile(r"\w+")
+
+# Each history entry: "---", "## <date> <time>", then the prompt in a fence
+HEADER = re.compile(rb"---\n## (\d{4}-\d{2}-\d{2}[^\n]*)")
+# Start of an entry whose header is still being written ("---", "--", "-" at the very end)
+ENTRY_START = re.compile(rb"^(?:---|--?\Z)", re.MULTILINE)
+FENCE = re.compile(rb"```\n?(.*?)\n?```", re.DOTALL)
+TITLE = re.compile(r"Task:?\s*([^\n]+)")
+TRACKER_ID = re.compile(r"\b(\d{4}:\d{4}:[a-z]+)\b")
+
+# Token hashes are reused across prompts; the table is dropped when it gets big
+MAX_TOKEN_HASHES = 200_000
+_token_hashes: Dict[str, int] = {}
+
+class Match(NamedTuple):
+    title: str
+    score: float  # Best of title_score / text_score
+    title_score: float
+    text_score: float
+    date: str  # History header of the matched prompt
+
+class Prompt(NamedTuple):
+    offset: int  # Byte offset of the entry's "---" line
+    date: str
+    title: str
+    text: str
+    files: List[str]
+    tracker_id: Optional[str]  # PROMPT_TRACKER.log id quoted in the prompt, if any
+
+class Conflict(NamedTuple):
+    path: str
+    title: str
+    date: str
+    status: Optional[str]  # Tracker status (None if the prompt isn't tracked)
+
+def prompt_title(text: str) -> str:
+    """Task title of a prompt (its first 50 characters if it has none)."""
+    title_match = TITLE.search(text)
+    return title_match.group(1).strip() if title_match else text[:50]
+
+def extract_files(prompt: str) -> List[str]:
+    """Extract file paths mentioned in a prompt."""
+    # Match common file path patterns
+    patterns = [
+        r'src/[a-zA-Z0-9_/.-]+\.(?:js|jsx|ts|tsx|css)',
+        r'api/[a-zA-Z0-9_/.-]+\.(?:js|ts)',
+        r'[a-zA-Z0-9_./-]*[a-zA-Z0-9_]+\.(?:js|jsx|ts|tsx|py|sh)\b',
+    ]
+    files = []
+    for pattern in patterns:
+        files.extend(re.findall(pattern, prompt))
+    # Also check for "Files to Modify" section
+    files_section = re.search(r'Files to (?:Modify|Consider)[:\s]*\n((?:[-*]\s*[^\n]+\n?)+)', prompt, re.IGNORECASE)
+    if files_section:
+        for line in files_section.group(1).split('\n'):
+            # Extract file paths from list items
+            file_match = re.search(r'`?([a-zA-Z0-9_/.-]+\.[a-z]+)`?', line)
+            if file_match:
+                files.append(file_match.group(1))
+    return list(set(files))
+
+def parse_history(data: bytes, base: int = 0) -> Tuple[List[Prompt], int]:
+    """
+    Prompts in a stretch of PROMPT_HISTORY.md starting at byte offset base.
+    Returns them with the offset parsing got to: the end of data, or the
+    start of a final entry that hasn't been completely written yet (its
+    header or closing fence is missing). inject-prompt.sh appends an entry
+    line by line, so a run can see any prefix of one.
+    """
+    prompts = []
+    done = 0  # End of the last complete entry
+    headers = list(HEADER.finditer(data))
+    for i, header in enumerate(headers):
+        last = i + 1 == len(headers)
+        end = len(data) if last else headers[i + 1].start()
+        match = FENCE.search(data, header.end(), end)
+        if match is None:
+            if last:
+                return prompts, base + header.start()
+            continue
+        done = match.end()
+        text = match.group(1).decode("utf-8", errors="replace").strip()
+        tracker_match = TRACKER_ID.search(text)
+        prompts.append(Prompt(base + header.start(), header.group(1).decode().strip(),
+                              prompt_title(text), text, extract_files(text),
+                              tracker_match.group(1) if tracker_match else None))
+    pending = ENTRY_START.search(data, done)
+    return prompts, base + (pending.start() if pending else len(data))
+
+def _combine(a: int, b: int) -> int:
+    """Order-sensitive 64-bit combination; its high bits are the well-mixed ones."""
+    return ((a * GOLDEN) ^ b) * GOLDEN & MASK
+
+def _token_hash(token: str) -> int:
+    h = _token_hashes.get(token)
+    if h is None:
+        if len(_token_hashes) >= MAX_TOKEN_HASHES:
+            _token_hashes.clear()
+        h = int.from_bytes(hashlib.blake2b(token.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "big")
+        _token_hashes[token] = h
+    return h
+
+def title_hashes(title: str) -> set:
+    """Hashes of the title's character 3-grams."""
+    title = " ".join(title.lower().split())
+    return {_token_hash(title[i:i + 3]) for i in range(max(1, len(title) - 2))} if title else set()
+
+def text_hashes(text: str) -> set:
+    """Hashes of the text's word 3-grams (single words for very short texts)."""
+    words = [_token_hash(word) for word in WORD.findall(text.lower())]
+    if len(words) < 3:
+        return set(words)
+    # _combine(_combine(a, b), c), inlined: this runs once per word of history
+    g = GOLDEN
+    return {((a * g ^ b) * g * g ^ c) * g & MASK for a, b, c in zip(words, words[1:], words[2:])}
+
+def signature(hashes: Iterable[int]) -> List[int]:
+    """
+    One-permutation MinHash: the top bits of each shingle hash pick a slot
+    and the smallest remaining value per slot is kept. Empty slots borrow the next filled one
+    (densification) so short texts still compare.
+    """
+    slots = [EMPTY] * NUM_HASHES
+    for h in hashes:
+        slot, value = h >> SLOT_SHIFT, h & VALUE_MASK
+        if value < slots[slot]:
+            slots[slot] = value
+    filled = [i for i, value in enumerate(slots) if value != EMPTY]
+    if not filled or len(filled) == NUM_HASHES:
+        return slots
+    dense = list(slots)
+    for i in range(NUM_HASHES):
+        if slots[i] == EMPTY:
+            j = bisect.bisect(filled, i)
+            dense[i] = slots[filled[j % len(filled)]]
+    return dense
+
+def agreement(a: List[int], b: List[int]) -> float:
+    """Share of equal slots: the estimated Jaccard similarity."""
+    if a[0] == EMPTY or b[0] == EMPTY:
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / NUM_HASHES
+
+def band_buckets(sig: List[int], rows: int, first_band: int = 0) -> List[tuple]:
+    """(band, bucket) pairs; buckets are signed so they fit an SQLite INTEGER."""
+    if sig[0] == EMPTY:
+        return []
+    pairs = []
+    for band in range(NUM_HASHES // rows):
+        h = band
+        for value in sig[band * rows:(band + 1) * rows]:
+            h = _combine(h, value)
+        pairs.append((first_band + band, h - (1 << 64) if h >> 63 else h))
+    return pairs
+
+def probes(title_sig: List[int], text_sig: List[int]) -> List[tuple]:
+    """Band buckets of both signatures, in one band-numbering space."""
+    return (band_buckets(title_sig, TITLE_ROWS)
+            + band_buckets(text_sig, TEXT_ROWS, first_band=NUM_HASHES // TITLE_ROWS))
+
+def title_ratio(a: str, b: str) -> float:
+    from difflib import SequenceMatcher  # Imported once candidates need scoring
+
+    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
+
+class PromptIndex:
+    """
+    SQLite store of parsed prompts, their signatures and band buckets, plus
+    how far into the history file parsing has got. If the file can't be
+    opened the index lives in memory for the run instead, so the audit keeps
+    working (just without persistence).
+    """
+
+    def __init__(self, path=INDEX_FILE, untracked_window: Optional[int] = UNTRACKED_WINDOW):
+        self.path = path
+        self.untracked_window = untracked_window  # None: every untracked prompt counts as open
+        self._db = None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            try:
+                self._db = self._open(str(self.path))
+            except sqlite3.Error:
+                self._db = self._open(":memory:")
+        return self._db
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        version = db.execute("PRAGMA user_version").fetchone()[0]
+        if version != INDEX_FORMAT:
+            db.execute("BEGIN IMMEDIATE")
+            for table in ("prompts", "bands", "paths", "source"):
+                db.execute(f"DROP TABLE IF EXISTS {table}")
+            db.execute(f"PRAGMA user_version = {INDEX_FORMAT}")
+            db.execute("COMMIT")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS prompts ("
+            " id INTEGER PRIMARY KEY, offset INTEGER, date TEXT, title TEXT,"
+            " files TEXT, tracker_id TEXT, text_sig BLOB)"
+        )
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS paths ("
+            " path TEXT, prompt INTEGER, PRIMARY KEY (path, prompt)) WITHOUT ROWID"
+        )
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS bands ("
+            " band INTEGER, bucket INTEGER, prompt INTEGER,"
+            " PRIMARY KEY (band, bucket, prompt)) WITHOUT ROWID"
+        )
+        db.execute("CREATE TABLE IF NOT EXISTS source (path TEXT PRIMARY KEY, offset INTEGER, head TEXT, tail TEXT)")
+        return db
+
+    def update(self, history=HISTORY_FILE) -> int:
+        """Index sections appended to the history since the last run; returns how many were added."""
+        db = self._conn()
+        try:
+            f = open(history, "rb")
+        except OSError:
+            return 0
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            # One writer at a time; a second audit waits, then finds nothing left to do
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                added = self._update(db, str(history), f, size)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return added
+
+    def _update(self, db, key: str, f, size: int) -> int:
+        row = db.execute("SELECT offset, head, tail FROM source WHERE path = ?", (key,)).fetchone()
+        offset = 0
+        if row is not None:
+            offset, head, tail = row
+            if size < offset or _checksum(f, 0, min(offset, CHECK_BYTES)) != head \
+                    or _checksum(f, max(0, offset - CHECK_BYTES), offset) != tail:
+                offset = 0  # Truncated or rewritten: start over
+        if offset == 0:
+            for table in ("prompts", "bands", "paths"):
+                db.execute(f"DELETE FROM {table}")
+        elif offset == size:
+            return 0
+
+        f.seek(offset)
+        prompts, parsed = parse_history(f.read(size - offset), offset)
+        resolver = PathResolver(path for prompt in prompts for path in prompt.files) if prompts else None
+        for prompt in prompts:
+            self._add(db, prompt, resolver)
+        db.execute(
+            "INSERT OR REPLACE INTO source VALUES (?, ?, ?, ?)",
+            (key, parsed, _checksum(f, 0, min(parsed, CHECK_BYTES)),
+             _checksum(f, max(0, parsed - CHECK_BYTES), parsed)),
+        )
+        return len(prompts)
+
+    def add(self, prompts: List[Prompt], resolver: Optional[PathResolver] = None):
+        """Index prompts that aren't in the history file (earlier items of a batch)."""
+        db = self._conn()
+        resolver = resolver or PathResolver(path for prompt in prompts for path in prompt.files)
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for prompt in prompts:
+                self._add(db, prompt, resolver)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _add(self, db, prompt: Prompt, resolver: PathResolver):
+        title_sig = signature(title_hashes(prompt.title))
+        text_sig = signature(text_hashes(prompt.text))
+        prompt_id = db.execute(
+            "INSERT INTO prompts (offset, date, title, files, tracker_id, text_sig) VALUES (?, ?, ?, ?, ?, ?)",
+            (prompt.offset, prompt.date, prompt.title, json.dumps(prompt.files), prompt.tracker_id,
+             SIGNATURE.pack(*text_sig)),
+        ).lastrowid
+        db.executemany(
+            "INSERT OR IGNORE INTO bands VALUES (?, ?, ?)",
+            [(band, bucket, prompt_id) for band, bucket in probes(title_sig, text_sig)],
+        )
+        db.executemany(
+            "INSERT OR IGNORE INTO paths VALUES (?, ?)",
+            [(path, prompt_id) for path in resolver.keys_all(prompt.files)],
+        )
+
+    def recent(self, n: Optional[int] = None) -> List[dict]:
+        """The last n prompts (all if n is None), oldest first: title, date, offset, files."""
+        query = "SELECT offset, date, title, files FROM prompts ORDER BY id DESC"
+        rows = self._conn().execute(query + (" LIMIT ?" if n is not None else ""),
+                                    (n,) if n is not None else ()).fetchall()
+        return [{"offset": offset, "date": date, "title": title, "files": json.loads(files)}
+                for offset, date, title, files in reversed(rows)]
+
+    def conflicts(self, paths: Iterable[str], tracker: Optional[Dict[str, Tuple[str, str]]] = None) -> List[Conflict]:
+        """
+        Open prompts touching any of these path keys: tracked-open ones
+        first, then untracked recent ones, newest first within each group.
+        Prompts whose tracker entry is DONE or FAILED are left out.
+        """
+        paths = sorted(set(paths))
+        if not paths:
+            return []
+        tracker = read_tracker() if tracker is None else tracker
+        by_title = {_normalized(description): status for status, description in tracker.values()}
+        db = self._conn()
+        newest = db.execute("SELECT COALESCE(MAX(id), 0) FROM prompts").fetchone()[0]
+        rows = db.execute(
+            "SELECT paths.path, prompts.id, prompts.title, prompts.date, prompts.tracker_id"
+            " FROM paths JOIN prompts ON prompts.id = paths.prompt"
+            f" WHERE paths.path IN ({','.join('?' * len(paths))})", paths
+        ).fetchall()
+
+        # A file met under both its spelling and its full path is reported once, by the path
+        matched: Dict[int, List[str]] = {}
+        for path, prompt_id, *_ in rows:
+            matched.setdefault(prompt_id, []).append(path)
+        ranked = []
+        for path, prompt_id, title, date, tracker_id in rows:
+            if any(other.endswith("/" + path) for other in matched[prompt_id]):
+                continue
+            status = tracker[tracker_id][0] if tracker_id in tracker else by_title.get(_normalized(title))
+            if status is None:
+                if self.untracked_window is not None and prompt_id <= newest - self.untracked_window:
+                    continue
+                rank = 1
+            elif status in OPEN_STATUSES:
+                rank = 0
+            else:
+                continue
+            ranked.append((rank, -prompt_id, path, Conflict(path, title, date, status)))
+        ranked.sort()
+        return [conflict for *_, conflict in ranked]
+
+    def similar(self, title: str, text: str, k: int = 5, min_score: float = 0.0) -> List[Match]:
+        """Top-k indexed prompts most similar to this one, best first."""
+        db = self._conn()
+        text_sig = signature(text_hashes(text))
+
+        # Vote: prompts sharing the most buckets are the likeliest matches
+        votes: Dict[int, int] = {}
+        for band, bucket in probes(signature(title_hashes(title)), text_sig):
+            for (prompt_id,) in db.execute(
+                "SELECT prompt FROM bands WHERE band = ? AND bucket = ?", (band, bucket)
+            ):
+                votes[prompt_id] = votes.get(prompt_id, 0) + 1
+        candidates = sorted(votes, key=votes.get, reverse=True)[:MAX_CANDIDATES]
+        if not candidates:
+            return []
+
+        # One query: MAX_CANDIDATES is well under SQLite's bound-variable limit (999 on old builds)
+        rows = db.execute(
+            f"SELECT date, title, text_sig FROM prompts WHERE id IN ({','.join('?' * len(candidates))})", candidates
+        ).fetchall()
+        matches = []
+        for date, old_title, old_text_sig in rows:
+            title_score = title_ratio(title, old_title)
+            text_score = agreement(text_sig, list(SIGNATURE.unpack(old_text_sig)))
+            score = max(title_score, text_score)
+            if score >= min_score:
+                matches.append(Match(old_title, round(score, 3), round(title_score, 3), round(text_score, 3), date))
+        matches.sort(key=lambda match: match.score, reverse=True)
+        return matches[:k]
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM prompts").fetchone()[0]
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+def _normalized(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def _checksum(f, start: int, end: int) -> str:
+    f.seek(start)
+    return hashlib.sha1(f.read(end - start)).hexdigest()
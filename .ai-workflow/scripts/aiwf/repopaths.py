@@ -0,0 +1,100 @@
+"""
+Repo Paths - Resolve file mentions in prompts to repository paths
+Used by aiwf.promptindex (the path -> prompt index behind conflict checks)
+
+Prompts name files loosely: "./src/a.js", "src/a.js", "`a.js`". Mentions
+are normalized, then looked up in a trie of `git ls-files` keyed by path
+components in reverse, so any trailing part of a path ("a.js",
+"components/a.js") finds the files it can refer to. Only files whose
+basename was mentioned are put in the trie, which keeps it small in big
+repos.
+
+What a mention resolves to depends on the files that exist when it is
+resolved: "utils.py" names nothing until src/utils.py is added, and stops
+being unique once lib/utils.py is. So a mention is indexed and looked up
+under its normalized spelling as well as its current resolution, and an old
+and a new prompt still meet when the tree changed in between.
+"""
+import posixpath
+from typing import Dict, Iterable, List, Optional, Set
+
+from aiwf.paths import PROJECT_ROOT
+
+# Key of the file list kept at every trie node
+FILES = "\0"
+
+def normalize_path(mention: str) -> Optional[str]:
+    """Canonical repo-relative form of a mentioned path (None if it leaves the repo)."""
+    path = mention.strip().strip("`'\"").replace("\\", "/")
+    while path.startswith("./"):
+        path = path[2:]
+    path = posixpath.normpath(path.lstrip("/")) if path else ""
+    if not path or path == "." or path.startswith("../"):
+        return None
+    return path
+
+class PathTrie:
+    """Paths keyed by their components in reverse (basename first)."""
+
+    def __init__(self, paths: Iterable[str] = ()):
+        self.root: Dict[str, dict] = {}
+        for path in paths:
+            self.add(path)
+
+    def add(self, path: str):
+        node = self.root
+        for part in reversed(path.split("/")):
+            node = node.setdefault(part, {})
+            node.setdefault(FILES, []).append(path)
+
+    def matches(self, suffix: str) -> List[str]:
+        """Every path whose trailing components are suffix's components."""
+        node = self.root
+        for part in reversed(suffix.split("/")):
+            node = node.get(part)
+            if node is None:
+                return []
+        return node[FILES]
+
+def repo_files(basenames: Optional[Set[str]] = None, cwd=PROJECT_ROOT) -> List[str]:
+    """`git ls-files`, optionally only files with one of the given basenames."""
+    import subprocess  # Only prompts that mention files need git
+
+    try:
+        output = subprocess.run(["git", "ls-files", "-z"], capture_output=True, cwd=cwd,
+                                timeout=10).stdout.decode("utf-8", errors="replace")
+    except (OSError, subprocess.SubprocessError):
+        return []
+    paths = [path for path in output.split("\0") if path]
+    if basenames is None:
+        return paths
+    return [path for path in paths if path.rpartition("/")[2] in basenames]
+
+class PathResolver:
+    """Maps mentions to the repository file they name, loading git's file list once."""
+
+    def __init__(self, mentions: Iterable[str] = (), cwd=PROJECT_ROOT):
+        wanted = {path.rpartition("/")[2] for path in filter(None, map(normalize_path, mentions))}
+        self.trie = PathTrie(repo_files(wanted, cwd) if wanted else ())
+
+    def resolve(self, mention: str) -> Optional[str]:
+        """
+        The repo path a mention refers to. Unknown files (not created yet) and
+        ambiguous ones ("index.js") keep their normalized spelling, so two
+        prompts naming them the same way still meet.
+        """
+        path = normalize_path(mention)
+        if path is None:
+            return None
+        found = self.trie.matches(path)
+        return found[0] if len(found) == 1 else path
+
+    def keys_all(self, mentions: Iterable[str]) -> List[str]:
+        """Index keys of the mentions: each one's resolved path and normalized spelling."""
+        keys = set()
+        for mention in mentions:
+            path = normalize_path(mention)
+            if path is not None:
+                keys.add(path)
+                keys.add(self.resolve(path))
+        return sorted(keys)
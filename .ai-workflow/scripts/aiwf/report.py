@@ -0,0 +1,152 @@
+"""
+Audit Reports - Machine-readable finding streams (NDJSON and SARIF)
+Used by local-audit.py and audit-file.py for --format ndjson|sarif
+
+Findings are written the moment they are reported and never truncated.
+NDJSON is one object per line: "finding", "note" and "error" records,
+closed by a "summary" record. SARIF 2.1.0 is streamed too: the document
+header is written up front and each result is appended as it arrives.
+Matched text of secret rules is masked so reports can go to CI logs.
+"""
+import json
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional, TextIO
+
+from aiwf.rules import Rule
+
+FORMATS = ("text", "ndjson", "sarif")
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_LEVELS = {"critical": "error", "warning": "warning"}
+TOOL_NAME = "aiwf-audit"
+
+def masked(rule: Rule, text: str) -> str:
+    """Matched text, with the value of secret hits hidden."""
+    if rule.id.startswith("secret-") and len(text) > 8:
+        return text[:4] + "…" + "*" * 8
+    return text
+
+def verdict(critical: int, warning: int) -> str:
+    return "fail" if critical else "warn" if warning else "pass"
+
+class FindingWriter(ABC):
+    """Base writer: counts findings; subclasses decide the encoding."""
+
+    def __init__(self, out: TextIO, rules: Iterable[Rule]):
+        self.out = out
+        self.rules = list(rules)
+        self.counts = {"critical": 0, "warning": 0}
+
+    def finding(self, path: str, rule: Rule, line: int, column: int, text: str):
+        self.counts[rule.severity] += 1
+        self._finding({
+            "rule": rule.id,
+            "severity": rule.severity,
+            "path": path,
+            "line": line,
+            "column": column,
+            "end_column": column + len(text),
+            "match": masked(rule, text),
+            "message": rule.title,
+        })
+
+    def note(self, path: Optional[str], message: str, error: bool = False):
+        """Something that is not a finding (skipped file, partial scan, read error)."""
+        self._note({"type": "error" if error else "note", "path": path, "message": message})
+
+    def close(self, **summary):
+        """Finish the stream; summary fields go into the closing record."""
+        summary = dict(summary, critical=self.counts["critical"], warning=self.counts["warning"],
+                       result=verdict(self.counts["critical"], self.counts["warning"]))
+        self._close(summary)
+        self.out.flush()
+
+    @abstractmethod
+    def _finding(self, record: dict):
+        """Write one finding record."""
+
+    @abstractmethod
+    def _note(self, record: dict):
+        """Write (or keep for the end) one note or error record."""
+
+    @abstractmethod
+    def _close(self, summary: dict):
+        """Write the closing summary."""
+
+class NdjsonWriter(FindingWriter):
+    def _write(self, record: dict):
+        self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.out.flush()
+
+    def _finding(self, record: dict):
+        self._write(dict(type="finding", **record))
+
+    def _note(self, record: dict):
+        self._write(record)
+
+    def _close(self, summary: dict):
+        self._write(dict(type="summary", **summary))
+
+class SarifWriter(FindingWriter):
+    def __init__(self, out: TextIO, rules: Iterable[Rule]):
+        super().__init__(out, rules)
+        self.first = True
+        self.notifications = []
+        driver = {
+            "name": TOOL_NAME,
+            "rules": [
+                {
+                    "id": rule.id,
+                    "shortDescription": {"text": rule.title},
+                    "defaultConfiguration": {"level": SARIF_LEVELS[rule.severity]},
+                }
+                for rule in self.rules
+            ],
+        }
+        # Everything up to the results array; results follow as they arrive
+        self.out.write('{"version": "2.1.0", "$schema": %s, "runs": [{"tool": %s, "results": [\n'
+                       % (json.dumps(SARIF_SCHEMA), json.dumps({"driver": driver}, ensure_ascii=False)))
+
+    def _finding(self, record: dict):
+        result = {
+            "ruleId": record["rule"],
+            "level": SARIF_LEVELS[record["severity"]],
+            "message": {"text": record["message"]},
+            "locations": [{
+                "physicalLocation": {
+                    "artifactLocation": {"uri": record["path"]},
+                    "region": {
+                        "startLine": record["line"],
+                        "startColumn": record["column"],
+                        "endColumn": record["end_column"],
+                        "snippet": {"text": record["match"]},
+                    },
+                },
+            }],
+        }
+        self.out.write(("" if self.first else ",\n") + json.dumps(result, ensure_ascii=False))
+        self.out.flush()
+        self.first = False
+
+    def _note(self, record: dict):
+        notification = {"level": "error" if record["type"] == "error" else "note",
+                        "message": {"text": record["message"]}}
+        if record["path"]:
+            notification["locations"] = [{"physicalLocation": {"artifactLocation": {"uri": record["path"]}}}]
+        self.notifications.append(notification)
+
+    def _close(self, summary: dict):
+        invocation = {
+            "executionSuccessful": True,
+            "toolExecutionNotifications": self.notifications,
+            "properties": summary,
+        }
+        self.out.write('\n], "invocations": [%s]}]}\n' % json.dumps(invocation, ensure_ascii=False))
+
+def finding_writer(fmt: str, out: TextIO, rules: Iterable[Rule]) -> Optional[FindingWriter]:
+    """Writer for a --format value; None for the human-readable text report."""
+    if fmt == "ndjson":
+        return NdjsonWriter(out, rules)
+    if fmt == "sarif":
+        return SarifWriter(out, rules)
+    return None
@@ -0,0 +1,174 @@
+"""
+Roadmap Reader - Streaming parser for the unchecked items of ROADMAP.md
+Used by recalibrate.py
+
+The file is read line by line and reading stops as soon as the answer is
+known: after the first N open items, after N items of the top priority
+when ranking by priority, or when the one requested section ends. Each
+item carries its section path (nested headings) and priority: a `P0`-`P9`
+tag or `[high]` / `(medium)` / `priority: low`, on the item or inherited
+from its heading. Results are kept in context/.roadmap-cache.json and
+reused while the file's mtime and size are unchanged.
+"""
+import json
+import os
+import re
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from aiwf.paths import CONTEXT_DIR
+
+CACHE_FILE = CONTEXT_DIR / ".roadmap-cache.json"
+
+# Bump when parsing or the result layout changes (invalidates cached results)
+CACHE_FORMAT = 2
+
+# Results kept in the cache (oldest dropped first)
+CACHE_ENTRIES = 16
+
+HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+UNCHECKED = re.compile(r'^\s*-\s*\[\s*\]\s*(.*)')
+PRIORITY = re.compile(r'\bP([0-9])\b|[\[(](high|medium|low)[\])]|priority:\s*(high|medium|low)', re.I)
+PRIORITY_WORDS = {"high": 1, "medium": 2, "low": 3}
+
+class Item(NamedTuple):
+    text: str
+    section: List[str]  # Enclosing headings, outermost first
+    priority: Optional[int]  # 0 is the most urgent; None if untagged
+    line: int  # 1-based
+
+    @property
+    def rank(self):
+        return (10 if self.priority is None else self.priority, self.line)
+
+def section_key(section: List[str]) -> str:
+    return " > ".join(section)
+
+def parse_priority(text: str) -> Optional[int]:
+    match = PRIORITY.search(text)
+    if not match:
+        return None
+    if match.group(1) is not None:
+        return int(match.group(1))
+    return PRIORITY_WORDS[(match.group(2) or match.group(3)).lower()]
+
+def open_items(lines, section: str = None) -> Iterator[Item]:
+    """
+    Unchecked items in file order. With section, only those under the first
+    heading of that name (any level, case-insensitive, priority tag left
+    out), stopping where its section ends.
+    """
+    headings = []  # (level, title, priority) of the open headings
+    wanted = section.lower() if section else None
+    inside = None  # Level of the wanted heading while inside its section
+
+    for line_no, line in enumerate(lines, 1):
+        if line.startswith('#'):
+            match = HEADING.match(line)
+            if match:
+                level = len(match.group(1))
+                if inside is not None and level <= inside:
+                    return  # The requested section is over
+                headings = [h for h in headings if h[0] < level]
+                title = match.group(2)
+                priority = parse_priority(title)
+                if priority is not None:
+                    title = " ".join(PRIORITY.sub(" ", title).split()) or title
+                headings.append((level, title, priority))
+                if wanted is not None and inside is None and title.lower() == wanted:
+                    inside = level
+                continue
+
+        if wanted is not None and inside is None:
+            continue
+        if '[' not in line:
+            continue
+        match = UNCHECKED.match(line)
+        if match:
+            text = match.group(1).strip()
+            priority = parse_priority(text)
+            if priority is None:
+                priority = next((h[2] for h in reversed(headings) if h[2] is not None), None)
+            yield Item(text, [h[1] for h in headings], priority, line_no)
+
+def select_items(items: Iterator[Item], top: int = 3, by_priority: bool = False,
+                 per_section: bool = False) -> Dict[str, List[Item]]:
+    """
+    The top items, grouped by section key ("" without per_section). Stops
+    pulling from items once no later item can change the result, which
+    only per_section prevents (a later heading may start a new section).
+    """
+    groups: Dict[str, List[Item]] = {}
+    for item in items:
+        group = groups.setdefault(section_key(item.section) if per_section else "", [])
+        if by_priority:
+            group.append(item)
+            group.sort(key=lambda i: i.rank)
+            del group[top:]
+        elif len(group) < top:
+            group.append(item)
+        if not per_section and len(group) >= top and (not by_priority or group[-1].priority == 0):
+            break  # Full, and nothing further down can outrank it
+    return groups
+
+class RoadmapCache:
+    """Selected items per (file, options), reused while the file's mtime and size are unchanged."""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("format") == CACHE_FORMAT and isinstance(data.get("entries"), dict):
+                return data["entries"]
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {}
+
+    def get(self, key: str, stamp: list) -> Optional[dict]:
+        entry = self._load().get(key)
+        if entry is not None and entry.get("stamp") == stamp:
+            return entry.get("result")
+        return None
+
+    def put(self, key: str, stamp: list, result: dict):
+        entries = self._load()
+        entries.pop(key, None)
+        entries[key] = {"stamp": stamp, "result": result}
+        while len(entries) > CACHE_ENTRIES:
+            del entries[next(iter(entries))]
+        tmp = self.path.with_name(self.path.name + f".{os.getpid()}")
+        try:
+            tmp.write_text(json.dumps({"format": CACHE_FORMAT, "entries": entries}))
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # Caching is best-effort; the file is parsed again next time
+
+def roadmap_items(path='ROADMAP.md', top: int = 3, by_priority: bool = False,
+                  per_section: bool = False, section: str = None,
+                  cache: Optional[RoadmapCache] = None) -> Dict[str, List[dict]]:
+    """
+    Top unchecked items of a roadmap as {section key: [item dicts]} (one ""
+    group without per_section). A missing file has no items.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {}
+    stamp = [st.st_mtime_ns, st.st_size]
+    key = json.dumps([os.path.abspath(path), top, by_priority, per_section, section])
+    if cache is not None:
+        result = cache.get(key, stamp)
+        if result is not None:
+            return result
+
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            groups = select_items(open_items(f, section), top, by_priority, per_section)
+    except OSError:
+        return {}
+    result = {name: [item._asdict() for item in items] for name, items in groups.items()}
+    if cache is not None:
+        cache.put(key, stamp, result)
+    return result
@@ -0,0 +1,398 @@
+"""
+Audit Rules - Compiled pattern engine shared by the pattern auditors
+Used by local-audit.py (staged diffs) and audit-file.py (single files)
+
+Every rule is compiled once, on the first scan. One combined regex walks
+the whole buffer to find candidate lines; only those lines are re-checked
+rule by rule, so a clean line costs a single regex pass instead of one
+search per rule.
+"""
+import hashlib
+import re
+import time
+from functools import cached_property
+from typing import Callable, Collection, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# scan_lines() batch bounds
+BATCH_LINES = 4096
+BATCH_CHARS = 1 << 20
+
+class Rule(NamedTuple):
+    """A single pattern check."""
+    id: str
+    severity: str  # "critical" | "warning"
+    icon: str
+    title: str  # Label used by audit-file.py ("Possible API key")
+    diff_title: str  # Label used by local-audit.py ("Possible API key found")
+    pattern: str
+    flags: int = 0
+    skip: Optional[str] = None  # Name of a GUARDS entry that suppresses the hit
+
+class Finding(NamedTuple):
+    """A rule hit, located in the scanned buffer."""
+    rule: Rule
+    line: int  # 1-based line number in the scanned buffer
+    column: int  # 1-based column within the checked line content
+    text: str  # Matched span
+
+def _secret_skip(line: str, lower: str) -> bool:
+    """Env lookups, examples and test fixtures are not real secrets."""
+    return 'process.env' in line or 'example' in lower or 'test' in lower
+
+def _debug_context(line: str, lower: str) -> bool:
+    return any(x in lower for x in ['test', 'spec', 'debug'])
+
+def _comment_line(line: str, lower: str) -> bool:
+    return line.strip().startswith('//')
+
+# Line predicates that suppress a hit, by name so raw hits can be cached and
+# re-filtered for either rule profile without rescanning
+GUARDS = {
+    "secret-context": _secret_skip,
+    "debug-context": _debug_context,
+    "comment-line": _comment_line,
+}
+
+# Bump when the raw hit layout or line numbering changes (invalidates cached hits)
+# 2: lone '\r' no longer ends a line (see normalize_newlines)
+HITS_FORMAT = 2
+
+def normalize_newlines(text: str) -> str:
+    """
+    Line breaks as git counts them: '\r\n' becomes '\n' and a lone '\r'
+    stays part of its line. Every scan whose raw hits can be cached goes
+    through this, so a blob gets the same line numbers from any tool.
+    """
+    return text.replace('\r\n', '\n')
+
+def decode_text(data: bytes) -> str:
+    """File or blob bytes as scanned text (UTF-8, see normalize_newlines)."""
+    return normalize_newlines(data.decode('utf-8', errors='replace'))
+
+def _secret(rule_id: str, pattern: str, name: str) -> Rule:
+    return Rule(rule_id, "critical", "🔐", f"Possible {name}", f"Possible {name} found",
+                pattern, re.IGNORECASE, "secret-context")
+
+# CRITICAL: Hardcoded secrets
+SECRET_RULES = [
+    _secret("secret-api-key", r'api[_-]?key\s*[=:]\s*["\'][^"\']{10,}["\']', "API key"),
+    _secret("secret-password", r'password\s*[=:]\s*["\'][^"\']+["\']', "Password"),
+    _secret("secret-generic", r'secret\s*[=:]\s*["\'][^"\']{10,}["\']', "Secret"),
+    _secret("secret-token", r'token\s*[=:]\s*["\'][^"\']{20,}["\']', "Token"),
+    _secret("secret-private-key", r'private[_-]?key', "Private key"),
+    _secret("secret-private-key-block", r'-----BEGIN (RSA |EC |DSA )?PRIVATE KEY-----', "Private key block"),
+]
+
+# CRITICAL: SQL injection patterns
+SQL_RULE = Rule("sql-injection", "critical", "💉", "Possible SQL injection", "Possible SQL injection",
+                r'\$\{.*\}.*(?:SELECT|INSERT|UPDATE|DELETE|DROP)', re.IGNORECASE)
+
+# WARNINGS
+CONSOLE_RULE = Rule("console-log", "warning", "📝", "console.log", "console.log found", r'console\.log')
+DEBUGGER_RULE = Rule("debugger", "warning", "🐛", "debugger statement", "debugger statement", r'debugger')
+TODO_RULE = Rule("todo", "warning", "📌", "TODO/FIXME", "TODO/FIXME found", r'TODO:|FIXME:|HACK:|XXX:')
+ESLINT_RULE = Rule("eslint-disable", "warning", "⚠️ ", "ESLint disabled", "ESLint disabled", r'eslint-disable')
+
+# Staged diffs: console.log is fine in lines that mention tests or debugging
+DIFF_RULES = SECRET_RULES + [
+    SQL_RULE,
+    CONSOLE_RULE._replace(skip="debug-context"),
+    DEBUGGER_RULE,
+    TODO_RULE,
+    ESLINT_RULE,
+]
+
+# Single files: test files drop console-log at the call site; commented-out debugger is ignored
+FILE_RULES = SECRET_RULES + [
+    SQL_RULE,
+    CONSOLE_RULE,
+    DEBUGGER_RULE._replace(skip="comment-line"),
+    TODO_RULE,
+    ESLINT_RULE,
+]
+
+def combine(rules: Sequence[Rule]) -> "re.Pattern":
+    """One alternation matching wherever any of the rules would."""
+    # Scoped inline flags keep each rule's case sensitivity inside the alternation
+    branches = [
+        f"(?{'i' if rule.flags & re.IGNORECASE else ''}:{rule.pattern})"
+        for rule in rules
+    ]
+    return re.compile("|".join(branches))
+
+# Profile row for the combined candidate search (one call per scanned buffer)
+PREFILTER = "(prefilter)"
+
+# Characters of the worst line kept in a profile
+WORST_LINE_CHARS = 120
+
+class RuleProfile:
+    """
+    Per-rule cumulative time, search count and slowest line (--profile).
+    Set on RuleEngine.profile; the engine then runs every rule on every
+    line (not just prefilter candidates) and times each search.
+    path/line_offset (or locations, for diff batches) turn the buffer line
+    number of the slowest search into path:line.
+    """
+
+    def __init__(self):
+        self.rules = {}  # rule id -> [seconds, calls, worst_seconds, worst_where, worst_line]
+        self.path = None
+        self.line_offset = 0
+        self.locations = None
+
+    def search(self, rule_id: str, regex, line: str, line_no: int):
+        started = time.perf_counter()
+        match = regex.search(line)
+        self.record(rule_id, time.perf_counter() - started, line_no, line)
+        return match
+
+    def record(self, rule_id: str, elapsed: float, line_no: int, line: str):
+        row = self.rules.get(rule_id)
+        if row is None:
+            row = self.rules[rule_id] = [0.0, 0, -1.0, None, None]
+        row[0] += elapsed
+        row[1] += 1
+        if elapsed > row[2]:
+            row[2] = elapsed
+            row[3] = self.where(line_no)
+            row[4] = line[:WORST_LINE_CHARS]
+
+    def where(self, line_no: int) -> str:
+        if self.locations is not None and 0 < line_no <= len(self.locations):
+            path, line_no = self.locations[line_no - 1]
+        else:
+            path, line_no = self.path, line_no + self.line_offset
+        return f"{path}:{line_no}" if path else f"line {line_no}"
+
+    def ranked(self) -> List[dict]:
+        """Rows ordered by cumulative time, slowest first."""
+        rows = [
+            {
+                "rule": rule_id,
+                "calls": calls,
+                "total_ms": round(seconds * 1000, 3),
+                "avg_us": round(seconds / calls * 1e6, 2) if calls else 0.0,
+                "worst_ms": round(worst * 1000, 3),
+                "worst_at": where,
+                "worst_line": line,
+            }
+            for rule_id, (seconds, calls, worst, where, line) in self.rules.items()
+        ]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def print_table(self, file=None):
+        rows = self.ranked()
+        print("\n⏱️  Rule profile (slowest first):", file=file)
+        print(f"   {'Rule':<26} {'Calls':>8} {'Total ms':>10} {'Avg µs':>11} {'Worst ms':>10}  Worst at", file=file)
+        for row in rows:
+            print(f"   {row['rule']:<26} {row['calls']:>8} {row['total_ms']:>10.2f} {row['avg_us']:>11.2f} "
+                  f"{row['worst_ms']:>10.3f}  {row['worst_at']}", file=file)
+        if rows:
+            print(f"   Slowest line for {rows[0]['rule']}: {rows[0]['worst_line']!r}", file=file)
+
+class RuleEngine:
+    """Scans text buffers against a fixed, precompiled rule list."""
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.profile = None  # RuleProfile while profiling
+        self.rules = list(rules)
+        self._by_id = {rule.id: rule for rule in self.rules}
+        self._subsets = {}  # frozenset of disabled ids -> combined matcher of the rest
+
+    # Compiled on first scan: runs answered from the findings cache, or with
+    # nothing to audit, never build the regexes.
+
+    @cached_property
+    def _compiled(self) -> List[Tuple[Rule, "re.Pattern"]]:
+        return [(rule, re.compile(rule.pattern, rule.flags)) for rule in self.rules]
+
+    @cached_property
+    def _combined(self) -> "re.Pattern":
+        return combine(self.rules)
+
+    def _combined_for(self, disabled: Collection[str]) -> "re.Pattern":
+        """Combined matcher without the disabled rules (built once per subset)."""
+        key = frozenset(disabled).intersection(self._by_id)
+        if not key:
+            return self._combined
+        matcher = self._subsets.get(key)
+        if matcher is None:
+            matcher = self._subsets[key] = combine([rule for rule in self.rules if rule.id not in key])
+        return matcher
+
+    def scan(
+        self,
+        text: str,
+        select: Optional[Callable[[str], Optional[str]]] = None,
+        disabled: Collection[str] = (),
+    ) -> Iterator[Finding]:
+        """
+        Yield findings for every line of text, in line order then rule order.
+        select maps a raw line to the content to check (None skips the line);
+        disabled holds rule ids to leave out for this buffer.
+        """
+        active = [(rule, regex) for rule, regex in self._compiled if rule.id not in disabled]
+        if not active:
+            return
+        candidates = self._candidates if self.profile is None else self._profiled_candidates
+        for line_no, line in candidates(text, self._combined_for(disabled)):
+            content = select(line) if select else line
+            if content is not None:
+                yield from self.check_line(content, line_no, active)
+
+    def _candidates(self, text: str, combined=None) -> Iterator[Tuple[int, str]]:
+        """Yield (line_number, line) for each line the combined matcher hits."""
+        search = (combined or self._combined).search
+        size = len(text)
+        pos = 0
+        line_no = 1
+        counted = 0
+
+        while pos <= size:
+            match = search(text, pos)
+            if match is None:
+                break
+            # pos is always a line start, so the candidate line begins at or after it
+            newline = text.rfind('\n', pos, match.start())
+            start = newline + 1 if newline >= 0 else pos
+            line_no += text.count('\n', counted, start)
+            counted = start
+            end = text.find('\n', start)
+            if end < 0:
+                end = size
+
+            yield line_no, text[start:end]
+
+            # Resume on the next line: every rule for this line gets checked
+            pos = end + 1
+
+    def _profiled_candidates(self, text: str, combined=None) -> Iterator[Tuple[int, str]]:
+        """
+        Profiling stand-in for _candidates(): the combined search is timed
+        as one pass over the buffer, then every line goes to the rules so
+        each rule's own cost (and its worst line) is measured.
+        """
+        started = time.perf_counter()
+        for _ in self._candidates(text, combined):
+            pass
+        self.profile.record(PREFILTER, time.perf_counter() - started, 1, text)
+        yield from enumerate(text.split('\n'), 1)
+
+    def scan_lines(
+        self,
+        items: Iterable[Tuple[str, int, str]],
+        disabled: Collection[str] = (),
+        batch_lines: int = BATCH_LINES,
+        batch_chars: int = BATCH_CHARS,
+        disabled_for: Optional[Callable[[str], Collection[str]]] = None,
+    ) -> Iterator[Tuple[str, Finding]]:
+        """
+        Yield (path, finding) for a stream of (path, line_number, content).
+        Lines are joined into bounded batches and scanned in one pass each,
+        so memory stays flat however long the stream is.
+        disabled_for(path) adds rule ids to leave out for that path; a batch
+        ends early where the set changes, so consecutive files of the same
+        type still share one pass.
+        """
+        locations = []
+        batch = []
+        size = 0
+        current = None
+        active_disabled = disabled
+        for path, line_no, content in items:
+            if disabled_for is not None and path != current:
+                current = path
+                wanted = set(disabled).union(disabled_for(path))
+                if wanted != active_disabled:
+                    if batch:
+                        yield from self._scan_batch(batch, locations, active_disabled)
+                        locations = []
+                        batch = []
+                        size = 0
+                    active_disabled = wanted
+            locations.append((path, line_no))
+            batch.append(content)
+            size += len(content) + 1
+            if len(batch) >= batch_lines or size >= batch_chars:
+                yield from self._scan_batch(batch, locations, active_disabled)
+                locations = []
+                batch = []
+                size = 0
+        if batch:
+            yield from self._scan_batch(batch, locations, active_disabled)
+
+    def rule(self, rule_id: str) -> Optional[Rule]:
+        return self._by_id.get(rule_id)
+
+    def _scan_batch(self, batch, locations, disabled):
+        if self.profile is not None:
+            self.profile.locations = locations
+        for finding in self.scan("\n".join(batch), disabled=disabled):
+            path, line_no = locations[finding.line - 1]
+            yield path, finding._replace(line=line_no)
+        if self.profile is not None:
+            self.profile.locations = None
+
+    def check_line(self, content: str, line_no: int, active=None) -> List[Finding]:
+        """Run each rule against one line of content."""
+        findings = []
+        lower = None
+        profile = self.profile
+        for rule, regex in active if active is not None else self._compiled:
+            if profile is None:
+                match = regex.search(content)
+            else:
+                match = profile.search(rule.id, regex, content, line_no)
+            if match is None:
+                continue
+            if rule.skip:
+                if lower is None:
+                    lower = content.lower()
+                if GUARDS[rule.skip](content, lower):
+                    continue
+            findings.append(Finding(rule, line_no, match.start() + 1, match.group(0)))
+        return findings
+
+    # ── Raw hits (cacheable) ──
+
+    @cached_property
+    def version(self) -> str:
+        """
+        Identifies the patterns and guards. Engines built from the same
+        patterns (DIFF_RULES and FILE_RULES) share a version, so cached
+        raw hits serve both.
+        """
+        spec = repr((HITS_FORMAT, sorted(GUARDS), [(r.id, r.pattern, r.flags) for r in self.rules]))
+        return hashlib.sha1(spec.encode()).hexdigest()[:16]
+
+    def raw_hits(self, text: str) -> List[list]:
+        """
+        Every rule hit in text with guards not yet applied:
+        [rule_id, line, column, matched_text, [guard names true for the line]].
+        """
+        hits = []
+        profile = self.profile
+        candidates = self._candidates if profile is None else self._profiled_candidates
+        for line_no, line in candidates(text):
+            guards = None
+            for rule, regex in self._compiled:
+                if profile is None:
+                    match = regex.search(line)
+                else:
+                    match = profile.search(rule.id, regex, line, line_no)
+                if match is None:
+                    continue
+                if guards is None:
+                    lower = line.lower()
+                    guards = [name for name, guard in GUARDS.items() if guard(line, lower)]
+                hits.append([rule.id, line_no, match.start() + 1, match.group(0), guards])
+        return hits
+
+    def from_hits(self, hits, disabled: Collection[str] = ()) -> Iterator[Finding]:
+        """Turn raw hits into this engine's findings (rule set + guards)."""
+        for rule_id, line_no, column, text, guards in hits:
+            rule = self._by_id.get(rule_id)
+            if rule is None or rule_id in disabled or (rule.skip and rule.skip in guards):
+                continue
+            yield Finding(rule, line_no, column, text)
@@ -0,0 +1,240 @@
+"""
+Repo Snapshot - Git and context-file state gathered in one go
+Used by context-sync.py (status, summary and --json all read one snapshot)
+
+Branch, upstream, ahead/behind and the number of changed paths come from a
+single `git status --porcelain=v2 --branch -z`; recent commits from one
+`git log`. Both git processes run at the same time, and SESSION.md /
+MVP_MASTER_LIST.md are indexed (aiwf.mdindex) while they work.
+
+Status output is streamed and only counted. Counting stops at a cap
+("1000+ files"), untracked files can be left out, and a status that takes
+longer than the timeout is killed, leaving a partial count. The repo's own
+untracked cache and fsmonitor settings are honoured; `fsmonitor=True` also
+turns on git's builtin fsmonitor daemon for the run.
+
+state_fingerprint() identifies that state without starting git (HEAD, the
+index and the context files' mtimes), so results derived from a snapshot can
+be cached until it changes.
+"""
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+from aiwf.mdindex import IndexStore, MarkdownIndex
+from aiwf.paths import CONTEXT_DIR, PROJECT_ROOT
+
+SESSION_FILE = CONTEXT_DIR / "SESSION.md"
+MVP_FILE = CONTEXT_DIR / "MVP_MASTER_LIST.md"
+
+# Commits kept in the snapshot (the summary shows fewer)
+RECENT_COMMITS = 5
+
+# Uncommitted entries counted before stopping (0 = count them all)
+MAX_CHANGES = int(os.environ.get("CONTEXT_SYNC_MAX_CHANGES", "1000"))
+# Seconds git status may take before a partial count is used (0 = wait)
+STATUS_TIMEOUT = float(os.environ.get("CONTEXT_SYNC_STATUS_TIMEOUT", "2"))
+# "no" leaves untracked files out of the count
+UNTRACKED = os.environ.get("CONTEXT_SYNC_UNTRACKED", "normal") != "no"
+# "1" runs status with git's builtin fsmonitor daemon
+FSMONITOR = os.environ.get("CONTEXT_SYNC_FSMONITOR", "0") == "1"
+
+READ_BYTES = 64 * 1024
+
+class ChangeCount(NamedTuple):
+    count: int
+    capped: bool = False  # Counting stopped at the cap; there may be more
+    timed_out: bool = False  # git status was killed before it finished
+
+    def __bool__(self):
+        return self.count > 0 or self.timed_out
+
+    @property
+    def partial(self) -> bool:
+        return self.capped or self.timed_out
+
+    def label(self) -> str:
+        """"37", or "1000+" when the count is a lower bound."""
+        return f"{self.count}+" if self.partial else str(self.count)
+
+class RepoSnapshot(NamedTuple):
+    branch: str  # "" when HEAD is detached (like `git branch --show-current`)
+    upstream: Optional[str]
+    ahead: int
+    behind: int
+    changes: ChangeCount  # Uncommitted entries, one per `git status` entry
+    commits: List[str]  # `git log --oneline`, newest first
+    session: Optional[MarkdownIndex]  # SESSION.md index (None if missing)
+    mvp: Optional[MarkdownIndex]  # MVP_MASTER_LIST.md index (None if missing)
+
+class StatusCounter:
+    """
+    Incremental parser of `git status --porcelain=v2 --branch -z` output.
+    Keeps the branch headers and counts entries; paths are never stored.
+    """
+
+    def __init__(self, cap: int = 0):
+        self.cap = cap
+        self.branch = ""
+        self.upstream = None
+        self.ahead = self.behind = 0
+        self.count = 0
+        self.capped = False
+        self._tail = b""
+        self._skip = False  # Next field is a rename's original path
+
+    def feed(self, data: bytes) -> bool:
+        """Consume a chunk; returns False once the cap is reached."""
+        fields = (self._tail + data).split(b"\0")
+        self._tail = fields.pop()
+        for field in fields:
+            if self._skip:
+                self._skip = False
+            elif field.startswith(b"#"):
+                self._header(field.decode(errors="replace"))
+            elif field:
+                self.count += 1
+                self._skip = field.startswith(b"2")
+                if self.cap and self.count >= self.cap:
+                    self.capped = True
+                    return False
+        return True
+
+    def _header(self, field: str):
+        parts = field.split(" ", 2)
+        if len(parts) < 3:
+            return
+        key, value = parts[1], parts[2]
+        if key == "branch.head":
+            self.branch = "" if value == "(detached)" else value
+        elif key == "branch.upstream":
+            self.upstream = value
+        elif key == "branch.ab":
+            a, b = value.split()
+            self.ahead, self.behind = int(a), -int(b)
+
+def git_dir(root=PROJECT_ROOT) -> Optional[Path]:
+    """The repository's .git directory (following a worktree's gitdir file)."""
+    dot_git = Path(root) / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    try:
+        content = dot_git.read_text().strip()
+    except OSError:
+        return None
+    if content.startswith("gitdir:"):
+        return (Path(root) / content[len("gitdir:"):].strip()).resolve()
+    return None
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def state_fingerprint(root=PROJECT_ROOT) -> str:
+    """
+    Cheap identity of the state a summary depends on: HEAD (and the ref it
+    points at), the git index, SESSION.md and MVP_MASTER_LIST.md.
+    Reads a few small files and stats; never runs git.
+    """
+    parts = []
+    gdir = git_dir(root)
+    if gdir is not None:
+        try:
+            common = gdir / (gdir / "commondir").read_text().strip()
+        except OSError:
+            common = gdir
+        head = _read(gdir / "HEAD") or ""
+        parts.append(head)
+        if head.startswith("ref:"):
+            ref = head[4:].strip()
+            # Loose ref if there is one, else whatever packed-refs says
+            parts.append(_read(common / ref) or _stat(common / "packed-refs"))
+        parts.append(_stat(gdir / "index"))
+    parts.append(_stat(SESSION_FILE))
+    parts.append(_stat(MVP_FILE))
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+def _read(path) -> Optional[str]:
+    try:
+        return path.read_text(errors="replace")
+    except OSError:
+        return None
+
+def head_branch(root=PROJECT_ROOT) -> str:
+    """Branch named by .git/HEAD ("" when detached); no git process."""
+    gdir = git_dir(root)
+    head = (_read(gdir / "HEAD") or "").strip() if gdir else ""
+    return head[len("ref: refs/heads/"):] if head.startswith("ref: refs/heads/") else ""
+
+def count_status(proc, cap: int = MAX_CHANGES, timeout: float = STATUS_TIMEOUT) -> Tuple[StatusCounter, bool]:
+    """Stream a status process into a StatusCounter; (counter, timed out)."""
+    import selectors
+
+    counter = StatusCounter(cap)
+    if proc is None:
+        return counter, False
+    deadline = time.monotonic() + timeout if timeout > 0 else None
+    timed_out = False
+    fd = proc.stdout.fileno()
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while True:
+            wait = None if deadline is None else deadline - time.monotonic()
+            if (wait is not None and wait <= 0) or not selector.select(wait):
+                timed_out = True
+                break
+            data = os.read(fd, READ_BYTES)
+            if not data or not counter.feed(data):
+                break
+    if proc.poll() is None:
+        proc.kill()  # Capped or out of time: the rest of the output isn't needed
+    proc.stdout.close()
+    proc.wait()
+    return counter, timed_out
+
+def take_snapshot(cwd=PROJECT_ROOT, max_changes: int = MAX_CHANGES, timeout: float = STATUS_TIMEOUT,
+                  untracked: bool = UNTRACKED, fsmonitor: bool = FSMONITOR) -> RepoSnapshot:
+    """Run the git queries concurrently and index the context files once."""
+    import subprocess  # Not loaded by runs answered from the summary cache
+
+    def start(args, text=True):
+        try:
+            return subprocess.Popen(["git"] + args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                    text=text, cwd=cwd)
+        except OSError:
+            return None
+
+    # --no-optional-locks: a read-only status must not rewrite the index (and its mtime)
+    status_args = ["--no-optional-locks"]
+    if fsmonitor:
+        status_args += ["-c", "core.fsmonitor=true"]
+    status_args += ["status", "--porcelain=v2", "--branch", "-z",
+                    "--untracked-files=" + ("normal" if untracked else "no")]
+    status = start(status_args, text=False)
+    log = start(["log", "--oneline", f"-{RECENT_COMMITS}"])
+
+    store = IndexStore()
+    session = store.get(SESSION_FILE)
+    mvp = store.get(MVP_FILE)
+    store.save()
+
+    counter, timed_out = count_status(status, max_changes, timeout)
+    log_out = log.communicate()[0].strip() if log else ""
+
+    # Headers come first, but a status killed early may not have sent them
+    branch = counter.branch if not timed_out or counter.branch else head_branch(cwd)
+    return RepoSnapshot(
+        branch=branch,
+        upstream=counter.upstream,
+        ahead=counter.ahead,
+        behind=counter.behind,
+        changes=ChangeCount(counter.count, counter.capped, timed_out),
+        commits=log_out.split("\n") if log_out else [],
+        session=session,
+        mvp=mvp,
+    )
@@ -0,0 +1,77 @@
+"""
+Audit Summary - Reader/writer for context/audit-logs/audit-summary.json
+Used by local-audit.py and audit-file.py (--profile runs) and aiwf.analytics
+
+The summary is one JSON document. Writes go to a temporary file that is
+then renamed over the original, so readers never see a half-written file.
+Read-modify-write updates hold summary_lock() so concurrent writers don't
+drop each other's changes.
+"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: updates are unlocked
+    fcntl = None
+
+from aiwf.paths import CONTEXT_DIR
+
+SUMMARY_FILE = CONTEXT_DIR / "audit-logs" / "audit-summary.json"
+
+# Profile runs kept in the summary (oldest dropped first)
+MAX_PROFILE_RUNS = 50
+
+@contextmanager
+def summary_lock(path=SUMMARY_FILE):
+    """Advisory lock serializing updates of the summary at path."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(f".{path.name}.lock"), "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+def load_summary(path=SUMMARY_FILE) -> dict:
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def save_summary(data: dict, path=SUMMARY_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".audit-summary.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def append_profile(tool: str, target: str, rows: list, path=SUMMARY_FILE) -> bool:
+    """Add one --profile run under "profiles"; returns False if it could not be saved."""
+    try:
+        with summary_lock(path):
+            data = load_summary(path)
+            runs = data.get("profiles")
+            if not isinstance(runs, list):
+                runs = []
+            runs.append({
+                "timestamp": datetime.now().isoformat(),
+                "tool": tool,
+                "target": target,
+                "rules": rows,
+            })
+            data["profiles"] = runs[-MAX_PROFILE_RUNS:]
+            save_summary(data, path)
+    except OSError:
+        return False
+    return True
@@ -0,0 +1,42 @@
+"""
+Tail Reader - Read append-only workflow logs from the end
+Used by recalibrate.py (SESSION_LOG.md)
+
+reverse_lines() seeks to the end of a file and reads it backwards in fixed
+blocks, yielding lines newest first. Finding the latest matching entry
+costs a block or two, however long the log has grown.
+"""
+import os
+from typing import Iterator
+
+BLOCK_SIZE = 8192
+
+def reverse_lines(path, block_size: int = BLOCK_SIZE, encoding: str = "utf-8",
+                  errors: str = "replace") -> Iterator[str]:
+    """
+    Lines of path, last first, without their line endings. A missing file
+    yields nothing. Decoding is per line; a newline byte never occurs inside
+    a UTF-8 sequence, so block edges can't split a character.
+    """
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return
+    with f:
+        pos = f.seek(0, os.SEEK_END)
+        carry = b""  # Start of a line that continues in the next block read
+        last_block = True
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + carry).split(b"\n")
+            if last_block:
+                last_block = False
+                if lines[-1] == b"":
+                    lines.pop()  # File ends with a newline: no empty last line
+            carry = lines[0]
+            for line in reversed(lines[1:]):
+                yield line.rstrip(b"\r").decode(encoding, errors)
+        if carry or not last_block:
+            yield carry.rstrip(b"\r").decode(encoding, errors)
@@ -0,0 +1,347 @@
+"""
+Prompt Tracker - PROMPT_TRACKER.log with an id -> latest status index
+Used by prompt-tracker.py (and its prompt-tracker.sh wrapper), local-audit.py
+and aiwf.promptindex
+
+PROMPT_TRACKER.log keeps its `ID|STATUS|TIMESTAMP|DESCRIPTION` lines, but
+is now append-only: a status change appends a new line for the prompt, and
+the last line of an id wins. An SQLite index under context/ maps every id
+to its latest status and the byte offset of that line, so updates and
+"latest open prompt" lookups cost one append and an indexed query instead
+of a rewrite of the whole file. Like aiwf.promptindex, the index remembers
+how far it has read, picks up lines appended by other writers and rebuilds
+itself when the file was rewritten.
+
+Every operation runs under an advisory lock (context/.prompt-tracker.lock).
+After each change the two-line show-compact summary is rendered to
+context/.prompt-tracker.status, which audit-watch.sh reads without
+starting any process.
+"""
+import hashlib
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: operations are unlocked
+    fcntl = None
+
+from aiwf.paths import CONTEXT_DIR
+
+TRACKER_FILE = CONTEXT_DIR / "PROMPT_TRACKER.log"
+
+# Kept next to the tracker log
+COUNTER_NAME = ".prompt-counter"
+INDEX_NAME = ".prompt-tracker.db"
+LOCK_NAME = ".prompt-tracker.lock"
+STATUS_NAME = ".prompt-tracker.status"
+
+# Bump when the table layout changes (the index is rebuilt)
+INDEX_FORMAT = 1
+
+STATUSES = ("CRAFTED", "SENT", "BUILDING", "DONE", "FAILED", "PARTIAL")
+
+# Prompts that may still change files
+OPEN_STATUSES = ("CRAFTED", "SENT", "BUILDING", "PARTIAL")
+
+# Prompts show-compact reports as in progress
+ACTIVE_STATUSES = ("CRAFTED", "SENT", "BUILDING")
+
+# Bytes checksummed at the start of the file and before the indexed offset
+CHECK_BYTES = 4096
+
+TIMEZONE = "America/New_York"
+
+RED = "\033[0;31m"
+GREEN = "\033[0;32m"
+YELLOW = "\033[1;33m"
+BLUE = "\033[0;34m"
+PURPLE = "\033[0;35m"
+GOLD = "\033[38;5;220m"
+DIM = "\033[2m"
+BOLD = "\033[1m"
+NC = "\033[0m"
+
+STATUS_EMOJI = {"CRAFTED": "📝", "SENT": "📤", "BUILDING": "🔨", "DONE": "✅", "FAILED": "❌", "PARTIAL": "⚠️"}
+STATUS_COLOR = {"CRAFTED": YELLOW, "SENT": BLUE, "BUILDING": PURPLE, "DONE": GREEN, "FAILED": RED, "PARTIAL": YELLOW}
+
+class Entry(NamedTuple):
+    id: str
+    status: str
+    timestamp: str  # Of the latest line for this id
+    description: str
+    offset: int  # Byte offset of that line
+
+def est_now() -> datetime:
+    try:
+        from zoneinfo import ZoneInfo
+        return datetime.now(ZoneInfo(TIMEZONE))
+    except Exception:  # No tz database: local time
+        return datetime.now().astimezone()
+
+def format_id(count: int, now: datetime = None) -> str:
+    """HHMM:MMDD:letter (EST military time, month/day, sequential letter)."""
+    now = now or est_now()
+    return f"{now:%H%M}:{now:%m%d}:{chr(count + 96)}"
+
+def _checksum(f, start: int, end: int) -> str:
+    f.seek(start)
+    return hashlib.sha1(f.read(end - start)).hexdigest()
+
+def _parse(line: bytes) -> Optional[Tuple[str, str, str, str]]:
+    parts = line.decode("utf-8", errors="replace").rstrip("\r\n").split("|", 3)
+    return tuple(parts) if len(parts) == 4 and parts[0] else None
+
+class PromptTracker:
+    """
+    The tracker log and its index. Methods take the lock, bring the index
+    up to date with the log, then answer or append.
+    """
+
+    def __init__(self, path=TRACKER_FILE):
+        self.path = path
+        self.index_path = path.parent / INDEX_NAME
+        self.lock_path = path.parent / LOCK_NAME
+        self.counter_path = path.parent / COUNTER_NAME
+        self.status_path = path.parent / STATUS_NAME
+        self._db = None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.index_path), timeout=5.0)
+            if db.execute("PRAGMA user_version").fetchone()[0] != INDEX_FORMAT:
+                db.executescript(
+                    "DROP TABLE IF EXISTS prompts; DROP TABLE IF EXISTS source;"
+                    "CREATE TABLE prompts (id TEXT PRIMARY KEY, status TEXT, timestamp TEXT,"
+                    " description TEXT, offset INTEGER);"
+                    "CREATE INDEX prompts_status ON prompts (status, offset);"
+                    "CREATE TABLE source (offset INTEGER, size INTEGER, mtime INTEGER, head TEXT, tail TEXT);"
+                    f"PRAGMA user_version = {INDEX_FORMAT};"
+                )
+            self._db = db
+        return self._db
+
+    @contextmanager
+    def locked(self):
+        """Hold the tracker lock with the index in sync with the log."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            self._sync()
+            yield self._conn()
+
+    def _sync(self):
+        """Index lines appended since the last sync; re-index a rewritten or truncated log."""
+        db = self._conn()
+        row = db.execute("SELECT offset, size, mtime, head, tail FROM source").fetchone()
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            if row is not None:
+                with db:
+                    db.execute("DELETE FROM prompts")
+                    db.execute("DELETE FROM source")
+                self._render()
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            if row is not None and row[1:3] == (st.st_size, st.st_mtime_ns):
+                return  # Unchanged since the index last saw it
+            offset = 0
+            if row is not None:
+                indexed, _, _, head, tail = row
+                if (st.st_size >= indexed
+                        and _checksum(f, 0, min(indexed, CHECK_BYTES)) == head
+                        and _checksum(f, max(0, indexed - CHECK_BYTES), indexed) == tail):
+                    offset = indexed
+            f.seek(offset)
+            data = f.read()
+            # Only whole lines; a line still being written waits for the next sync
+            end = data.rfind(b"\n") + 1
+            with db:
+                if offset == 0:
+                    db.execute("DELETE FROM prompts")
+                position = offset
+                for line in data[:end].split(b"\n")[:-1]:
+                    record = _parse(line)
+                    if record:
+                        self._put(db, record, position)
+                    position += len(line) + 1
+                self._save_source(db, f, offset + end, st)
+        self._render()
+
+    def _put(self, db, record, offset: int):
+        prompt_id, status, timestamp, description = record
+        db.execute("INSERT OR REPLACE INTO prompts VALUES (?, ?, ?, ?, ?)",
+                   (prompt_id, status, timestamp, description, offset))
+
+    def _save_source(self, db, f, offset: int, st):
+        db.execute("DELETE FROM source")
+        db.execute("INSERT INTO source VALUES (?, ?, ?, ?, ?)", (
+            offset, st.st_size, st.st_mtime_ns,
+            _checksum(f, 0, min(offset, CHECK_BYTES)),
+            _checksum(f, max(0, offset - CHECK_BYTES), offset),
+        ))
+
+    def _append(self, db, record):
+        """Append one line and index it (caller holds the lock)."""
+        line = "|".join(record).replace("\n", " ") + "\n"
+        with open(self.path, "ab+") as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(line.encode("utf-8"))
+            f.flush()
+            st = os.fstat(f.fileno())
+            with db:
+                self._put(db, record, offset)
+                self._save_source(db, f, st.st_size, st)
+        self._render()
+
+    # ── Counter and ids ──
+
+    def _counter(self) -> int:
+        try:
+            return int(self.counter_path.read_text().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def next_id(self) -> str:
+        """The id add() would assign next (nothing is consumed)."""
+        return format_id(self._counter() + 1)
+
+    def reset_counter(self):
+        self.counter_path.write_text("0\n")
+
+    # ── Changes ──
+
+    def add(self, description: str = "No description") -> str:
+        """Log a new CRAFTED prompt; returns its id."""
+        with self.locked() as db:
+            count = self._counter() + 1
+            self.counter_path.write_text(f"{count}\n")
+            now = est_now()
+            prompt_id = format_id(count, now)
+            self._append(db, (prompt_id, "CRAFTED", now.strftime("%Y-%m-%dT%H:%M:%S%z"), description))
+        return prompt_id
+
+    def set_status(self, prompt_id: str, status: str) -> bool:
+        """Record a new status for a tracked prompt; False if the id is unknown."""
+        with self.locked() as db:
+            row = db.execute("SELECT description FROM prompts WHERE id = ?", (prompt_id,)).fetchone()
+            if row is None:
+                return False
+            self._append(db, (prompt_id, status, est_now().strftime("%Y-%m-%dT%H:%M:%S%z"), row[0]))
+        return True
+
+    def complete_latest(self, statuses=("SENT", "BUILDING"), status: str = "DONE") -> Optional[str]:
+        """Move the most recently updated prompt in one of statuses to status; returns its id."""
+        with self.locked() as db:
+            entry = self._latest(db, statuses)
+            if entry is None:
+                return None
+            self._append(db, (entry.id, status, est_now().strftime("%Y-%m-%dT%H:%M:%S%z"), entry.description))
+        return entry.id
+
+    def clear(self) -> Optional[str]:
+        """Archive the log next to it, then empty it and reset the counter; returns the archive path."""
+        with self.locked():
+            if not self.path.exists() or not self.path.stat().st_size:
+                return None
+            archive = self.path.with_name(f"PROMPT_TRACKER_{datetime.now():%Y%m%d_%H%M%S}.archive")
+            archive.write_bytes(self.path.read_bytes())
+            self.path.write_bytes(b"")
+            self.reset_counter()
+            self._sync()
+        return str(archive)
+
+    # ── Queries ──
+
+    def _latest(self, db, statuses) -> Optional[Entry]:
+        row = db.execute(
+            "SELECT id, status, timestamp, description, offset FROM prompts"
+            f" WHERE status IN ({','.join('?' * len(statuses))}) ORDER BY offset DESC LIMIT 1",
+            list(statuses),
+        ).fetchone()
+        return Entry(*row) if row else None
+
+    def latest(self, statuses=ACTIVE_STATUSES) -> Optional[Entry]:
+        """Most recently updated prompt in one of statuses."""
+        with self.locked() as db:
+            return self._latest(db, statuses)
+
+    def recent(self, n: int = 10) -> List[Entry]:
+        """The n most recently updated prompts, newest first."""
+        with self.locked() as db:
+            return [Entry(*row) for row in db.execute(
+                "SELECT id, status, timestamp, description, offset FROM prompts ORDER BY offset DESC LIMIT ?", (n,))]
+
+    def statuses(self) -> Dict[str, Tuple[str, str]]:
+        """{id: (status, description)} for every tracked prompt."""
+        with self.locked() as db:
+            return {prompt_id: (status, description) for prompt_id, status, description
+                    in db.execute("SELECT id, status, description FROM prompts")}
+
+    def counts(self) -> Dict[str, int]:
+        with self.locked() as db:
+            return self._counts(db)
+
+    def _counts(self, db) -> Dict[str, int]:
+        return dict(db.execute("SELECT status, COUNT(*) FROM prompts GROUP BY status").fetchall())
+
+    def compact(self) -> List[str]:
+        """The show-compact lines (ANSI colored)."""
+        with self.locked() as db:
+            return self._compact(db)
+
+    def _compact(self, db) -> List[str]:
+        if db.execute("SELECT 1 FROM prompts LIMIT 1").fetchone() is None:
+            return ["🏷️  No prompts tracked yet"]
+        lines = []
+        done = self._latest(db, ("DONE",))
+        if done:
+            lines.append(f"  {GREEN}✅ Last Committed:{NC} {GOLD}{BOLD}{done.id}{NC}  {DIM}{_short(done.description, 35)}{NC}")
+        else:
+            lines.append(f"  {DIM}✅ Last Committed: none yet{NC}")
+        active = self._latest(db, ACTIVE_STATUSES)
+        if active:
+            lines.append(f"  {PURPLE}🔨 In Progress:{NC}    {GOLD}{BOLD}{active.id}{NC}  "
+                         f"{STATUS_COLOR.get(active.status, NC)}{active.status}{NC} "
+                         f"{STATUS_EMOJI.get(active.status, '❓')}  {DIM}{_short(active.description, 35)}{NC}")
+        else:
+            lines.append(f"  {DIM}🔨 In Progress:    none{NC}")
+        counts = self._counts(db)
+        failed, partial = counts.get("FAILED", 0), counts.get("PARTIAL", 0)
+        if failed or partial:
+            lines.append(f"  {RED}⚠️  Alerts: {failed} FAILED, {partial} PARTIAL{NC}")
+        return lines
+
+    def _render(self):
+        """Rewrite the status file read by audit-watch.sh (best-effort)."""
+        tmp = self.status_path.with_name(self.status_path.name + f".{os.getpid()}")
+        try:
+            tmp.write_text("\n".join(self._compact(self._conn())) + "\n")
+            os.replace(tmp, self.status_path)
+        except (OSError, sqlite3.Error):
+            pass
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+def _short(text: str, width: int) -> str:
+    return text[:width] + "..." if len(text) > width else text
+
+def read_tracker(path=TRACKER_FILE) -> Dict[str, Tuple[str, str]]:
+    """PROMPT_TRACKER.log as {id: (status, description)}, from the index."""
+    tracker = PromptTracker(path)
+    try:
+        return tracker.statuses()
+    except (OSError, sqlite3.Error):
+        return {}
+    finally:
+        tracker.close()
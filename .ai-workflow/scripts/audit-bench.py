@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Audit Benchmark - Throughput, memory and per-rule cost of the audit engine
+Measures local-audit.py's audit_diff() and audit-file.py's file scan
+
+Synthetic JS-like sources (seeded, so every run sees the same input) are
+generated at several sizes and finding densities. Each case reports lines/sec,
+peak Python memory and what every rule costs on its own. Results can be saved
+as JSON and compared against a stored baseline to catch regressions.
+
+Usage:
+  audit-bench.py                              # 1k..1M lines, all profiles
+  audit-bench.py --sizes 1000,10000 --profiles typical
+  audit-bench.py --output results.json        # Save results
+  audit-bench.py --save-baseline              # Store as the baseline
+  audit-bench.py --baseline                   # Compare, exit 1 on regression
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# Benchmarks measure the engine, not the findings cache or the per-file budget
+os.environ["AUDIT_CACHE"] = "0"
+os.environ["AUDIT_FILE_MAX_SECONDS"] = "0"
+os.environ["AUDIT_FILE_MAX_BYTES"] = str(1 << 40)
+
+from aiwf.fileaudit import ENGINE as FILE_ENGINE, scan_file
+from aiwf.paths import CONTEXT_DIR, SCRIPT_DIR
+from aiwf.rules import RuleEngine
+
+DEFAULT_BASELINE = CONTEXT_DIR / "audit-logs" / "bench-baseline.json"
+RESULTS_FORMAT = 1
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+QUICK_SIZES = [1_000, 10_000]
+
+# Share of lines carrying a secret / TODO / console.log
+PROFILES = {
+    "clean": (0.0, 0.0, 0.0),
+    "typical": (0.0005, 0.005, 0.01),
+    "dense": (0.01, 0.05, 0.10),
+}
+
+# Lines per synthetic file in generated diffs
+DIFF_FILE_LINES = 2_000
+
+FILLER = [
+    "const {name} = require('./{name}');",
+    "function {name}(a, b) {{",
+    "  return a.map((x) => x * {n}).filter(Boolean);",
+    "  if (!{name}) throw new Error('missing {name}');",
+    "  const result = await fetch(`/api/{name}/${{id}}`);",
+    "}}",
+    "",
+    "// Compute the {name} total for the current user",
+    "export default {{ {name}, version: '{n}.0.0' }};",
+    "  items.forEach((item) => {{ total += item.{name}; }});",
+]
+SECRETS = [
+    "const apiKey = 'sk_live_{hex}';",
+    "api_key = \"{hex}\"",
+    "const password = \"hunter{n}\";",
+    "token: '{hex}{hex}'",
+]
+TODOS = ["// TODO: handle {name} errors", "  // FIXME: {name} is slow", "/* HACK: {name} */"]
+CONSOLES = ["  console.log('{name}', {name});", "console.log(`${{{name}}}`);"]
+
+def load_local_audit():
+    """Import local-audit.py (its name is not a valid module name)."""
+    spec = importlib.util.spec_from_file_location("local_audit", SCRIPT_DIR / "local-audit.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def generate_lines(count: int, profile: str, seed: int = 1) -> list:
+    """Deterministic source lines with the profile's finding densities."""
+    secret_rate, todo_rate, console_rate = PROFILES[profile]
+    rnd = random.Random(f"{seed}:{profile}:{count}")
+    lines = []
+    for i in range(count):
+        roll = rnd.random()
+        if roll < secret_rate:
+            template = rnd.choice(SECRETS)
+        elif roll < secret_rate + todo_rate:
+            template = rnd.choice(TODOS)
+        elif roll < secret_rate + todo_rate + console_rate:
+            template = rnd.choice(CONSOLES)
+        else:
+            template = rnd.choice(FILLER)
+        lines.append(template.format(name=f"item{i % 97}", n=i % 13, hex=f"{rnd.getrandbits(96):024x}"))
+    return lines
+
+def diff_lines(lines: list) -> list:
+    """Unified diff adding lines as a series of new files."""
+    diff = []
+    for start in range(0, len(lines), DIFF_FILE_LINES):
+        chunk = lines[start:start + DIFF_FILE_LINES]
+        path = f"src/gen/file{start // DIFF_FILE_LINES}.js"
+        diff += [
+            f"diff --git a/{path} b/{path}",
+            "new file mode 100644",
+            f"index {'0' * 40}..{start:040x}",
+            "--- /dev/null",
+            f"+++ b/{path}",
+            f"@@ -0,0 +1,{len(chunk)} @@",
+        ]
+        diff += ["+" + line for line in chunk]
+    return diff
+
+def measure(run, repeat: int, memory: bool):
+    """Best wall time over repeat runs, plus peak traced memory of one more run."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, peak, result
+
+def rule_costs(engine: RuleEngine, text: str) -> dict:
+    """Seconds each rule takes when it is the only rule scanning text."""
+    costs = {}
+    for rule in engine.rules:
+        single = RuleEngine([rule])
+        started = time.perf_counter()
+        single.raw_hits(text)
+        costs[rule.id] = round(time.perf_counter() - started, 6)
+    return costs
+
+def bench_case(local_audit, count: int, profile: str, args) -> list:
+    lines = generate_lines(count, profile, args.seed)
+    text = "\n".join(lines)
+    results = []
+
+    # local-audit.py: audit_diff() over a streamed diff of new files
+    diff = diff_lines(lines)
+    seconds, peak, issues = measure(lambda: local_audit.audit_diff(iter(diff)), args.repeat, args.memory)
+    results.append(case_result("audit_diff", profile, count, seconds, peak,
+                               len(issues["critical"]) + len(issues["warning"]),
+                               rule_costs(local_audit.ENGINE, text) if args.rules else None))
+    del diff
+
+    # audit-file.py: scan of one file on disk
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.js")
+        with open(path, "w") as f:
+            f.write(text)
+        seconds, peak, (issues, _) = measure(lambda: scan_file(path), args.repeat, args.memory)
+    results.append(case_result("audit_file", profile, count, seconds, peak,
+                               len(issues["critical"]) + len(issues["warning"]),
+                               rule_costs(FILE_ENGINE, text) if args.rules else None))
+    return results
+
+def case_result(entry, profile, count, seconds, peak, findings, rules) -> dict:
+    return {
+        "entry": entry,
+        "profile": profile,
+        "lines": count,
+        "seconds": round(seconds, 6),
+        "lines_per_sec": round(count / seconds) if seconds > 0 else None,
+        "peak_bytes": peak,
+        "findings": findings,
+        "rules": rules,
+    }
+
+def case_key(result: dict) -> tuple:
+    return (result["entry"], result["profile"], result["lines"])
+
+def print_result(result: dict):
+    peak = f"{result['peak_bytes'] / (1024 * 1024):8.1f} MiB" if result["peak_bytes"] is not None else "        -"
+    print(f"  {result['entry']:<11} {result['profile']:<8} {result['lines']:>9,} lines  "
+          f"{result['lines_per_sec'] or 0:>11,} lines/s  {peak}  {result['findings']:>7,} findings")
+    if result["rules"]:
+        ranked = sorted(result["rules"].items(), key=lambda item: item[1], reverse=True)[:3]
+        print("      slowest rules: " + ", ".join(f"{rule_id} {cost * 1000:.1f}ms" for rule_id, cost in ranked))
+
+def compare(results: list, baseline: dict, tolerance: float) -> int:
+    """Print throughput/memory changes against baseline; returns the regression count."""
+    previous = {case_key(result): result for result in baseline.get("results", [])}
+    regressions = 0
+    print(f"\n📐 Against baseline ({baseline.get('created', 'unknown date')}, tolerance {tolerance:.0%}):")
+    for result in results:
+        old = previous.get(case_key(result))
+        if not old or not old.get("lines_per_sec") or not result["lines_per_sec"]:
+            continue
+        change = result["lines_per_sec"] / old["lines_per_sec"] - 1
+        slower = change < -tolerance
+        regressions += slower
+        icon = "❌" if slower else "✅"
+        line = f"  {icon} {result['entry']:<11} {result['profile']:<8} {result['lines']:>9,} lines  {change:+.1%} lines/s"
+        if result["peak_bytes"] and old.get("peak_bytes"):
+            line += f"  {result['peak_bytes'] / old['peak_bytes'] - 1:+.1%} memory"
+        print(line)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the audit engine on synthetic diffs and files")
+    parser.add_argument("--sizes", help="Comma-separated line counts (default: 1000,10000,100000,1000000)")
+    parser.add_argument("--quick", action="store_true", help="Only 1k and 10k lines")
+    parser.add_argument("--profiles", default=",".join(PROFILES), help="Comma-separated finding densities: " + ", ".join(PROFILES))
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best is kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="Skip the traced peak-memory run")
+    parser.add_argument("--no-rules", dest="rules", action="store_false", help="Skip per-rule cost")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON instead of a table")
+    parser.add_argument("--save-baseline", nargs="?", type=Path, const=DEFAULT_BASELINE, metavar="PATH",
+                        help=f"Store results as the baseline (default: {DEFAULT_BASELINE.name} in audit-logs/)")
+    parser.add_argument("--baseline", nargs="?", type=Path, const=DEFAULT_BASELINE, metavar="PATH",
+                        help="Compare against a baseline; exit 1 if any case is slower than --tolerance")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed throughput drop (default: 0.15)")
+    args = parser.parse_args()
+
+    sizes = QUICK_SIZES if args.quick else DEFAULT_SIZES
+    if args.sizes:
+        sizes = [int(size.replace("_", "")) for size in args.sizes.split(",") if size]
+    profiles = [profile for profile in args.profiles.split(",") if profile]
+    unknown = [profile for profile in profiles if profile not in PROFILES]
+    if unknown:
+        parser.error(f"unknown profile(s): {', '.join(unknown)}")
+
+    local_audit = load_local_audit()
+    if not args.json:
+        print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+        print(f"⏱️  Audit Benchmark (rules {FILE_ENGINE.version[:10]}, best of {args.repeat})")
+        print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+
+    results = []
+    for count in sizes:
+        for profile in profiles:
+            for result in bench_case(local_audit, count, profile, args):
+                results.append(result)
+                if not args.json:
+                    print_result(result)
+
+    report = {
+        "format": RESULTS_FORMAT,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "engine_version": FILE_ENGINE.version,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2) + "\n")
+            if not args.json:
+                print(f"\n💾 Results saved to {path}")
+
+    if args.baseline:
+        try:
+            baseline = json.loads(args.baseline.read_text())
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not read baseline {args.baseline}: {e}")
+            sys.exit(2)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {regressions} case(s) slower than baseline")
+            sys.exit(1)
+        print("\n✅ No throughput regressions")
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,16 @@
 """
 Single File Auditor - Checks a specific file for issues
 Used by audit-watch.sh for real-time feedback
+
+Accepts several paths (or a NUL-separated list on stdin with -0); batches
+are scanned on a process pool and reported grouped by file. With --server
+the scan is delegated to a running audit-server.py. With --batches one
+process serves a whole watch session: audit-watch.sh writes each batch to
+its stdin and reads the verdict back, so a save starts no interpreter, and
+keeps an IncrementalScanner so a save only rescans the lines it changed.
 """
 import sys
 import os
-import re
 
 # Colors for terminal output
 class Colors:
@@ -15,65 +21,22 @@ class Colors:
     BLUE = '\033[0;34m'
     NC = '\033[0m'  # No Color
 
-def audit_file(filepath):
-    """Run pattern-based security and quality checks on a single file."""
-    if not os.path.exists(filepath):
-        return
-
-    # Skip test files for some checks
-    is_test = any(x in filepath.lower() for x in ['test', 'spec', '__tests__', 'fixtures'])
-
-    try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-    except Exception as e:
-        print(f"{Colors.RED}❌ Could not read file: {e}{Colors.NC}")
-        return
-
-    lines = content.split('\n')
-    issues = {"critical": [], "warning": []}
-
-    for i, line in enumerate(lines, 1):
-        line_lower = line.lower()
-
-        # CRITICAL: Hardcoded secrets
-        secret_patterns = [
-            (r'api[_-]?key\s*[=:]\s*["\'][^"\']{10,}["\']', "API key"),
-            (r'password\s*[=:]\s*["\'][^"\']+["\']', "Password"),
-            (r'secret\s*[=:]\s*["\'][^"\']{10,}["\']', "Secret"),
-            (r'token\s*[=:]\s*["\'][^"\']{20,}["\']', "Token"),
-            (r'private[_-]?key', "Private key"),
-            (r'-----BEGIN (RSA |EC |DSA )?PRIVATE KEY-----', "Private key block"),
-        ]
-
-        for pattern, name in secret_patterns:
-            if re.search(pattern, line, re.IGNORECASE):
-                if 'process.env' not in line and 'example' not in line_lower and 'test' not in line_lower:
-                    issues["critical"].append(f"🔐 L{i}: Possible {name}")
-
-        # CRITICAL: SQL injection patterns
-        if re.search(r'\$\{.*\}.*(?:SELECT|INSERT|UPDATE|DELETE|DROP)', line, re.IGNORECASE):
-            issues["critical"].append(f"💉 L{i}: Possible SQL injection")
+# Below this many files a process pool costs more than it saves
+PARALLEL_MIN_FILES = 4
 
-        # WARNING: Console.log (skip test files)
-        if 'console.log' in line and not is_test:
-            issues["warning"].append(f"📝 L{i}: console.log")
+def scan_file(filepath, incremental=None):
+    """Scan one file locally (the rule engine is only loaded when needed)."""
+    from aiwf.fileaudit import scan_file as scan
+    return scan(filepath, incremental=incremental)
 
-        # WARNING: Debugger statements
-        if 'debugger' in line and not line.strip().startswith('//'):
-            issues["warning"].append(f"🐛 L{i}: debugger statement")
-
-        # WARNING: TODO/FIXME/HACK (info only)
-        if any(tag in line for tag in ['TODO:', 'FIXME:', 'HACK:', 'XXX:']):
-            issues["warning"].append(f"📌 L{i}: TODO/FIXME")
-
-        # WARNING: Disabled eslint rules
-        if 'eslint-disable' in line:
-            issues["warning"].append(f"⚠️  L{i}: ESLint disabled")
-
-    # Print results
+def print_issues(issues):
+    """Print the critical/warning report for one file."""
     total_issues = len(issues["critical"]) + len(issues["warning"])
 
+    # Skipped (binary) or partially scanned (over budget) files
+    for note in issues.get("notes", []):
+        print(f"{Colors.BLUE}{note}{Colors.NC}")
+
     if total_issues == 0:
         print(f"{Colors.GREEN}✅ No issues found{Colors.NC}")
         return
@@ -92,13 +55,225 @@ def audit_file(filepath):
 
     print()
 
+def audit_file(filepath, result=None, incremental=None):
+    """Run pattern-based security and quality checks on a single file."""
+    issues, error = result if result is not None else scan_file(filepath, incremental)
+    if error:
+        print(f"{Colors.RED}❌ Could not read file: {error}{Colors.NC}")
+        return
+    if issues is None:
+        return
+    print_issues(issues)
+
+def scan_via_server(paths):
+    """Ask a running audit-server.py for results; None if it isn't reachable."""
+    from aiwf.auditd import request
+    reply = request({"op": "audit", "cwd": os.getcwd(), "paths": paths})
+    if not reply or len(reply.get("results", [])) != len(paths):
+        return None
+    return [tuple(result) for result in reply["results"]]
+
+def scan_files(paths, jobs=None, incremental=None):
+    """
+    Yield (issues, error) per path, in order, on a process pool when the batch
+    is big enough. Serial scans reuse incremental's previous versions.
+    """
+    if len(paths) < PARALLEL_MIN_FILES or jobs == 1:
+        yield from (scan_file(path, incremental) for path in paths)
+        return
+
+    from aiwf.fileaudit import scan_file as scan
+    from concurrent.futures import ProcessPoolExecutor
+    workers = min(jobs or os.cpu_count() or 1, len(paths))
+    pool = None
+    try:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(scan, paths, chunksize=max(1, len(paths) // (workers * 4)))
+    except (OSError, NotImplementedError):
+        # No multiprocessing support here (e.g. no /dev/shm) - scan serially
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        yield from (scan_file(path, incremental) for path in paths)
+        return
+    with pool:
+        yield from results
+
+def emit_result(writer, path, result):
+    """Stream one file's result to an NDJSON/SARIF writer, untruncated."""
+    from aiwf.fileaudit import ENGINE
+    issues, error = result
+    if error:
+        writer.note(path, f"Could not read file: {error}", error=True)
+        return
+    if issues is None:
+        return
+    for note in issues.get("notes", []):
+        writer.note(path, note)
+    for rule_id, line, column, text in issues.get("findings", []):
+        writer.finding(path, ENGINE.rule(rule_id), line, column, text)
+
+def streamed(paths, results, writers):
+    """Pass results through, handing each to the writers as soon as it arrives."""
+    for path, result in zip(paths, results):
+        for writer in writers:
+            emit_result(writer, path, result)
+        yield result
+
+def audit_files(paths, jobs=None, results=None, incremental=None):
+    """Audit a batch of files and print one report grouped by file."""
+    if results is None:
+        results = scan_files(paths, jobs, incremental)
+
+    clean = []
+    with_critical = 0
+    with_warnings = 0
+    for path, (issues, error) in zip(paths, results):
+        if error:
+            print(f"{Colors.BLUE}━━━ 📄 {path}{Colors.NC}")
+            print(f"{Colors.RED}❌ Could not read file: {error}{Colors.NC}")
+            continue
+        if issues is None:
+            continue  # Deleted since the change event
+        if not issues["critical"] and not issues["warning"] and not issues.get("notes"):
+            clean.append(path)
+            continue
+        with_critical += bool(issues["critical"])
+        with_warnings += bool(issues["warning"])
+        print(f"{Colors.BLUE}━━━ 📄 {path}{Colors.NC}")
+        print_issues(issues)
+
+    if clean:
+        print(f"{Colors.GREEN}✅ {len(clean)} file(s) clean{Colors.NC}")
+    print(f"📊 Batch: {len(paths)} file(s), {with_critical} with critical issues, {with_warnings} with warnings")
+
+def read_null_separated(stream):
+    """Read a NUL-separated path list (e.g. from find -print0)."""
+    data = stream.read()
+    return [path for path in data.split('\0') if path]
+
+def read_batches(fd=0):
+    """
+    Yield path lists from a NUL-separated stream where an empty entry (two
+    NULs in a row) ends a batch. Stops at end of input.
+    """
+    pending = b""
+    batch = []
+    while True:
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            return
+        pending += chunk
+        *entries, pending = pending.split(b"\0")
+        for entry in entries:
+            if entry:
+                batch.append(os.fsdecode(entry))
+            else:
+                yield list(dict.fromkeys(batch))
+                batch = []
+
+def audit_batch(paths, args, incremental=None):
+    """Scan, stream and print one batch; returns the verdict (pass | warn | fail)."""
+    from aiwf.report import verdict
+
+    results = scan_via_server(paths) if args.server else None
+
+    writers = []
+    report_file = None
+    if args.format != "text" or args.report:
+        from aiwf.fileaudit import ENGINE
+        from aiwf.report import NdjsonWriter, finding_writer
+        if args.format != "text":
+            writers.append(finding_writer(args.format, sys.stdout, ENGINE.rules))
+        if args.report:
+            report_file = open(args.report, "w")
+            writers.append(NdjsonWriter(report_file, ENGINE.rules))
+        if results is None:
+            results = scan_files(paths, args.jobs, incremental)
+        results = streamed(paths, results, writers)
+
+    if args.format != "text":
+        for _ in results:
+            pass  # The writers did the reporting
+    elif len(paths) == 1:
+        audit_file(paths[0], next(iter(results)) if results else None, incremental)
+    else:
+        audit_files(paths, jobs=args.jobs, results=results, incremental=incremental)
+
+    for writer in writers:
+        writer.close(files=len(paths))
+    if report_file is not None:
+        report_file.close()
+    sys.stdout.flush()
+    if not writers:
+        return "pass"
+    return verdict(writers[-1].counts["critical"], writers[-1].counts["warning"])
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: audit-file.py <filepath>")
+    import argparse
+    from aiwf.report import FORMATS
+    parser = argparse.ArgumentParser(description="Audit files for secrets and code-quality issues")
+    parser.add_argument("paths", nargs="*", help="Files to audit")
+    parser.add_argument("-0", "--null", action="store_true", help="Also read a NUL-separated path list from stdin")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes for batches (default: CPU count)")
+    parser.add_argument("--server", action="store_true", help="Use a running audit-server.py (falls back to local scan)")
+    parser.add_argument("--format", choices=FORMATS, default="text",
+                        help="text report (default), or stream every finding as NDJSON / SARIF")
+    parser.add_argument("--report", metavar="FILE",
+                        help="Also stream NDJSON findings to FILE (e.g. for audit-watch.sh's panel)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time every rule (scans locally and serially, no cache) and record it in audit-summary.json")
+    parser.add_argument("--batches", action="store_true",
+                        help="Serve batches from stdin until it closes (NUL-separated paths, an empty one ends a batch)")
+    parser.add_argument("--status-fd", type=int, metavar="FD",
+                        help="--batches: write each batch's verdict (pass | warn | fail) as a line to this fd")
+    args = parser.parse_args()
+
+    if args.batches:
+        if not args.report:
+            parser.error("--batches needs --report (the verdict comes from its counts)")
+        from aiwf.fileaudit import IncrementalScanner
+        status = os.fdopen(args.status_fd, "w", buffering=1) if args.status_fd is not None else None
+        # Without the audit server this process sees every save, so it keeps the last versions
+        incremental = IncrementalScanner()
+        for paths in read_batches():
+            try:
+                result = audit_batch(paths, args, incremental) if paths else "pass"
+            except Exception as e:
+                # One bad batch must not end the watch session
+                print(f"{Colors.RED}❌ Audit failed: {e}{Colors.NC}")
+                result = "error"
+            if status is not None:
+                status.write(result + "\n")
+        return
+
+    paths = list(args.paths)
+    if args.null:
+        paths.extend(read_null_separated(sys.stdin))
+    paths = list(dict.fromkeys(paths))  # De-duplicate, keep order
+
+    if not paths:
+        print("Usage: audit-file.py <filepath> [filepath ...]")
+        print("       ... | audit-file.py -0")
         sys.exit(1)
 
-    filepath = sys.argv[1]
-    audit_file(filepath)
+    profile = None
+    if args.profile:
+        # Every rule has to run in this process for its time to be measured
+        os.environ["AUDIT_CACHE"] = "0"
+        from aiwf.fileaudit import ENGINE
+        from aiwf.rules import RuleProfile
+        profile = ENGINE.profile = RuleProfile()
+        args.server = False
+        args.jobs = 1
+
+    audit_batch(paths, args)
+
+    if profile is not None:
+        from aiwf.summary import append_profile
+        out = sys.stderr if args.format != "text" else sys.stdout
+        profile.print_table(file=out)
+        if not append_profile("audit-file", f"{len(paths)} file(s)", profile.ranked()):
+            print("   ⚠️  Could not update audit-summary.json", file=out)
 
 if __name__ == "__main__":
     main()
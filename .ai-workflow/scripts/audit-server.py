@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Audit Server - Keeps the file auditor warm on a local Unix socket
+Started by audit-watch.sh; audit-file.py --server is the client.
+
+Usage:
+  audit-server.py start [--background]   Serve until stopped
+  audit-server.py stop                   Ask a running server to exit
+  audit-server.py stats [--json]         Requests, cache hits, reused lines, p50/p99 latency
+  audit-server.py cache [--json|--clear] Findings cache hit/miss counters
+"""
+import json
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from aiwf.auditd import AuditServer, request, socket_path
+from aiwf.cache import FindingsCache
+
+def start(background: bool) -> int:
+    path = socket_path()
+    if request({"op": "stats"}, path, timeout=0.5) is not None:
+        print(f"✅ Audit server already running ({path})")
+        return 0
+
+    if background:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "start"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        # Wait until it answers so the caller can use it straight away
+        for _ in range(50):
+            if request({"op": "stats"}, path, timeout=0.2) is not None:
+                print(f"✅ Audit server started ({path})")
+                return 0
+            time.sleep(0.05)
+        print("❌ Audit server did not come up")
+        return 1
+
+    server = AuditServer(path)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+def stop() -> int:
+    if request({"op": "shutdown"}) is None:
+        print("ℹ️  Audit server is not running")
+        return 0
+    print("🛑 Audit server stopped")
+    return 0
+
+def stats(as_json: bool) -> int:
+    reply = request({"op": "stats"})
+    if reply is None:
+        print("ℹ️  Audit server is not running")
+        return 1
+    if as_json:
+        print(json.dumps(reply))
+        return 0
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print(f"🔍 Audit Server (PID {reply['pid']}, up {reply['uptime_s']}s)")
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print(f"📨 Requests:    {reply['requests']}")
+    print(f"🎯 Cache hits:  {reply['cache_hits']} (misses: {reply['cache_misses']}, files: {reply['cached_files']})")
+    print(f"✂️  Lines:       {reply['lines_scanned']} rescanned • {reply['lines_reused']} reused from previous versions")
+    print(f"⏱️  Latency:     p50 {reply['p50_ms']} ms • p99 {reply['p99_ms']} ms")
+    return 0
+
+def cache(as_json: bool, clear: bool) -> int:
+    findings_cache = FindingsCache()
+    if clear:
+        findings_cache.clear()
+        print("🧹 Findings cache cleared")
+        return 0
+    stats = findings_cache.stats()
+    if as_json:
+        print(json.dumps(stats))
+        return 0
+    if not stats:
+        print("ℹ️  Findings cache unavailable")
+        return 1
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print("🗃️  Findings Cache (shared by watch, pre-commit, pre-push)")
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print(f"🎯 Hits:      {stats['hits']} (misses: {stats['misses']}, hit rate: {stats['hit_rate']:.0%})")
+    print(f"📦 Entries:   {stats['entries']} • {stats['bytes'] // 1024} KiB of {stats['max_bytes'] // 1024} KiB")
+    print(f"♻️  Evictions: {stats['evictions']}")
+    return 0
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Persistent audit server for audit-file.py")
+    parser.add_argument("command", choices=["start", "stop", "stats", "cache"])
+    parser.add_argument("--background", action="store_true", help="Detach and return once the server answers")
+    parser.add_argument("--json", action="store_true", help="Output stats as JSON")
+    parser.add_argument("--clear", action="store_true", help="With 'cache': drop all cached findings")
+    args = parser.parse_args()
+
+    if args.command == "start":
+        sys.exit(start(args.background))
+    elif args.command == "stop":
+        sys.exit(stop())
+    elif args.command == "cache":
+        sys.exit(cache(args.json, args.clear))
+    else:
+        sys.exit(stats(args.json))
+
+if __name__ == "__main__":
+    main()
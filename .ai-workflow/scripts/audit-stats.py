@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Audit Stats - Questions about audit.log, answered from audit-summary.json
+Counters are kept by aiwf.analytics
+
+Each run first folds in only what was appended to audit.log since the last
+one (including the tail of a rotated log), then answers from the stored
+counters, so the cost doesn't grow with the log.
+
+Usage:
+  audit-stats.py                     # Totals, sources, top rules, latency
+  audit-stats.py days --last 14      # Fail rate per day
+  audit-stats.py rules --top 20      # Most frequent rules
+  audit-stats.py latency             # p50/p90/p99 per source
+  audit-stats.py --json              # Any of the above as JSON
+  audit-stats.py --no-update days    # Stored counters only, don't read the log
+"""
+import json
+import math
+import sys
+
+from aiwf import analytics
+
+def fmt_ms(bound) -> str:
+    if bound is None:
+        return "-"
+    if bound == math.inf:
+        return f">{analytics.LATENCY_BUCKETS[-1]}ms"
+    return f"≤{bound}ms"
+
+def latency_rows(stats: dict) -> list:
+    rows = []
+    for source, histogram in sorted(stats["latency"].items()):
+        rows.append({
+            "source": source,
+            "count": sum(histogram),
+            "p50": fmt_ms(analytics.percentile(histogram, 50)),
+            "p90": fmt_ms(analytics.percentile(histogram, 90)),
+            "p99": fmt_ms(analytics.percentile(histogram, 99)),
+        })
+    return rows
+
+def query(stats: dict, args) -> dict:
+    if args.command == "days":
+        return {"days": [{"day": day, "failures": failures, "audits": audits, "fail_rate": round(rate, 4)}
+                         for day, failures, audits, rate in analytics.fail_rates(stats, args.last)]}
+    if args.command == "rules":
+        return {"rules": [{"rule": rule, "findings": n} for rule, n in analytics.top_rules(stats, args.top)]}
+    if args.command == "latency":
+        return {"latency": latency_rows(stats)}
+    return {
+        "records": stats["records"],
+        "first": stats["first"],
+        "last": stats["last"],
+        "totals": stats["totals"],
+        "sources": stats["sources"],
+        "rules": [{"rule": rule, "findings": n} for rule, n in analytics.top_rules(stats, args.top)],
+        "latency": latency_rows(stats),
+    }
+
+def print_report(result: dict, stats: dict):
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print(f"📊 Audit Stats ({stats['records']:,} records, {stats['first'] or '-'} → {stats['last'] or '-'})")
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+
+    if "totals" in result:
+        print("  " + "  ".join(f"{status}: {n:,}" for status, n in sorted(result["totals"].items())))
+        print("")
+        print("📁 By source:")
+        for source, counts in sorted(result["sources"].items()):
+            print(f"  {source:<14} " + "  ".join(f"{status}: {n:,}" for status, n in sorted(counts.items())))
+        print("")
+
+    if "days" in result:
+        print("📅 Fail rate per day:")
+        for row in result["days"]:
+            icon = "❌" if row["failures"] else "✅"
+            print(f"  {icon} {row['day']}  {row['failures']:>5,} / {row['audits']:<6,} {row['fail_rate']:.1%}")
+        if not result["days"]:
+            print("  (no audits logged)")
+
+    if "rules" in result:
+        print("🔎 Most frequent rules:")
+        for row in result["rules"]:
+            print(f"  {row['findings']:>8,}  {row['rule']}")
+        if not result["rules"]:
+            print("  (no findings logged)")
+        print("")
+
+    if "latency" in result:
+        print("⏱️  Latency:")
+        for row in result["latency"]:
+            print(f"  {row['source']:<14} {row['count']:>7,} runs  p50 {row['p50']:<9} p90 {row['p90']:<9} p99 {row['p99']}")
+        if not result["latency"]:
+            print("  (no timed runs logged)")
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Audit analytics from the incrementally maintained summary")
+    parser.add_argument("command", nargs="?", choices=["summary", "days", "rules", "latency"], default="summary")
+    parser.add_argument("--last", type=int, help="days: only the N most recent days")
+    parser.add_argument("--top", type=int, default=10, help="rules: how many to list (default: 10)")
+    parser.add_argument("--json", action="store_true", help="Print the answer as JSON")
+    parser.add_argument("--no-update", dest="update", action="store_false",
+                        help="Answer from the stored counters without reading new log lines")
+    args = parser.parse_args()
+
+    if args.update:
+        try:
+            stats = analytics.update()
+        except OSError as e:
+            print(f"⚠️  Could not update audit-summary.json: {e}", file=sys.stderr)
+            stats = analytics.load_stats()
+    else:
+        stats = analytics.load_stats()
+
+    result = query(stats, args)
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print_report(result, stats)
+
+if __name__ == "__main__":
+    main()
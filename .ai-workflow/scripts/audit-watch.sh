@@ -18,7 +18,13 @@ NC='\033[0m'
 
 # Cleanup function
 cleanup() {
-    rm -f "$PID_FILE" 2>/dev/null
+    rm -f "$PID_FILE" "$AUDIT_REPORT" 2>/dev/null
+    if [ -n "$AUDIT_CLIENT_PID" ]; then
+        kill "$AUDIT_CLIENT_PID" 2>/dev/null
+    fi
+    if [ "$AUDIT_SERVER_STARTED" = "1" ]; then
+        python3 "$SCRIPT_DIR/audit-server.py" stop >/dev/null 2>&1
+    fi
     exit 0
 }
 trap cleanup EXIT INT TERM
@@ -114,9 +120,43 @@ if ! command -v inotifywait &> /dev/null; then
     sudo apt-get update -qq && sudo apt-get install -y -qq inotify-tools
 fi
 
-# Debounce: track last run time to avoid running multiple times for one save
-LAST_RUN=0
-DEBOUNCE_SECONDS=2
+# Coalescing: after the first change event, keep collecting paths until the
+# tree has been quiet for BATCH_QUIET_SECONDS (capped at BATCH_MAX_SECONDS),
+# then audit the whole burst with a single audit-file.py run
+BATCH_QUIET_SECONDS="${BATCH_QUIET_SECONDS:-0.5}"
+BATCH_MAX_SECONDS="${BATCH_MAX_SECONDS:-5}"
+BATCH_FILES=()
+declare -A BATCH_SEEN
+
+# Persistent audit server: rules stay compiled between saves (AUDIT_SERVER=0 to disable)
+AUDIT_SERVER="${AUDIT_SERVER:-1}"
+AUDIT_SERVER_STARTED=0
+# Findings of the last batch as NDJSON; show_audit_panel reads its summary record
+AUDIT_REPORT="$CONTEXT_DIR/.audit-watch.ndjson"
+AUDIT_FILE_ARGS=(-0 --report "$AUDIT_REPORT")
+if [ "$AUDIT_SERVER" = "1" ]; then
+    if python3 "$SCRIPT_DIR/audit-server.py" stats >/dev/null 2>&1; then
+        AUDIT_FILE_ARGS+=(--server)
+    elif python3 "$SCRIPT_DIR/audit-server.py" start --background >/dev/null 2>&1; then
+        AUDIT_SERVER_STARTED=1
+        AUDIT_FILE_ARGS+=(--server)
+    fi
+fi
+
+# One audit-file.py for the whole watch (AUDIT_CLIENT=0 to start one per batch).
+# Each batch goes to its stdin as NUL-separated paths ended by an empty one; its
+# report goes straight to this terminal and the verdict comes back on fd 3.
+AUDIT_CLIENT_PID=""
+exec {WATCH_OUT}>&1
+start_audit_client() {
+    coproc AUDIT_CLIENT {
+        cd "$PROJECT_ROOT" && exec python3 "$SCRIPT_DIR/audit-file.py" --batches --status-fd 3 \
+            "${AUDIT_FILE_ARGS[@]}" 3>&1 1>&"$WATCH_OUT"
+    }
+}
+if [ "${AUDIT_CLIENT:-1}" = "1" ]; then
+    start_audit_client
+fi
 
 # Copilot CLI review mode (off by default, enable with COPILOT_REVIEW=1)
 COPILOT_REVIEW="${COPILOT_REVIEW:-0}"
@@ -152,6 +192,13 @@ show_audit_panel() {
         *)      echo -e "${BLUE}│${NC}  ⚪ Audit: complete$(printf '%*s' 42 '')${BLUE}│${NC}" ;;
     esac
 
+    # ── Finding counts (summary record of the NDJSON report) ──
+    local summary
+    summary=$(tail -n 1 "$AUDIT_REPORT" 2>/dev/null)
+    if [[ "$summary" =~ \"critical\":\ ([0-9]+),\ \"warning\":\ ([0-9]+) ]]; then
+        echo -e "${BLUE}│${NC}  🔎 Findings:    ${BASH_REMATCH[1]} critical • ${BASH_REMATCH[2]} warning(s)"
+    fi
+
     echo -e "${BLUE}├─────────────────────────────────────────────────────────────┤${NC}"
 
     # ── Git info ──
@@ -183,8 +230,15 @@ show_audit_panel() {
     echo -e "${BLUE}├─────────────────────────────────────────────────────────────┤${NC}"
 
     # ── Prompt tracker ──
+    # The tracker renders its summary to a file on every change; only run it
+    # when the log was edited behind its back (no process on the common path)
     echo -e "${BLUE}│${NC}  🏷️  Prompts:"
-    if [ -x "$SCRIPT_DIR/prompt-tracker.sh" ]; then
+    local tracker_status="$CONTEXT_DIR/.prompt-tracker.status"
+    if [ -f "$tracker_status" ] && ! [ "$CONTEXT_DIR/PROMPT_TRACKER.log" -nt "$tracker_status" ]; then
+        while IFS= read -r line; do
+            echo -e "${BLUE}│${NC}${line}"
+        done < "$tracker_status"
+    elif [ -x "$SCRIPT_DIR/prompt-tracker.sh" ]; then
         "$SCRIPT_DIR/prompt-tracker.sh" show-compact 2>/dev/null | while IFS= read -r line; do
             echo -e "${BLUE}│${NC}${line}"
         done
@@ -193,48 +247,83 @@ show_audit_panel() {
     echo -e "${BLUE}└─────────────────────────────────────────────────────────────┘${NC}"
 }
 
-run_audit() {
+# Should this path be audited at all?
+should_audit() {
     local file="$1"
-    local current_time=$(date +%s)
-
-    # Skip if we just ran (debounce)
-    if (( current_time - LAST_RUN < DEBOUNCE_SECONDS )); then
-        return
-    fi
-    LAST_RUN=$current_time
 
     # Skip certain files/directories
     if [[ "$file" =~ node_modules|\.git|coverage|dist|build|__pycache__|\.pyc ]]; then
-        return
+        return 1
     fi
 
     # Only check relevant file types
     if [[ ! "$file" =~ \.(js|jsx|ts|tsx|py|json|md)$ ]]; then
-        return
+        return 1
+    fi
+    return 0
+}
+
+# Add a changed path to the current batch (once)
+queue_file() {
+    local file="$1"
+    if should_audit "$file" && [ -z "${BATCH_SEEN[$file]}" ]; then
+        BATCH_SEEN[$file]=1
+        BATCH_FILES+=("$file")
     fi
+}
+
+run_audit_batch() {
+    local files=("$@")
+    local current_time=$(date +%s)
 
     echo ""
     echo -e "${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
-    echo -e "📄 Changed: ${YELLOW}${file}${NC}"
+    if [ ${#files[@]} -eq 1 ]; then
+        echo -e "📄 Changed: ${YELLOW}${files[0]}${NC}"
+    else
+        echo -e "📄 Changed: ${YELLOW}${#files[@]} files${NC}"
+        printf "   ${YELLOW}%s${NC}\n" "${files[@]}"
+    fi
     echo -e "${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
 
     # Run audit on current working directory changes
     cd "$PROJECT_ROOT"
 
-    # Check the specific file for issues (pattern-based)
-    python3 "$SCRIPT_DIR/audit-file.py" "$file"
-    local audit_exit=$?
+    # Check the whole batch for issues on the long-running client
+    local audit_result=""
+    if [ -n "$AUDIT_CLIENT_PID" ] && kill -0 "$AUDIT_CLIENT_PID" 2>/dev/null; then
+        printf '%s\0' "${files[@]}" "" >&"${AUDIT_CLIENT[1]}"
+        if ! read -r -t 60 audit_result <&"${AUDIT_CLIENT[0]}"; then
+            kill "$AUDIT_CLIENT_PID" 2>/dev/null
+            audit_result=""
+        fi
+    fi
 
-    # Map exit code to result label
-    local audit_result="pass"
-    if [ $audit_exit -ne 0 ]; then
-        audit_result="fail"
+    if [[ ! "$audit_result" =~ ^(pass|warn|fail)$ ]]; then
+        # No client (or it died): one-off run, then bring a client back
+        printf '%s\0' "${files[@]}" | python3 "$SCRIPT_DIR/audit-file.py" "${AUDIT_FILE_ARGS[@]}"
+        local audit_exit=$?
+
+        # Verdict from the report's closing summary record (fail | warn | pass)
+        audit_result="pass"
+        local summary
+        summary=$(tail -n 1 "$AUDIT_REPORT" 2>/dev/null)
+        if [ $audit_exit -ne 0 ]; then
+            audit_result="fail"
+        elif [[ "$summary" =~ \"result\":\ \"(fail|warn|pass)\" ]]; then
+            audit_result="${BASH_REMATCH[1]}"
+        fi
+        if [ "${AUDIT_CLIENT:-1}" = "1" ] && ! kill -0 "${AUDIT_CLIENT_PID:-0}" 2>/dev/null; then
+            start_audit_client
+        fi
     fi
 
     # AI-powered audit (if auditor-ai session is running)
     if tmux has-session -t auditor-ai 2>/dev/null; then
         echo -e "${PURPLE}🧠 Running AI audit (Gemini Flash)...${NC}"
-        "$SCRIPT_DIR/ai-audit-file.sh" "$file" 2>/dev/null || true
+        for file in "${files[@]}"; do
+            "$SCRIPT_DIR/ai-audit-file.sh" "$file" 2>/dev/null || true
+        done
     fi
 
     # If pattern audit found issues OR Copilot review is enabled, run Copilot
@@ -244,14 +333,15 @@ run_audit() {
             LAST_COPILOT_RUN=$current_time
             echo ""
             echo -e "${PURPLE}🤖 Running Copilot CLI review...${NC}"
-            "$SCRIPT_DIR/copilot-review.sh" -f "$file" 2>/dev/null || true
+            for file in "${files[@]}"; do
+                "$SCRIPT_DIR/copilot-review.sh" -f "$file" 2>/dev/null || true
+            done
         fi
-    elif [ $audit_exit -ne 0 ]; then
+    elif [ "$audit_result" = "fail" ]; then
         # Pattern audit found issues - offer Copilot escalation
         echo ""
         echo -e "${YELLOW}💡 Tip: Run 'COPILOT_REVIEW=1' to enable AI review${NC}"
-        echo -e "${YELLOW}   Or: .ai-workflow/scripts/copilot-review.sh -f $file${NC}"
-        audit_result="warn"
+        echo -e "${YELLOW}   Or: .ai-workflow/scripts/copilot-review.sh -f ${files[0]}${NC}"
     fi
 
     # Show the full audit panel (prompts, git, builder)
@@ -261,11 +351,26 @@ run_audit() {
     show_workflow_signals
 }
 
-# Watch for changes
-inotifywait -m -r \
+# Audit everything collected for the current burst, then start a new one
+flush_batch() {
+    if [ ${#BATCH_FILES[@]} -gt 0 ]; then
+        run_audit_batch "${BATCH_FILES[@]}"
+    fi
+    BATCH_FILES=()
+    BATCH_SEEN=()
+}
+
+# Watch for changes (the loop runs in this shell so it can reach the client's fds)
+while read -r directory events filename; do
+    queue_file "${directory}${filename}"
+    BATCH_STARTED=$SECONDS
+    # Keep draining events until the burst goes quiet
+    while (( SECONDS - BATCH_STARTED < BATCH_MAX_SECONDS )) && \
+          read -r -t "$BATCH_QUIET_SECONDS" directory events filename; do
+        queue_file "${directory}${filename}"
+    done
+    flush_batch
+done < <(inotifywait -m -r \
     --exclude '(node_modules|\.git|coverage|dist|build|__pycache__)' \
     -e modify,create \
-    "$PROJECT_ROOT/src" "$PROJECT_ROOT/api" "$PROJECT_ROOT/scripts" 2>/dev/null | \
-while read -r directory events filename; do
-    run_audit "${directory}${filename}"
-done
+    "$PROJECT_ROOT/src" "$PROJECT_ROOT/api" "$PROJECT_ROOT/scripts" 2>/dev/null)
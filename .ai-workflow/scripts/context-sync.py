@@ -6,15 +6,30 @@ Runs before prompt injection to:
 2. Gather current project state
 3. Auto-update context if stale
 4. Generate context summary for prompts
+
+Git and file state is collected once per run (aiwf.snapshot) and shared
+by the status report, the prompt summary and --json output. The summary is
+cached under a fingerprint of HEAD, the index and the context files, so
+--summary-only answers without running git while nothing has changed.
+
+Uncommitted files are only counted, up to --max-changes ("1000+ files").
+--no-untracked leaves untracked files out, and a git status slower than
+--status-timeout is cut short with a partial count rather than holding up
+prompt injection.
 """
-import subprocess
+import json
 import sys
 import os
 import re
+import time
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import List, Tuple, Optional
 
+from aiwf import snapshot
+from aiwf.auditlog import log_event
+from aiwf.snapshot import ChangeCount, RepoSnapshot, state_fingerprint, take_snapshot
+
 # Paths relative to this script's location
 SCRIPT_DIR = Path(__file__).parent
 WORKFLOW_ROOT = SCRIPT_DIR.parent  # .ai-workflow
@@ -22,87 +37,65 @@ PROJECT_ROOT = WORKFLOW_ROOT.parent  # project root
 CONTEXT_DIR = WORKFLOW_ROOT / "context"
 SESSION_FILE = CONTEXT_DIR / "SESSION.md"
 MVP_FILE = CONTEXT_DIR / "MVP_MASTER_LIST.md"
-AUDIT_LOG = CONTEXT_DIR / "audit.log"
+SUMMARY_CACHE = CONTEXT_DIR / ".context-summary.json"
 
 # How old SESSION.md can be before warning (in hours)
 STALE_THRESHOLD_HOURS = 24
 
-def run_cmd(cmd: List[str]) -> str:
-    """Run a shell command and return output."""
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=PROJECT_ROOT)
-        return result.stdout.strip()
-    except Exception:
-        return ""
-
-def get_current_branch() -> str:
+def get_current_branch(snap: Optional[RepoSnapshot] = None) -> str:
     """Get current git branch."""
-    return run_cmd(["git", "branch", "--show-current"])
+    return (snap or take_snapshot()).branch
 
-def get_recent_commits(n: int = 5) -> List[str]:
+def get_recent_commits(n: int = 5, snap: Optional[RepoSnapshot] = None) -> List[str]:
     """Get last N commit messages."""
-    output = run_cmd(["git", "log", "--oneline", f"-{n}"])
-    return output.split("\n") if output else []
+    return (snap or take_snapshot()).commits[:n]
 
-def get_uncommitted_changes() -> List[str]:
-    """Get list of uncommitted/unstaged files."""
-    output = run_cmd(["git", "status", "--porcelain"])
-    if not output:
-        return []
-    return [line[3:] for line in output.split("\n") if line]
+def get_uncommitted_changes(snap: Optional[RepoSnapshot] = None) -> ChangeCount:
+    """Count uncommitted/unstaged files (a lower bound if capped or timed out)."""
+    return (snap or take_snapshot()).changes
 
-def get_session_last_updated() -> Tuple[Optional[datetime], Optional[str]]:
+def get_session_last_updated(snap: Optional[RepoSnapshot] = None) -> Tuple[Optional[datetime], Optional[str]]:
     """Parse SESSION.md for last updated date and agent."""
-    if not SESSION_FILE.exists():
+    index = (snap or take_snapshot()).session
+    if index is None:
         return None, None
 
-    content = SESSION_FILE.read_text()
-
-    # Look for "Last Updated" in table
-    date_match = re.search(r'\*\*Last Updated\*\*\s*\|\s*(\d{4}-\d{2}-\d{2})', content)
-    agent_match = re.search(r'\*\*Last Agent\*\*\s*\|\s*(\w+)', content)
+    # "Last Updated" / "Last Agent" rows of the session table
+    date_match = re.match(r'\d{4}-\d{2}-\d{2}', index.fields.get("Last Updated", ""))
+    agent_match = re.match(r'\w+', index.fields.get("Last Agent", ""))
 
     last_date = None
     if date_match:
         try:
-            last_date = datetime.strptime(date_match.group(1), "%Y-%m-%d")
+            last_date = datetime.strptime(date_match.group(0), "%Y-%m-%d")
         except ValueError:
             pass
 
-    last_agent = agent_match.group(1) if agent_match else None
+    last_agent = agent_match.group(0) if agent_match else None
 
     return last_date, last_agent
 
-def get_current_focus() -> List[str]:
+def get_current_focus(snap: Optional[RepoSnapshot] = None) -> List[str]:
     """Extract current focus items from SESSION.md."""
-    if not SESSION_FILE.exists():
+    index = (snap or take_snapshot()).session
+    if index is None:
         return []
+    return index.section_items("Current Focus")[:5]  # Top 5 focus items
 
-    content = SESSION_FILE.read_text()
-    focus_section = re.search(r'## Current Focus\s*\n(.*?)(?=\n## |\Z)', content, re.DOTALL)
-
-    if not focus_section:
-        return []
-
-    items = re.findall(r'[-*]\s+(.+)', focus_section.group(1))
-    return items[:5]  # Top 5 focus items
-
-def get_mvp_status() -> dict:
+def get_mvp_status(snap: Optional[RepoSnapshot] = None) -> dict:
     """Get MVP blocker status from MVP_MASTER_LIST.md."""
-    if not MVP_FILE.exists():
+    index = (snap or take_snapshot()).mvp
+    if index is None:
         return {"total": 0, "done": 0, "pending": 0}
 
-    content = MVP_FILE.read_text()
-
-    # Count checkboxes
-    done = len(re.findall(r'\[x\]', content, re.IGNORECASE))
-    pending = len(re.findall(r'\[ \]', content))
+    # Checkboxes are counted while indexing
+    done, pending = index.checked, index.unchecked
 
     return {"total": done + pending, "done": done, "pending": pending}
 
-def check_session_freshness() -> Tuple[bool, str]:
+def check_session_freshness(snap: Optional[RepoSnapshot] = None) -> Tuple[bool, str]:
     """Check if SESSION.md is stale."""
-    last_updated, last_agent = get_session_last_updated()
+    last_updated, last_agent = get_session_last_updated(snap)
 
     if not last_updated:
         return False, "⚠️  SESSION.md has no date - please update it"
@@ -114,13 +107,14 @@ def check_session_freshness() -> Tuple[bool, str]:
 
     return True, f"✅ SESSION.md is current (updated: {last_updated.date()}, by: {last_agent})"
 
-def generate_context_summary() -> str:
+def generate_context_summary(snap: Optional[RepoSnapshot] = None) -> str:
     """Generate a context summary to prepend to prompts."""
-    branch = get_current_branch()
-    commits = get_recent_commits(3)
-    changes = get_uncommitted_changes()
-    focus = get_current_focus()
-    mvp = get_mvp_status()
+    snap = snap or take_snapshot()
+    branch = get_current_branch(snap)
+    commits = get_recent_commits(3, snap)
+    changes = get_uncommitted_changes(snap)
+    focus = get_current_focus(snap)
+    mvp = get_mvp_status(snap)
 
     summary_lines = [
         "### Project Context (Auto-generated)",
@@ -132,7 +126,7 @@ def generate_context_summary() -> str:
         summary_lines.append(f"- **Current Focus:** {focus[0][:50]}...")
 
     if changes:
-        summary_lines.append(f"- **Uncommitted Files:** {len(changes)} files")
+        summary_lines.append(f"- **Uncommitted Files:** {changes.label()} files")
 
     if commits:
         summary_lines.append(f"- **Last Commit:** {commits[0][:60]}")
@@ -144,7 +138,8 @@ def update_session_date():
     if not SESSION_FILE.exists():
         return False
 
-    content = SESSION_FILE.read_text()
+    # surrogateescape round-trips bytes that aren't valid UTF-8 unchanged
+    content = SESSION_FILE.read_text(errors="surrogateescape")
     today = datetime.now().strftime("%Y-%m-%d")
 
     # Update the Last Updated field
@@ -155,41 +150,38 @@ def update_session_date():
     )
 
     if new_content != content:
-        SESSION_FILE.write_text(new_content)
+        SESSION_FILE.write_text(new_content, errors="surrogateescape")
         return True
     return False
 
 def log_sync(status: str, details: str):
     """Log context sync to audit log."""
-    try:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_line = f"[{timestamp}] [{status}] [CONTEXT-SYNC] {details}\n"
-        with open(AUDIT_LOG, "a") as f:
-            f.write(log_line)
-    except Exception:
-        pass
-
-def sync_context(auto_update: bool = False) -> Tuple[bool, str, str]:
+    log_event(status, "CONTEXT-SYNC", details=details)
+
+def sync_context(auto_update: bool = False, snap: Optional[RepoSnapshot] = None) -> Tuple[bool, str, str]:
     """
     Sync and validate project context.
     Returns: (is_fresh, status_message, context_summary)
     """
     messages = []
+    snap = snap or take_snapshot()
 
     # Check SESSION.md freshness
-    is_fresh, freshness_msg = check_session_freshness()
+    is_fresh, freshness_msg = check_session_freshness(snap)
     messages.append(freshness_msg)
 
     # Get current state
-    branch = get_current_branch()
-    changes = get_uncommitted_changes()
-    mvp = get_mvp_status()
+    branch = get_current_branch(snap)
+    changes = get_uncommitted_changes(snap)
+    mvp = get_mvp_status(snap)
 
-    messages.append(f"📌 Branch: {branch}")
+    tracking = f" (↑{snap.ahead} ↓{snap.behind} vs {snap.upstream})" if snap.upstream else ""
+    messages.append(f"📌 Branch: {branch}{tracking}")
     messages.append(f"📊 MVP: {mvp['done']}/{mvp['total']} complete")
 
     if changes:
-        messages.append(f"📝 {len(changes)} uncommitted file(s)")
+        timed_out = " (git status timed out)" if changes.timed_out else ""
+        messages.append(f"📝 {changes.label()} uncommitted file(s){timed_out}")
 
     # Auto-update date if requested and stale
     if auto_update and not is_fresh:
@@ -198,32 +190,90 @@ def sync_context(auto_update: bool = False) -> Tuple[bool, str, str]:
             is_fresh = True
 
     # Generate context for prompt
-    context = generate_context_summary()
+    context = generate_context_summary(snap)
 
     # Log the sync
     log_sync("SYNC", f"Branch: {branch}, MVP: {mvp['done']}/{mvp['total']}, Fresh: {is_fresh}")
 
     return is_fresh, "\n".join(messages), context
 
+def load_cached_summary(fingerprint: str) -> Optional[str]:
+    """Summary stored for this fingerprint, or None."""
+    try:
+        with open(SUMMARY_CACHE) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("fingerprint") != fingerprint:
+        return None
+    return cached.get("summary")
+
+def store_summary(fingerprint: str, summary: str):
+    try:
+        tmp = SUMMARY_CACHE.with_name(SUMMARY_CACHE.name + f".{os.getpid()}")
+        tmp.write_text(json.dumps({"fingerprint": fingerprint, "summary": summary}))
+        os.replace(tmp, SUMMARY_CACHE)
+    except OSError:
+        pass  # Caching is best-effort
+
+def report_cache(result: str, started: float):
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"🗃️  Summary cache: {result} ({elapsed:.1f} ms)", file=sys.stderr)
+
 def main():
     import argparse
     parser = argparse.ArgumentParser(description="Sync project context for agents")
     parser.add_argument("--auto-update", action="store_true", help="Auto-update SESSION.md date if stale")
     parser.add_argument("--summary-only", action="store_true", help="Only output context summary (for piping)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--no-cache", action="store_true", help="Rebuild the summary even if the cached one is current")
+    parser.add_argument("--cache-report", action="store_true", help="Report summary cache hit/miss and time on stderr")
+    parser.add_argument("--max-changes", type=int, default=snapshot.MAX_CHANGES,
+                        help=f"Stop counting uncommitted files at N (default: {snapshot.MAX_CHANGES}, 0 = no cap)")
+    parser.add_argument("--no-untracked", dest="untracked", action="store_false", default=snapshot.UNTRACKED,
+                        help="Leave untracked files out of the count")
+    parser.add_argument("--status-timeout", type=float, default=snapshot.STATUS_TIMEOUT,
+                        help=f"Seconds to wait for git status before using a partial count (default: {snapshot.STATUS_TIMEOUT:g}, 0 = wait)")
+    parser.add_argument("--fsmonitor", action="store_true", default=snapshot.FSMONITOR,
+                        help="Run git status with git's builtin fsmonitor daemon")
     args = parser.parse_args()
-
-    is_fresh, status, context = sync_context(auto_update=args.auto_update)
+    started = time.perf_counter()
+    # The count options change the summary, so they are part of its cache key
+    options = f":{args.max_changes}:{int(args.untracked)}"
+
+    # Fast path: nothing the summary depends on has changed since it was built
+    if args.summary_only and not args.no_cache:
+        cached = load_cached_summary(state_fingerprint() + options)
+        if cached is not None:
+            print(cached)
+            if args.cache_report:
+                report_cache("hit", started)
+            return
+
+    before = state_fingerprint()
+    snap = take_snapshot(max_changes=args.max_changes, timeout=args.status_timeout,
+                         untracked=args.untracked, fsmonitor=args.fsmonitor)
+    is_fresh, status, context = sync_context(auto_update=args.auto_update, snap=snap)
+    after = state_fingerprint()
+    # Don't cache a summary whose inputs changed mid-run (our own date update aside)
+    # or one built from a status that was cut short
+    if (before == after or args.auto_update) and not snap.changes.timed_out:
+        store_summary(after + options, context)
 
     if args.summary_only:
         print(context)
+        if args.cache_report:
+            report_cache("miss", started)
     elif args.json:
-        import json
         print(json.dumps({
             "fresh": is_fresh,
-            "branch": get_current_branch(),
-            "mvp": get_mvp_status(),
-            "uncommitted": len(get_uncommitted_changes()),
+            "branch": snap.branch,
+            "upstream": snap.upstream,
+            "ahead": snap.ahead,
+            "behind": snap.behind,
+            "mvp": get_mvp_status(snap),
+            "uncommitted": snap.changes.count,
+            "uncommitted_partial": snap.changes.partial,
             "context": context
         }))
     else:
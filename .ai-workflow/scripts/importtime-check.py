@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Import-Time Check - Keep heavy imports off the entry points' startup path
+Run by pre-push-check.sh; fails when a script loads a module it must not
+
+Each entry point is loaded (not run) in a fresh interpreter, and the modules
+it pulls in beyond what a bare interpreter already has are listed. Hot-path
+scripts import argparse, difflib, subprocess and friends inside the functions
+that need them; FORBIDDEN names, per script, the modules that must stay off
+its startup path. audit-file.py does nothing at load time, so its probe also
+scans one file: that is the path every watch save takes.
+
+The check looks at what gets imported, not at how long it takes, so it gives
+the same answer on every machine and a failure is a real regression.
+
+Usage:
+  importtime-check.py                        # All entry points, exit 1 on a forbidden import
+  importtime-check.py local-audit.py         # Just one
+  importtime-check.py --verbose              # Every package each script loads
+  importtime-check.py --json
+"""
+import json
+import subprocess
+import sys
+
+from aiwf.paths import SCRIPT_DIR
+
+# Loaded only by the commands that need them, never at startup
+COMMON_FORBIDDEN = frozenset({"argparse", "difflib", "concurrent", "multiprocessing", "asyncio", "unittest"})
+
+# Modules (and their submodules) each entry point must not load before main() runs
+FORBIDDEN = {
+    "local-audit.py": COMMON_FORBIDDEN,
+    "prompt-audit.py": COMMON_FORBIDDEN | {"subprocess"},
+    "context-sync.py": COMMON_FORBIDDEN | {"subprocess", "sqlite3"},
+    "audit-file.py": COMMON_FORBIDDEN | {"subprocess", "socket"},
+    "recalibrate.py": COMMON_FORBIDDEN | {"subprocess", "sqlite3"},
+    "prompt-tracker.py": COMMON_FORBIDDEN | {"subprocess"},
+    "audit-stats.py": COMMON_FORBIDDEN | {"subprocess", "sqlite3"},
+    "audit-server.py": COMMON_FORBIDDEN,
+}
+
+# Run after loading, for scripts whose hot path starts in a function
+AFTER_LOAD = {
+    "audit-file.py": "g['scan_file'](g['__file__']); ",
+}
+
+# Loads the script body without calling main(), then lists sys.modules
+PROBE = (
+    "import sys; sys.path.insert(0, {dir!r}); "
+    "g = {{'__name__': '__importcheck__', '__file__': {path!r}}}; "
+    "exec(compile(open({path!r}, 'rb').read(), {path!r}, 'exec'), g); "
+    "{after}"
+    "print('\\n'.join(sorted(sys.modules)))"
+)
+BARE = "import sys; print('\\n'.join(sorted(sys.modules)))"
+
+def loaded_modules(code: str) -> set:
+    """Names in sys.modules after running code in a fresh interpreter."""
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=SCRIPT_DIR)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "probe failed")
+    return set(proc.stdout.split())
+
+def startup_modules(script: str, baseline: set, path=None) -> list:
+    """Modules script loads at startup that a bare interpreter doesn't have."""
+    path = str(path or SCRIPT_DIR / script)
+    code = PROBE.format(dir=str(SCRIPT_DIR), path=path, after=AFTER_LOAD.get(script, ""))
+    return sorted(loaded_modules(code) - baseline)
+
+def forbidden_in(modules: list, forbidden) -> list:
+    """The modules that are, or are inside, a forbidden package."""
+    return [name for name in modules if name.split(".")[0] in forbidden]
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Fail when an entry point loads a forbidden module at startup")
+    parser.add_argument("scripts", nargs="*", help="Entry points to check (default: all listed)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="List the packages each script loads")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    scripts = args.scripts or list(FORBIDDEN)
+    unknown = [s for s in scripts if s not in FORBIDDEN]
+    if unknown:
+        print(f"❌ Not a checked entry point: {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(2)
+
+    # What a bare interpreter imports anyway (site, encodings, ...) isn't the script's doing
+    baseline = loaded_modules(BARE)
+
+    results = []
+    for script in scripts:
+        try:
+            modules = startup_modules(script, baseline)
+        except RuntimeError as e:
+            print(f"❌ {script}: {e}", file=sys.stderr)
+            sys.exit(2)
+        bad = forbidden_in(modules, FORBIDDEN[script])
+        results.append({
+            "script": script,
+            "modules": len(modules),
+            "forbidden": bad,
+            "ok": not bad,
+            "packages": sorted({name.split(".")[0] for name in modules if not name.startswith("_")}),
+        })
+
+    failed = [r for r in results if not r["ok"]]
+    if args.json:
+        print(json.dumps({"results": results, "failed": len(failed)}, indent=2))
+    else:
+        print("📦 Startup imports (modules loaded beyond a bare interpreter)")
+        for r in results:
+            icon = "✅" if r["ok"] else "❌"
+            print(f"  {icon} {r['script']:<20} {r['modules']:>4} modules")
+            if not r["ok"]:
+                print(f"       forbidden: {', '.join(r['forbidden'])}")
+            if args.verbose:
+                print(f"       {' '.join(r['packages'])}")
+        if failed:
+            print(f"\n❌ {len(failed)} script(s) load forbidden modules - move those imports into the functions that use them")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -10,184 +10,408 @@ Full AI review happens via GitHub Copilot on PR.
 import subprocess
 import sys
 import os
-import re
-from datetime import datetime
+import time
+from itertools import chain
 from pathlib import Path
 
+from aiwf.cache import shared_cache
+from aiwf.auditlog import log_event
+from aiwf.diffs import added_lines, numstat, stream_range_diff, stream_staged_diff
+from aiwf.filetypes import disabled_rules, skip_reason
+from aiwf.report import FORMATS, finding_writer
+from aiwf.rules import DIFF_RULES, RuleEngine, RuleProfile, normalize_newlines
+
 # Paths relative to this script's location
 SCRIPT_DIR = Path(__file__).parent
 WORKFLOW_ROOT = SCRIPT_DIR.parent  # .ai-workflow
 CONTEXT_DIR = WORKFLOW_ROOT / "context"
-AUDIT_LOG = CONTEXT_DIR / "audit.log"
 
-def log_audit(status: str, target: str, details: str = ""):
-    """Append audit result to log file."""
+ENGINE = RuleEngine(DIFF_RULES)
+
+# New files up to this size are scanned whole so their hits can be cached
+NEW_FILE_CACHE_CHARS = 1 << 20
+
+# Added lines audited per file; the rest of a bigger file is noted as unscanned
+MAX_FILE_LINES = int(os.environ.get("AUDIT_DIFF_MAX_FILE_LINES", 20000))
+
+def log_audit(status: str, target: str, details: str = "", **extra):
+    """Queue audit result for the audit log (written in batches, see aiwf.auditlog)."""
+    log_event(status, "AUDIT", target, details, **extra)
+
+def audit_stats(issues, started):
+    """Per-rule finding counts and duration, recorded with the verdict for audit-stats.py."""
+    stats = {"rules": issues["rules"], "ms": round((time.perf_counter() - started) * 1000)}
+    if issues["skipped"]:
+        stats["skipped"] = issues["skipped"]
+    if issues["capped"]:
+        stats["capped"] = len(issues["capped"])
+    return stats
+
+def staged_diff_failed():
+    print("❌ Error: Failed to get staged diff. Is this a git repo?", file=sys.stderr)
+    sys.exit(1)
+
+def prefilter(rev_range=None):
+    """
+    Files of the staged changes (or rev_range) that are not audited, as
+    {path: reason}: lockfiles, vendored and binary files, from
+    `git diff --numstat` and the path alone. Returns (skipped, file_count).
+    """
     try:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_line = f"[{timestamp}] [{status}] [{target}] {details}\n"
-        with open(AUDIT_LOG, "a") as f:
-            f.write(log_line)
-    except Exception:
-        pass  # Don't fail audit if logging fails
+        stats = numstat(rev_range)
+    except (subprocess.CalledProcessError, OSError):
+        staged_diff_failed()
+    skipped = {}
+    for stat in stats:
+        reason = skip_reason(stat.path) or ("binary" if stat.added is None else None)
+        if reason:
+            skipped[stat.path] = reason
+    return skipped, len(stats)
+
+def skipped_summary(skipped):
+    """"3 lockfile, 1 vendored" for the report."""
+    counts = {}
+    for reason in skipped.values():
+        counts[reason] = counts.get(reason, 0) + 1
+    return ", ".join(f"{n} {reason}" for reason, n in sorted(counts.items()))
 
-def get_staged_diff():
-    """Retrieves the staged changes from git."""
+def get_staged_diff(rev_range=None, exclude=()):
+    """
+    Streams the staged changes (or the diff of rev_range) from git, line by line,
+    leaving out the exclude paths. Returns None when there is nothing to audit.
+    """
+    if rev_range:
+        lines = stream_range_diff(rev_range, exclude=exclude)
+    else:
+        lines = stream_staged_diff(exclude=exclude)
     try:
-        result = subprocess.run(
-            ["git", "diff", "--staged"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError:
-        print("❌ Error: Failed to get staged diff. Is this a git repo?")
-        sys.exit(1)
+        first = next(lines, None)
+    except (subprocess.CalledProcessError, OSError):
+        staged_diff_failed()
+    if first is None:
+        return None
+    return chain([first], lines)
 
 def check_skip_auditor():
     """Check if auditor should be skipped (Rapid Prototyping mode)."""
     return os.environ.get("SKIP_AUDITOR", "").lower() in ("true", "1", "yes")
 
-def audit_diff(diff):
-    """Run pattern-based security and quality checks."""
-    issues = {"critical": [], "warning": []}
-    lines = diff.split('\n')
+def lines_to_scan(added, files, cache, report, skipped=None, capped=None, max_file_lines=MAX_FILE_LINES):
+    """
+    Pass added lines through to the rule engine, except where the findings
+    cache already knows the file's new blob: those lines are answered from
+    the cache via report(path, finding). New files that miss the cache are
+    scanned whole (up to NEW_FILE_CACHE_CHARS) and stored for later audits.
+    Lines of skipped paths are dropped, and so is everything past
+    max_file_lines added lines in one file (its path goes into capped).
+    """
+    current = None
+    cached = None  # line -> findings, while the current file is a cache hit
+    collected = None  # lines of a new file being gathered for the cache
+    size = 0
+    count = 0
+    dropped = False  # skipped file, or past the line cap
+
+    def finish():
+        # Scan a gathered new file in one go and remember its hits
+        info = files.pop(current)
+        # Numbered like the blob on disk (aiwf.fileaudit), so either tool can reuse the entry
+        hits = ENGINE.raw_hits(normalize_newlines("\n".join(collected) + "\n"))
+        cache.put(info.blob, ENGINE.version, hits)
+        for finding in ENGINE.from_hits(hits, disabled_rules(current)):
+            report(current, finding)
+
+    for path, line_no, content in added:
+        if path != current:
+            if collected is not None:
+                finish()
+            else:
+                files.pop(current, None)
+            current, cached, collected, size, count = path, None, None, 0, 0
+            dropped = bool(skipped) and path in skipped
+            info = files.get(path)
+            if not dropped and cache is not None and info is not None and info.blob:
+                hits = cache.get(info.blob, ENGINE.version)
+                if hits is not None:
+                    cached = {}
+                    for finding in ENGINE.from_hits(hits, disabled_rules(path)):
+                        cached.setdefault(finding.line, []).append(finding)
+                elif info.is_new:
+                    collected = []
+
+        if dropped:
+            continue
+
+        if cached is not None:
+            for finding in cached.get(line_no, ()):
+                report(path, finding)
+            continue
+
+        count += 1
+        if count > max_file_lines:
+            dropped = True
+            if capped is not None:
+                capped.append(path)
+            if collected is not None:
+                # The cache only holds whole files: scan the part within the cap
+                for number, line in enumerate(collected, 1):
+                    yield path, number, line
+                collected = None
+            continue
 
-    for i, line in enumerate(lines):
-        if not line.startswith('+') or line.startswith('+++'):
+        if collected is not None:
+            collected.append(content)
+            size += len(content) + 1
+            if size > NEW_FILE_CACHE_CHARS:
+                # Too big to hold: scan it like any other file
+                for number, line in enumerate(collected, 1):
+                    yield path, number, line
+                collected = None
             continue
 
-        line_content = line[1:]  # Remove the + prefix
-        line_lower = line_content.lower()
-
-        # CRITICAL: Hardcoded secrets
-        secret_patterns = [
-            (r'api[_-]?key\s*[=:]\s*["\'][^"\']{10,}["\']', "API key"),
-            (r'password\s*[=:]\s*["\'][^"\']+["\']', "Password"),
-            (r'secret\s*[=:]\s*["\'][^"\']{10,}["\']', "Secret"),
-            (r'token\s*[=:]\s*["\'][^"\']{20,}["\']', "Token"),
-            (r'private[_-]?key', "Private key"),
-            (r'-----BEGIN (RSA |EC |DSA )?PRIVATE KEY-----', "Private key block"),
-        ]
-
-        for pattern, name in secret_patterns:
-            if re.search(pattern, line_content, re.IGNORECASE):
-                if 'process.env' not in line_content and 'example' not in line_lower and 'test' not in line_lower:
-                    issues["critical"].append(f"🔐 Possible {name} found (line ~{i+1})")
-
-        # CRITICAL: SQL injection patterns
-        if re.search(r'\$\{.*\}.*(?:SELECT|INSERT|UPDATE|DELETE|DROP)', line_content, re.IGNORECASE):
-            issues["critical"].append(f"💉 Possible SQL injection (line ~{i+1})")
-
-        # WARNING: Console.log in non-test files
-        if 'console.log' in line_content:
-            if not any(x in line_lower for x in ['test', 'spec', 'debug']):
-                issues["warning"].append(f"📝 console.log found (line ~{i+1})")
-
-        # WARNING: Debugger statements
-        if 'debugger' in line_content:
-            issues["warning"].append(f"🐛 debugger statement (line ~{i+1})")
-
-        # WARNING: TODO/FIXME/HACK
-        if any(tag in line_content for tag in ['TODO:', 'FIXME:', 'HACK:', 'XXX:']):
-            issues["warning"].append(f"📌 TODO/FIXME found (line ~{i+1})")
-
-        # WARNING: Disabled eslint rules
-        if 'eslint-disable' in line_content:
-            issues["warning"].append(f"⚠️  ESLint disabled (line ~{i+1})")
+        yield path, line_no, content
 
+    if collected is not None:
+        finish()
+
+def audit_diff(diff, cache=None, on_finding=None, skipped=None, max_file_lines=MAX_FILE_LINES):
+    """
+    Run pattern-based security and quality checks.
+    diff is the diff text or an iterable of its lines; added lines are
+    scanned in bounded batches and reported as path:line in the new file.
+    Files whose blob is in the findings cache are not scanned again.
+    Each file only runs the rules for its type (aiwf.filetypes); skipped
+    paths (see prefilter()) are not audited.
+    issues["rules"] counts findings per rule id; issues["capped"] lists
+    files with more than max_file_lines added lines (the rest is unscanned)
+    and issues["skipped"] counts the skipped files.
+    on_finding(path, finding) is called for each finding as it is found.
+    """
+    issues = {"critical": [], "warning": [], "rules": {}, "capped": [], "skipped": len(skipped or ())}
+    lines = diff.split('\n') if isinstance(diff, str) else diff
+
+    def report(path, finding):
+        rule = finding.rule
+        issues[rule.severity].append(f"{rule.icon} {rule.diff_title} ({path}:{finding.line})")
+        issues["rules"][rule.id] = issues["rules"].get(rule.id, 0) + 1
+        if on_finding is not None:
+            on_finding(path, finding)
+
+    files = {}
+    added = lines_to_scan(added_lines(lines, files), files, cache, report,
+                          skipped, issues["capped"], max_file_lines)
+    for path, finding in ENGINE.scan_lines(added, disabled_for=disabled_rules):
+        report(path, finding)
+
+    if cache is not None:
+        cache.flush()
     return issues
 
-def main():
-    print("")
-    print("="*60)
-    print("🔍 LOCAL AUDITOR (Pre-commit)")
-    print("   Auditor: GitHub Copilot • Builder: Gemini/Claude CLI")
-    print("="*60)
+def report_profile(target, file=None):
+    """Print the --profile table and record it in the audit-logs summary."""
+    from aiwf.summary import append_profile
 
-    # Check if auditor should be skipped (Rapid Prototyping mode)
-    if check_skip_auditor():
+    ENGINE.profile.print_table(file=file)
+    if not append_profile("local-audit", target, ENGINE.profile.ranked()):
+        print("   ⚠️  Could not update audit-summary.json", file=file)
+
+class TextReport:
+    """The human-readable report: a banner, a summary at the end and the verdict."""
+
+    on_finding = None  # Findings are listed once the audit is done
+    announce = True  # Say which tracked prompt was marked DONE
+
+    def __init__(self, rev_range=None):
+        self.rev_range = rev_range
+
+    def start(self):
+        print("")
+        print("="*60)
+        print(f"🔍 LOCAL AUDITOR ({'Pre-push' if self.rev_range else 'Pre-commit'})")
+        print("   Auditor: GitHub Copilot • Builder: Gemini/Claude CLI")
+        print("="*60)
+
+    def auditor_skipped(self):
         print("⏭️  Auditor skipped (SKIP_AUDITOR=true / Rapid Prototyping)")
         print("="*60)
-        sys.exit(0)
 
-    # Get staged changes
-    diff = get_staged_diff()
+    def prefiltered(self, skipped):
+        pass  # Summarized with the results
 
-    if not diff:
-        print("ℹ️  No staged changes to audit.")
+    def nothing_to_audit(self, skipped):
+        print(f"⏭️  Nothing to audit ({skipped_summary(skipped)} only).")
+        print("="*60)
+
+    def no_changes(self):
+        print(f"ℹ️  No changes to audit in {self.rev_range}." if self.rev_range else "ℹ️  No staged changes to audit.")
         print("="*60)
-        log_audit("SKIP", "staged-changes", "No staged changes")
-        sys.exit(0)
 
-    # Run audit
-    issues = audit_diff(diff)
+    def results(self, issues, skipped, show_profile=None):
+        if show_profile is not None:
+            show_profile()
 
-    # Report findings
-    if issues["critical"]:
-        print("\n❌ CRITICAL ISSUES (must fix):")
-        for issue in issues["critical"]:
-            print(f"   {issue}")
+        if skipped:
+            print(f"\n⏭️  Not audited: {skipped_summary(skipped)}")
+        if issues["capped"]:
+            shown = ", ".join(issues["capped"][:3]) + (" ..." if len(issues["capped"]) > 3 else "")
+            print(f"\n✂️  Only the first {MAX_FILE_LINES:,} added lines audited in: {shown}")
 
-    if issues["warning"]:
-        print("\n⚠️  WARNINGS (consider fixing):")
-        for issue in issues["warning"][:10]:
-            print(f"   {issue}")
-        if len(issues["warning"]) > 10:
-            print(f"   ... and {len(issues['warning']) - 10} more")
+        # Report findings
+        if issues["critical"]:
+            print("\n❌ CRITICAL ISSUES (must fix):")
+            for issue in issues["critical"]:
+                print(f"   {issue}")
 
-    print("")
-    print("="*60)
+        if issues["warning"]:
+            print("\n⚠️  WARNINGS (consider fixing):")
+            for issue in issues["warning"][:10]:
+                print(f"   {issue}")
+            if len(issues["warning"]) > 10:
+                print(f"   ... and {len(issues['warning']) - 10} more")
 
-    # Verdict
-    if issues["critical"]:
-        print("❌ AUDIT FAILED - Fix critical issues before committing")
         print("")
-        print("   💡 Tip: Full AI review will run on PR via GitHub Copilot")
         print("="*60)
-        log_audit("FAIL", "staged-changes", f"Critical: {len(issues['critical'])}, Warnings: {len(issues['warning'])}")
-        sys.exit(1)
-    elif issues["warning"]:
-        print("⚠️  AUDIT PASSED with warnings")
-        print("")
-        print("   💡 Tip: GitHub Copilot will review on PR")
-        print("="*60)
-        log_audit("WARN", "staged-changes", f"Warnings: {len(issues['warning'])}")
-        sys.exit(0)
-    else:
-        print("✅ AUDIT PASSED - No issues detected")
-        print("")
-        print("   💡 Tip: GitHub Copilot will do full review on PR")
+
+        # Verdict
+        if issues["critical"]:
+            print("❌ AUDIT FAILED - Fix critical issues before committing")
+            print("")
+            print("   💡 Tip: Full AI review will run on PR via GitHub Copilot")
+        elif issues["warning"]:
+            print("⚠️  AUDIT PASSED with warnings")
+            print("")
+            print("   💡 Tip: GitHub Copilot will review on PR")
+        else:
+            print("✅ AUDIT PASSED - No issues detected")
+            print("")
+            print("   💡 Tip: GitHub Copilot will do full review on PR")
         print("="*60)
-        log_audit("PASS", "staged-changes", "Clean")
 
-        # Auto-update prompt tracker: mark most recent SENT/BUILDING prompt as DONE
-        auto_complete_prompt()
+class MachineReport:
+    """--format ndjson|sarif: findings go to stdout as they are found, untruncated."""
+
+    announce = False  # stdout holds only the report
+
+    def __init__(self, writer, target):
+        self.writer = writer
+        self.target = target
+
+    def start(self):
+        pass  # The writer has already started its document
+
+    def on_finding(self, path, finding):
+        self.writer.finding(path, finding.rule, finding.line, finding.column, finding.text)
+
+    def auditor_skipped(self):
+        self.writer.note(None, "Auditor skipped (SKIP_AUDITOR=true)")
+        self.writer.close(target=self.target)
+
+    def prefiltered(self, skipped):
+        for path, reason in sorted(skipped.items()):
+            self.writer.note(path, f"Not audited ({reason})")
+
+    def nothing_to_audit(self, skipped):
+        self.writer.close(target=self.target)
+
+    def no_changes(self):
+        self.writer.close(target=self.target)
+
+    def results(self, issues, skipped, show_profile=None):
+        for path in issues["capped"]:
+            self.writer.note(path, f"Only the first {MAX_FILE_LINES:,} added lines audited")
+        self.writer.close(target=self.target)
+        if show_profile is not None:
+            show_profile(file=sys.stderr)
 
-        sys.exit(0)
+def run_audit(args, target, report):
+    """
+    One audit run, the same whatever the output format: the skip checks,
+    the prefilter, the streamed diff audit, the audit-log verdict and the
+    prompt tracker update. report (TextReport or MachineReport) only decides
+    how each step is shown. Returns the exit code.
+    """
+    report.start()
 
-def auto_complete_prompt():
+    # Check if auditor should be skipped (Rapid Prototyping mode)
+    if check_skip_auditor():
+        report.auditor_skipped()
+        return 0
+
+    # Get staged changes, minus files that are not audited
+    started = time.perf_counter()
+    skipped, file_count = prefilter(args.rev_range)
+    report.prefiltered(skipped)
+    if file_count and len(skipped) == file_count:
+        report.nothing_to_audit(skipped)
+        log_audit("SKIP", target, f"Not audited: {skipped_summary(skipped)}")
+        return 0
+    diff = get_staged_diff(args.rev_range, exclude=skipped)
+    if not diff:
+        report.no_changes()
+        log_audit("SKIP", target, "No staged changes")
+        return 0
+
+    # Run audit (git keeps streaming while we scan)
+    try:
+        issues = audit_diff(diff, cache=None if args.profile else shared_cache(),
+                            on_finding=report.on_finding, skipped=skipped)
+    except (subprocess.CalledProcessError, OSError):
+        staged_diff_failed()
+
+    show_profile = (lambda file=None: report_profile(target, file=file)) if args.profile else None
+    report.results(issues, skipped, show_profile)
+
+    stats = audit_stats(issues, started)
+    if issues["critical"]:
+        log_audit("FAIL", target, f"Critical: {len(issues['critical'])}, Warnings: {len(issues['warning'])}", **stats)
+        return 1
+    if issues["warning"]:
+        log_audit("WARN", target, f"Warnings: {len(issues['warning'])}", **stats)
+        return 0
+    log_audit("PASS", target, "Clean", **stats)
+
+    # Auto-update prompt tracker: mark most recent SENT/BUILDING prompt as DONE
+    if not args.rev_range:
+        auto_complete_prompt(announce=report.announce)
+    return 0
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Pattern audit of staged changes")
+    parser.add_argument("--range", dest="rev_range", metavar="REV_RANGE",
+                        help="Audit the diff of a revision range (e.g. @{u}...HEAD: the commits being pushed) instead of staged changes")
+    parser.add_argument("--format", choices=FORMATS, default="text",
+                        help="text report (default), or stream every finding as NDJSON / SARIF")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time every rule (bypasses the findings cache) and record it in audit-summary.json")
+    args = parser.parse_args()
+    target = f"push {args.rev_range}" if args.rev_range else "staged-changes"
+    if args.profile:
+        ENGINE.profile = RuleProfile()
+
+    if args.format == "text":
+        report = TextReport(args.rev_range)
+    else:
+        report = MachineReport(finding_writer(args.format, sys.stdout, ENGINE.rules), target)
+    sys.exit(run_audit(args, target, report))
+
+def auto_complete_prompt(announce=True):
     """If there's an active prompt (SENT or BUILDING), mark it DONE after successful commit."""
     tracker_file = CONTEXT_DIR / "PROMPT_TRACKER.log"
-    tracker_script = SCRIPT_DIR / "prompt-tracker.sh"
-    if not tracker_file.exists() or not tracker_script.exists():
+    if not tracker_file.exists():
         return
+    from aiwf.tracker import PromptTracker
+
+    tracker = PromptTracker(tracker_file)
     try:
-        with open(tracker_file, "r") as f:
-            lines = f.readlines()
-        # Find the most recent SENT or BUILDING prompt
-        for line in reversed(lines):
-            parts = line.strip().split("|")
-            if len(parts) >= 4 and parts[1] in ("SENT", "BUILDING"):
-                prompt_id = parts[0]
-                subprocess.run(
-                    [str(tracker_script), "status", prompt_id, "DONE"],
-                    capture_output=True, timeout=5
-                )
-                print(f"\n   🏷️  Prompt {prompt_id} → DONE")
-                break
+        # Most recent SENT or BUILDING prompt, from the tracker's index
+        prompt_id = tracker.complete_latest(("SENT", "BUILDING"), "DONE")
+        if prompt_id and announce:
+            print(f"\n   🏷️  Prompt {prompt_id} → DONE")
     except Exception:
         pass  # Don't fail audit if tracker update fails
+    finally:
+        tracker.close()
 
 if __name__ == "__main__":
     main()
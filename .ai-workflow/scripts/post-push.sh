@@ -204,8 +204,8 @@ if [ $? -eq 0 ]; then
     echo -e "${GREEN}✅ Pull Request created successfully!${NC}"
     echo -e "${BLUE}   URL: $PR_URL${NC}"
 
-    # Log to context
-    echo "[$(date)] PR created: $PR_URL" >> "$CONTEXT_DIR/audit.log" 2>/dev/null || true
+    # Log to context through aiwf.auditlog, which holds the log's lock (a plain >> can race a rotation)
+    (cd "$SCRIPT_DIR" && python3 -c 'import sys; from aiwf.auditlog import log_event; log_event("INFO", "POST-PUSH", "pr", "PR created: " + sys.argv[1])' "$PR_URL") 2>/dev/null || true
 else
     echo -e "${RED}❌ Failed to create PR${NC}"
     echo "$PR_URL"
@@ -152,6 +152,19 @@ for file_pattern in "${SECRET_FILES[@]}"; do
     fi
 done
 
+# Pattern audit of the pushed diff (same rules as pre-commit; content already
+# scanned on save or commit is answered from the findings cache)
+if [ "$AHEAD" -gt 0 ] && git rev-parse --verify -q '@{u}' >/dev/null 2>&1; then
+    PUSH_AUDIT_EXIT=0
+    PUSH_AUDIT=$(python3 "$SCRIPT_DIR/local-audit.py" --range '@{u}...HEAD' 2>&1) || PUSH_AUDIT_EXIT=$?
+    if [ "$PUSH_AUDIT_EXIT" -ne 0 ]; then
+        echo -e "${RED}❌ CRITICAL: Pattern audit failed for commits being pushed${NC}"
+        echo "$PUSH_AUDIT" | grep -E "^   (🔐|💉)" || true
+        SECRETS_FOUND=1
+        ERRORS=$((ERRORS + 1))
+    fi
+fi
+
 if [ "$SECRETS_FOUND" -eq 0 ]; then
     echo -e "${GREEN}✅ No secrets detected${NC}"
 fi
@@ -177,6 +190,17 @@ else
     else
         echo -e "${YELLOW}⚠️  No test script found, skipping${NC}"
     fi
+
+    # Startup imports of the workflow's own Python hooks
+    IMPORT_EXIT=0
+    IMPORT_CHECK=$(python3 "$SCRIPT_DIR/importtime-check.py" 2>&1) || IMPORT_EXIT=$?
+    if [ "$IMPORT_EXIT" -eq 0 ]; then
+        echo -e "${GREEN}✅ Workflow scripts keep heavy imports off their startup path${NC}"
+    else
+        echo "$IMPORT_CHECK" | grep -E "❌|^       " || true
+        echo -e "${RED}❌ Workflow scripts load forbidden modules at startup (see above)${NC}"
+        ERRORS=$((ERRORS + 1))
+    fi
 fi
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -4,20 +4,38 @@ Prompt Pre-Audit - Checks prompts before sending to Gemini
 1. Duplicate detection - similar tasks in history
 2. File conflict detection - pending changes to same files
 3. Auto-append formatting rules to ensure consistent code style
+
+History comes from an index (aiwf.promptindex) that parses only what was
+appended to PROMPT_HISTORY.md since the last run. Duplicates are looked up
+across the whole history, titles and bodies, in its MinHash buckets; file
+conflicts through its path index, over every prompt that is still open.
+
+--batch audits many prompts in one process (NDJSON on stdin, or a directory
+of prompt files): history is loaded once, each prompt is also checked
+against the ones before it in the batch, and one NDJSON verdict with the
+enhanced prompt is written per input.
 """
+import json
 import sys
-import os
-import re
+import time
 from pathlib import Path
-from datetime import datetime
-from difflib import SequenceMatcher
+
+from aiwf.auditlog import log_event
+from aiwf.promptindex import Conflict, Match, Prompt, PromptIndex, extract_files, prompt_title
+from aiwf.repopaths import PathResolver
+from aiwf.tracker import read_tracker
 
 # Paths relative to this script's location
 SCRIPT_DIR = Path(__file__).parent
 WORKFLOW_ROOT = SCRIPT_DIR.parent  # .ai-workflow
 CONTEXT_DIR = WORKFLOW_ROOT / "context"
 PROMPT_HISTORY = CONTEXT_DIR / "PROMPT_HISTORY.md"
-AUDIT_LOG = CONTEXT_DIR / "audit.log"
+
+# Similar past prompts reported per audit
+SIMILAR_TOP_K = 3
+
+# "date" of batch items in the in-memory index (--batch)
+BATCH_SOURCE = "batch:"
 
 # Coding standards to append to every prompt
 CODING_STANDARDS = """
@@ -34,86 +52,46 @@ CODING_STANDARDS = """
 - MUI v7 patterns: use `sx` prop, not `makeStyles`
 """
 
-def log_audit(status: str, target: str, details: str = ""):
-    """Append audit result to log file."""
-    try:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_line = f"[{timestamp}] [{status}] [PROMPT] {target}: {details}\n"
-        with open(AUDIT_LOG, "a") as f:
-            f.write(log_line)
-    except Exception:
-        pass
-
-def get_prompt_history() -> list[dict]:
-    """Parse prompt history file and extract previous prompts."""
-    prompts = []
-    if not PROMPT_HISTORY.exists():
-        return prompts
-
-    content = PROMPT_HISTORY.read_text()
-    # Split by date headers
-    sections = re.split(r'---\n## \d{4}-\d{2}-\d{2}', content)
-
-    for section in sections[1:]:  # Skip header
-        # Extract the prompt text
-        match = re.search(r'```\n?(.*?)\n?```', section, re.DOTALL)
-        if match:
-            prompt_text = match.group(1).strip()
-            # Extract task title if present
-            title_match = re.search(r'Task:?\s*([^\n]+)', prompt_text)
-            title = title_match.group(1).strip() if title_match else prompt_text[:50]
-            prompts.append({
-                'title': title,
-                'text': prompt_text,
-                'files': extract_files(prompt_text)
-            })
-
-    return prompts
-
-def extract_files(prompt: str) -> list[str]:
-    """Extract file paths mentioned in a prompt."""
-    # Match common file path patterns
-    patterns = [
-        r'src/[a-zA-Z0-9_/.-]+\.(js|jsx|ts|tsx|css)',
-        r'api/[a-zA-Z0-9_/.-]+\.(js|ts)',
-        r'[a-zA-Z0-9_]+\.(js|jsx|ts|tsx|py|sh)',
-    ]
-    files = []
-    for pattern in patterns:
-        files.extend(re.findall(pattern, prompt))
-    # Also check for "Files to Modify" section
-    files_section = re.search(r'Files to (?:Modify|Consider)[:\s]*\n((?:[-*]\s*[^\n]+\n?)+)', prompt, re.IGNORECASE)
-    if files_section:
-        for line in files_section.group(1).split('\n'):
-            # Extract file paths from list items
-            file_match = re.search(r'`?([a-zA-Z0-9_/.-]+\.[a-z]+)`?', line)
-            if file_match:
-                files.append(file_match.group(1))
-    return list(set(files))
-
-def check_duplicate(new_prompt: str, history: list[dict], threshold: float = 0.6) -> tuple[bool, str]:
-    """Check if prompt is similar to recent ones."""
-    new_title_match = re.search(r'Task:?\s*([^\n]+)', new_prompt)
-    new_title = new_title_match.group(1).strip().lower() if new_title_match else new_prompt[:50].lower()
-
-    for old in history[-10:]:  # Check last 10 prompts
-        old_title = old['title'].lower()
-        similarity = SequenceMatcher(None, new_title, old_title).ratio()
-        if similarity > threshold:
-            return True, old['title']
-    return False, ""
-
-def check_file_conflicts(new_prompt: str, history: list[dict]) -> list[str]:
-    """Check if prompt modifies files with pending changes."""
-    new_files = extract_files(new_prompt)
+def log_audit(status: str, target: str, details: str = "", **extra):
+    """Queue audit result for the audit log (written in batches, see aiwf.auditlog)."""
+    log_event(status, "PROMPT", target, details, **extra)
+
+def find_similar(new_prompt: str, indexes, threshold: float = 0.6,
+                 k: int = SIMILAR_TOP_K) -> list[Match]:
+    """Top-k prompts (in one index or several) more similar than threshold, one per title."""
+    if isinstance(indexes, PromptIndex):
+        indexes = [indexes]
+    matches = []
+    for index in indexes:
+        matches += index.similar(prompt_title(new_prompt), new_prompt, k=k * 3)
+    matches.sort(key=lambda match: match.score, reverse=True)
+    seen = set()
+    unique = []
+    for match in matches:
+        if match.score > threshold and match.title.lower() not in seen:
+            seen.add(match.title.lower())
+            unique.append(match)
+    return unique[:k]
+
+def find_conflicts(new_prompt: str, indexes, tracker: dict = None,
+                   resolver: PathResolver = None) -> list[Conflict]:
+    """Open prompts (in one index or several) touching files this prompt mentions."""
+    if isinstance(indexes, PromptIndex):
+        indexes = [indexes]
+    mentions = extract_files(new_prompt)
+    new_files = (resolver or PathResolver(mentions)).keys_all(mentions)
     conflicts = []
+    for index in indexes:
+        conflicts += index.conflicts(new_files, tracker)
+    return conflicts
 
-    for old in history[-5:]:  # Check last 5 prompts
-        for f in old.get('files', []):
-            if f in new_files:
-                conflicts.append(f"{f} (from: {old['title'][:30]}...)")
+def describe_source(date: str, status: str = None) -> str:
+    if date.startswith(BATCH_SOURCE):
+        return f"this batch: {date[len(BATCH_SOURCE):]}"
+    return status or "untracked"
 
-    return conflicts
+def describe_conflict(conflict: Conflict) -> str:
+    return f"{conflict.path} (from: {conflict.title[:30]}..., {describe_source(conflict.date, conflict.status)})"
 
 def append_standards(prompt: str) -> str:
     """Append coding standards if not already present."""
@@ -121,43 +99,132 @@ def append_standards(prompt: str) -> str:
         return prompt
     return prompt + "\n" + CODING_STANDARDS
 
-def audit_prompt(prompt: str) -> tuple[bool, str, str]:
-    """
-    Audit a prompt before sending.
-    Returns: (should_proceed, status, enhanced_prompt)
-    """
+def review_prompt(prompt: str, indexes: list[PromptIndex], tracker: dict = None,
+                  resolver: PathResolver = None) -> tuple[list[Match], list[Conflict], list[str]]:
+    """Similar prompts, file conflicts and the warnings describing them."""
     warnings = []
 
-    # Load history
-    history = get_prompt_history()
-
     # Check for duplicates
-    is_dup, dup_title = check_duplicate(prompt, history)
-    if is_dup:
-        warnings.append(f"⚠️  Similar task exists: '{dup_title}'")
+    similar = find_similar(prompt, indexes)
+    for i, match in enumerate(similar):
+        source = f", {describe_source(match.date)}" if match.date.startswith(BATCH_SOURCE) else ""
+        if i == 0:
+            warnings.append(f"⚠️  Similar task exists: '{match.title}' ({match.score:.0%}{source})")
+        else:
+            warnings.append(f"   Also similar: '{match.title}' ({match.score:.0%}{source})")
 
     # Check for file conflicts
-    conflicts = check_file_conflicts(prompt, history)
+    conflicts = find_conflicts(prompt, indexes, tracker, resolver)
     if conflicts:
-        warnings.append(f"⚠️  File conflicts: {', '.join(conflicts[:3])}")
+        warnings.append(f"⚠️  File conflicts: {', '.join(map(describe_conflict, conflicts[:3]))}")
+
+    return similar, conflicts, warnings
+
+def audit_prompt(prompt: str) -> tuple[bool, str, str]:
+    """
+    Audit a prompt before sending.
+    Returns: (should_proceed, status, enhanced_prompt)
+    """
+    # Bring the history index up to date
+    started = time.perf_counter()
+    index = PromptIndex()
+    index.update(PROMPT_HISTORY)
+    _, _, warnings = review_prompt(prompt, [index])
+    index.close()
 
     # Append coding standards
     enhanced = append_standards(prompt)
 
     # Log the audit
+    ms = round((time.perf_counter() - started) * 1000)
     if warnings:
-        log_audit("WARN", "pre-audit", "; ".join(warnings))
+        log_audit("WARN", "pre-audit", "; ".join(warnings), ms=ms)
         return True, "\n".join(warnings), enhanced
     else:
-        log_audit("PASS", "pre-audit", "Clean prompt")
+        log_audit("PASS", "pre-audit", "Clean prompt", ms=ms)
         return True, "✅ Prompt passed pre-audit", enhanced
 
+def read_batch(source: str = None):
+    """
+    (id, prompt, error) for each batch item: files of a directory (sorted by
+    name), or NDJSON lines on stdin, either {"id": ..., "prompt": ...} or a
+    bare JSON string.
+    """
+    if source:
+        for path in sorted(Path(source).iterdir()):
+            if path.is_file() and not path.name.startswith("."):
+                try:
+                    yield path.name, path.read_text(errors="replace"), None
+                except OSError as e:
+                    yield path.name, None, str(e)
+        return
+    for line_no, line in enumerate(sys.stdin, 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            yield str(line_no), None, f"invalid JSON: {e}"
+            continue
+        if isinstance(item, str):
+            yield str(line_no), item, None
+        elif isinstance(item, dict) and isinstance(item.get("prompt"), str):
+            yield str(item.get("id", line_no)), item["prompt"], None
+        else:
+            yield str(line_no), None, 'expected a string or an object with a "prompt" string'
+
+def audit_batch(items) -> int:
+    """
+    Audit every item against the history and the items before it, loading
+    the history index, tracker and repository file list once. Writes one
+    NDJSON verdict per item; returns how many items could not be read.
+    """
+    items = list(items)
+    index = PromptIndex()
+    index.update(PROMPT_HISTORY)
+    # Earlier items of this batch: always open, however many there are
+    batch = PromptIndex(":memory:", untracked_window=None)
+    tracker = read_tracker()
+    resolver = PathResolver(path for _, prompt, _ in items if prompt for path in extract_files(prompt))
+
+    errors = 0
+    for item_id, prompt, error in items:
+        if error is not None:
+            errors += 1
+            record = {"id": item_id, "verdict": "error", "error": error}
+        else:
+            similar, conflicts, warnings = review_prompt(prompt, [index, batch], tracker, resolver)
+            log_audit("WARN" if warnings else "PASS", f"pre-audit {item_id}",
+                      "; ".join(warnings) if warnings else "Clean prompt")
+            record = {
+                "id": item_id,
+                "verdict": "warn" if warnings else "pass",
+                "warnings": warnings,
+                "similar": [{"title": m.title, "score": m.score, "source": describe_source(m.date, "history")}
+                            for m in similar],
+                "conflicts": [{"path": c.path, "title": c.title, "source": describe_source(c.date, c.status)}
+                              for c in conflicts],
+                "enhanced": append_standards(prompt),
+            }
+            batch.add([Prompt(0, BATCH_SOURCE + item_id, prompt_title(prompt), prompt,
+                              extract_files(prompt), None)], resolver)
+        print(json.dumps(record, ensure_ascii=False), flush=True)
+
+    index.close()
+    batch.close()
+    return errors
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: prompt-audit.py <prompt-text>")
         print("       prompt-audit.py --file <prompt-file>")
+        print("       prompt-audit.py --batch [<prompt-dir>]   (NDJSON on stdin without a directory)")
         sys.exit(1)
 
+    if sys.argv[1] == "--batch":
+        errors = audit_batch(read_batch(sys.argv[2] if len(sys.argv) > 2 else None))
+        sys.exit(1 if errors else 0)
+
     if sys.argv[1] == "--file" and len(sys.argv) > 2:
         prompt = Path(sys.argv[2]).read_text()
     else:
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Prompt Tracker - Manages unique prompt IDs for the AI dev workflow
+IDs follow format: HHMM:MMDD:letter (EST military time, month/day, sequential letter)
+
+The log and its id index live in aiwf.tracker; prompt-tracker.sh is a thin
+wrapper around this script.
+
+Usage:
+  prompt-tracker.py add "description"         → Logs a new prompt, returns the ID
+  prompt-tracker.py status ID new_status      → Updates status (CRAFTED→SENT→BUILDING→DONE→FAILED)
+  prompt-tracker.py show                      → Shows recent prompts with status
+  prompt-tracker.py show-compact              → One-line summary for terminal headers
+  prompt-tracker.py next-id                   → Returns the next ID (without logging)
+  prompt-tracker.py reset-counter             → Resets the letter counter (new batch)
+  prompt-tracker.py batch-start               → Starts a new batch (resets counter, returns first ID)
+  prompt-tracker.py clear                     → Archives and clears the tracker
+"""
+import sys
+
+from aiwf.tracker import (BOLD, DIM, GOLD, GREEN, NC, RED, STATUS_COLOR, STATUS_EMOJI, STATUSES,
+                          PromptTracker)
+
+USAGE = """Usage: prompt-tracker.sh <command>
+
+Commands:
+  add "description"       Log a new prompt, returns its ID
+  status ID STATUS        Update prompt status
+  show                    Show recent prompts
+  show-compact            One-line summary
+  next-id                 Preview next ID (without logging)
+  reset-counter           Reset letter counter
+  batch-start             Reset counter, return first ID
+  clear                   Archive and clear tracker
+
+Statuses: """ + ", ".join(STATUSES)
+
+def show(tracker: PromptTracker):
+    entries = tracker.recent(10)
+    if not entries:
+        print(f"{DIM}No prompts tracked yet.{NC}")
+        return
+    print(f"{GOLD}{BOLD}╔══════════════════════════════════════════════════════════╗{NC}")
+    print(f"{GOLD}{BOLD}║{NC}  🏷️  {GOLD}{BOLD}PROMPT TRACKER{NC}                                     {GOLD}{BOLD}║{NC}")
+    print(f"{GOLD}{BOLD}╚══════════════════════════════════════════════════════════╝{NC}")
+    print("")
+    for entry in entries:
+        desc = entry.description[:45] + ("..." if len(entry.description) > 45 else "")
+        print(f"  {GOLD}{BOLD}{entry.id}{NC}  {STATUS_COLOR.get(entry.status, NC)}{entry.status}{NC}  "
+              f"{STATUS_EMOJI.get(entry.status, '❓')}  {DIM}{desc}{NC}")
+    print("")
+
+def main():
+    args = sys.argv[1:] or ["show"]
+    command = args[0]
+    tracker = PromptTracker()
+
+    if command == "add":
+        print(tracker.add(args[1] if len(args) > 1 and args[1] else "No description"))
+    elif command == "status":
+        if len(args) < 3 or not args[1] or not args[2]:
+            print("Usage: prompt-tracker.sh status <ID> <STATUS>")
+            print("Statuses: " + ", ".join(STATUSES))
+            sys.exit(1)
+        prompt_id, status = args[1], args[2]
+        if not tracker.set_status(prompt_id, status):
+            print(f"{RED}❌ Prompt ID not found: {prompt_id}{NC}")
+            sys.exit(1)
+        print(f"{STATUS_EMOJI.get(status, '❓')} {prompt_id} → {status}")
+    elif command == "show":
+        show(tracker)
+    elif command == "show-compact":
+        print("\n".join(tracker.compact()))
+    elif command == "next-id":
+        print(tracker.next_id())
+    elif command == "reset-counter":
+        tracker.reset_counter()
+        print(f"{GREEN}✓ Prompt counter reset{NC}")
+    elif command == "batch-start":
+        tracker.reset_counter()
+        print(tracker.next_id())
+    elif command == "clear":
+        archive = tracker.clear()
+        if archive:
+            print(f"{GREEN}✓ Tracker cleared. Archive: {archive}{NC}")
+        else:
+            print(f"{DIM}Nothing to clear.{NC}")
+    else:
+        print(USAGE)
+    tracker.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,17 @@
 #!/usr/bin/env python3
 import json
-import os
-import re
-import sys
-
-def read_file(path):
-    if not os.path.exists(path):
-        return []
-    with open(path, 'r', encoding='utf-8') as f:
-        return f.readlines()
-
-def get_roadmap_items():
-    lines = read_file('ROADMAP.md')
-    items = []
-    for line in lines:
-        # Match unchecked items: - [ ] ...
-        match = re.match(r'^\s*-\s*\[\s*\]\s*(.*)', line)
-        if match:
-            items.append(match.group(1).strip())
-            if len(items) >= 3:
-                break
-    return items
+
+from aiwf.roadmap import RoadmapCache, roadmap_items
+from aiwf.tail import reverse_lines
+
+def get_roadmap_items(top=3, by_priority=False, per_section=False, section=None, cache=True):
+    """Top unchecked ROADMAP.md items by section, read only as far as needed."""
+    return roadmap_items('ROADMAP.md', top, by_priority, per_section, section,
+                         RoadmapCache() if cache else None)
 
 def get_last_session():
-    lines = read_file('SESSION_LOG.md')
-    # Skip header
-    for line in reversed(lines):
+    # Newest row first, read from the end of the log; skip header
+    for line in reverse_lines('SESSION_LOG.md'):
         if line.strip().startswith('|') and not '---' in line and not 'Date' in line:
             parts = [p.strip() for p in line.split('|') if p.strip()]
             if len(parts) >= 4:
@@ -38,14 +24,25 @@ def get_last_session():
     return None
 
 def main():
-    roadmap = get_roadmap_items()
+    import argparse
+    parser = argparse.ArgumentParser(description="Summarize the roadmap and the last session")
+    parser.add_argument("--top", type=int, default=3, help="Open items to report (per section with --per-section)")
+    parser.add_argument("--per-section", action="store_true", help="Report the top items of every section")
+    parser.add_argument("--section", help="Only items under this heading (and its subsections)")
+    parser.add_argument("--by-priority", action="store_true", help="Rank items by P0-P9 / high-medium-low tags")
+    parser.add_argument("--no-cache", action="store_true", help="Parse ROADMAP.md even if it is unchanged")
+    args = parser.parse_args()
+
+    roadmap = get_roadmap_items(args.top, args.by_priority, args.per_section, args.section, not args.no_cache)
     last_session = get_last_session()
-    
+
+    items = [item for group in roadmap.values() for item in group]
     summary = {
-        "roadmap_top_3": roadmap,
+        "roadmap_top_3": [item["text"] for item in items[:3]],
+        "roadmap": roadmap if args.per_section else items,
         "last_session": last_session
     }
-    
+
     print(json.dumps(summary, indent=2))
 
 if __name__ == "__main__":
@@ -35,6 +35,32 @@ WORKFLOW_FILES=(
     ".ai-workflow/scripts/local-audit.py"
     ".ai-workflow/scripts/prompt-audit.py"
     ".ai-workflow/scripts/context-sync.py"
+    ".ai-workflow/scripts/prompt-tracker.sh"
+    ".ai-workflow/scripts/prompt-tracker.py"
+    ".ai-workflow/scripts/recalibrate.py"
+    ".ai-workflow/scripts/aiwf/__init__.py"
+    ".ai-workflow/scripts/aiwf/rules.py"
+    ".ai-workflow/scripts/aiwf/diffs.py"
+    ".ai-workflow/scripts/aiwf/paths.py"
+    ".ai-workflow/scripts/aiwf/fileaudit.py"
+    ".ai-workflow/scripts/aiwf/auditd.py"
+    ".ai-workflow/scripts/aiwf/cache.py"
+    ".ai-workflow/scripts/aiwf/report.py"
+    ".ai-workflow/scripts/aiwf/summary.py"
+    ".ai-workflow/scripts/aiwf/snapshot.py"
+    ".ai-workflow/scripts/aiwf/mdindex.py"
+    ".ai-workflow/scripts/aiwf/promptindex.py"
+    ".ai-workflow/scripts/aiwf/repopaths.py"
+    ".ai-workflow/scripts/aiwf/tail.py"
+    ".ai-workflow/scripts/aiwf/roadmap.py"
+    ".ai-workflow/scripts/aiwf/auditlog.py"
+    ".ai-workflow/scripts/aiwf/analytics.py"
+    ".ai-workflow/scripts/aiwf/tracker.py"
+    ".ai-workflow/scripts/aiwf/filetypes.py"
+    ".ai-workflow/scripts/audit-server.py"
+    ".ai-workflow/scripts/audit-bench.py"
+    ".ai-workflow/scripts/audit-stats.py"
+    ".ai-workflow/scripts/importtime-check.py"
     ".ai-workflow/scripts/copilot-review.sh"
     ".ai-workflow/scripts/restore-session.sh"
     ".ai-workflow/scripts/workflow-signals.sh"
@@ -45,6 +71,7 @@ WORKFLOW_FILES=(
     ".ai-workflow/config/ensure-mcp-servers.sh"
     ".ai-workflow/config/setup-mcp-servers.sh"
     ".ai-workflow/config/models.conf"
+    ".ai-workflow/context/.gitignore"
     ".vscode/tasks.json"
 )
 
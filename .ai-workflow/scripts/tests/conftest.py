@@ -0,0 +1,31 @@
+"""
+Shared setup for the workflow script tests
+Run with: python3 -m pytest .ai-workflow/scripts/tests
+
+The scripts directory goes on sys.path so `aiwf` imports like it does for
+the scripts themselves, and hyphen-named entry scripts load via load_script().
+The findings cache is switched off so no test touches context/.
+"""
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+os.environ["AUDIT_CACHE"] = "0"
+
+def load_script(name: str):
+    """Import an entry script such as local-audit.py as a module (main() is not run)."""
+    path = SCRIPT_DIR / name
+    spec = importlib.util.spec_from_file_location(name[:-3].replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture(scope="session")
+def local_audit():
+    return load_script("local-audit.py")
@@ -0,0 +1,66 @@
+"""Audit server socket: private by construction, and the client checks who answers."""
+import os
+import stat
+import threading
+import time
+
+import pytest
+
+from aiwf import auditd
+from aiwf.auditd import AuditServer, private_dir, request
+from conftest import load_script
+
+def scan(path, name):
+    return [{"critical": [], "warning": [name], "notes": [], "findings": []}, None]
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(auditd, "PID_FILE", tmp_path / "server.pid")
+    path = tmp_path / "run" / "audit.sock"
+    path.parent.mkdir(mode=0o700)
+    srv = AuditServer(path, scan=scan)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if path.exists():
+            break
+        time.sleep(0.01)
+    yield srv
+    request({"op": "shutdown"}, path, timeout=0.5)
+    thread.join(2)
+
+def test_socket_is_private_and_answers_its_owner(server, tmp_path):
+    (tmp_path / "f.js").write_text("x")
+    mode = os.stat(server.path).st_mode
+    assert stat.S_ISSOCK(mode) and not mode & 0o077
+    reply = request({"op": "audit", "cwd": str(tmp_path), "paths": ["f.js"]}, server.path)
+    assert reply["results"][0][0]["warning"] == ["f.js"]
+
+def test_client_refuses_a_socket_owned_by_someone_else(server, monkeypatch):
+    monkeypatch.setattr(auditd.os, "getuid", lambda: os.geteuid() + 1)
+    assert request({"op": "stats"}, server.path) is None
+
+def test_private_dir_rejects_a_shared_directory(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o755)
+    with pytest.raises(RuntimeError):
+        private_dir(shared)
+    fresh = tmp_path / "fresh"
+    private_dir(fresh)
+    assert stat.S_IMODE(os.stat(fresh).st_mode) == 0o700
+
+def test_socket_path_is_in_the_runtime_dir(monkeypatch, tmp_path):
+    monkeypatch.delenv("AUDIT_SERVER_SOCKET", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert auditd.socket_path().parent == tmp_path / "aiwf"
+
+def test_batches_are_split_on_empty_entries():
+    audit_file = load_script("audit-file.py")
+    read, write = os.pipe()
+    os.write(write, b"a.js\0b.py\0\0c.md\0\0a.js\0a.js\0")
+    os.close(write)
+    try:
+        assert list(audit_file.read_batches(read)) == [["a.js", "b.py"], ["c.md"]]
+    finally:
+        os.close(read)
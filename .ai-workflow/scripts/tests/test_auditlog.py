@@ -0,0 +1,54 @@
+"""Audit log records reach the file without waiting for another write or a clean exit."""
+import json
+import signal
+import subprocess
+import sys
+import time
+
+from aiwf.auditlog import AuditLog
+from conftest import SCRIPT_DIR
+
+def records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+def test_idle_batch_is_flushed_by_the_timer(tmp_path):
+    log = AuditLog(tmp_path / "audit.log", tmp_path / ".lock", batch=64, flush_secs=0.1)
+    log.write("INFO", "TEST", details="one")
+    assert records(log.path) == []
+    for _ in range(50):
+        if records(log.path):
+            break
+        time.sleep(0.02)
+    assert [r["details"] for r in records(log.path)] == ["one"]
+
+def test_sigterm_flushes_pending_records(tmp_path):
+    path = tmp_path / "audit.log"
+    code = (
+        "import os, pathlib, signal, time\n"
+        "from aiwf import auditlog\n"
+        f"auditlog.audit_log.path = pathlib.Path({str(path)!r})\n"
+        f"auditlog.audit_log.lock_path = pathlib.Path({str(tmp_path / '.lock')!r})\n"
+        "auditlog.audit_log.flush_secs = 60\n"
+        "auditlog.log_event('INFO', 'TEST', details='before kill')\n"
+        "os.kill(os.getpid(), signal.SIGTERM)\n"
+        "time.sleep(5)\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=SCRIPT_DIR, timeout=10)
+    assert proc.returncode == -signal.SIGTERM
+    assert [r["details"] for r in records(path)] == ["before kill"]
+
+def test_hooks_wait_for_the_first_event(tmp_path):
+    path = tmp_path / "audit.log"
+    code = (
+        "import pathlib, signal\n"
+        "from aiwf import auditlog\n"
+        f"auditlog.audit_log.path = pathlib.Path({str(path)!r})\n"
+        f"auditlog.audit_log.lock_path = pathlib.Path({str(tmp_path / '.lock')!r})\n"
+        "assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL\n"
+        "auditlog.install_exit_hooks(signals=False)\n"
+        "auditlog.log_event('INFO', 'TEST', details='at exit')\n"
+        "assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=SCRIPT_DIR, capture_output=True, text=True, timeout=10)
+    assert proc.returncode == 0, proc.stderr
+    assert [r["details"] for r in records(path)] == ["at exit"]
@@ -0,0 +1,59 @@
+"""Findings cache: round trip, LRU eviction, and one line numbering per blob."""
+from aiwf.cache import FindingsCache, blob_sha
+from aiwf.fileaudit import ENGINE as FILE_ENGINE
+from aiwf.rules import decode_text
+
+HITS = [["todo", 3, 4, "TODO:", []]]
+
+def test_round_trip_and_version_miss(tmp_path):
+    cache = FindingsCache(tmp_path / "cache.db")
+    cache.put("blob1", "v1", HITS)
+    assert cache.get("blob1", "v1") == HITS  # Answered from pending writes
+    cache.close()
+
+    cache = FindingsCache(tmp_path / "cache.db")
+    assert cache.get("blob1", "v1") == HITS
+    assert cache.get("blob1", "v2") is None
+    assert cache.get("blob2", "v1") is None
+    stats = cache.stats()
+    assert stats["entries"] == 1 and stats["hits"] == 2 and stats["misses"] == 2
+
+def test_eviction_drops_least_recently_used(tmp_path, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr("aiwf.cache.time.time", lambda: next(clock))
+    entry = [["secret-token", 1, 1, "x" * 200, []]]
+    cache = FindingsCache(tmp_path / "cache.db", max_bytes=1000)
+    for n in range(3):
+        cache.put(f"blob{n}", "v", entry)
+        cache.flush()
+    assert cache.get("blob0", "v") is not None  # Touch the oldest
+    cache.flush()
+    for n in range(3, 5):
+        cache.put(f"blob{n}", "v", entry)
+        cache.flush()
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 1000 and stats["evictions"] >= 1
+    assert cache.get("blob0", "v") is not None
+    assert cache.get("blob1", "v") is None
+    assert cache.get("blob4", "v") is not None
+
+def test_blob_cached_by_either_tool_has_the_same_lines(tmp_path, local_audit):
+    data = b'one\rpassword = "hunter22"\r\nTODO: two\r\nthree'
+    blob = blob_sha(data)
+    file_hits = FILE_ENGINE.raw_hits(decode_text(data))
+    assert [hit[1] for hit in file_hits] == [1, 2]
+
+    # The same content arriving as a new file in a staged diff
+    lines = data.decode().split("\n")
+    diff = [
+        "diff --git a/a.js b/a.js",
+        "new file mode 100644",
+        f"index {'0' * 40}..{blob}",
+        "--- /dev/null",
+        "+++ b/a.js",
+        f"@@ -0,0 +1,{len(lines)} @@",
+    ] + ["+" + line for line in lines] + ["\\ No newline at end of file"]
+    cache = FindingsCache(tmp_path / "cache.db")
+    local_audit.audit_diff(iter(diff), cache=cache)
+    assert cache.get(blob, local_audit.ENGINE.version) == file_hits
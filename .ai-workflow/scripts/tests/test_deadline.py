@@ -0,0 +1,32 @@
+"""The per-file time budget holds for every scan, checked between line batches."""
+from aiwf import fileaudit
+from aiwf.fileaudit import ENGINE, IncrementalScanner, chunked_hits, scan_file, timed_hits
+from aiwf.rules import decode_text
+
+TEXT = "".join(f"console.log({n});\n" for n in range(1, 10001))
+
+def test_batches_match_a_single_pass():
+    hits, stopped_at = timed_hits(TEXT, None, batch_chars=100)
+    assert stopped_at is None
+    assert hits == ENGINE.raw_hits(TEXT)
+    data = TEXT.encode()
+    assert chunked_hits(data, len(data), None, chunk_bytes=1000) == (ENGINE.raw_hits(decode_text(data)), None)
+
+def test_expired_deadline_stops_after_the_first_batch():
+    hits, stopped_at = timed_hits(TEXT, 0, batch_chars=100)
+    assert 0 < stopped_at < 10000
+    assert [hit[1] for hit in hits] == list(range(1, stopped_at + 1))
+
+def test_incremental_rescan_is_timed_too():
+    scanner = IncrementalScanner()
+    hits, stopped_at = scanner.hits("a.js", TEXT.encode(), deadline=0)
+    assert stopped_at is not None and len(hits) == stopped_at
+
+def test_small_files_get_a_partial_note(tmp_path, monkeypatch):
+    path = tmp_path / "app.js"
+    path.write_text(TEXT)
+    monkeypatch.setattr(fileaudit, "start_deadline", lambda: 0)
+    issues, error = scan_file(str(path), name="src/app.js")
+    assert error is None
+    assert any("Partial: time budget" in note for note in issues["notes"])
+    assert 0 < len(issues["warning"]) < 10000
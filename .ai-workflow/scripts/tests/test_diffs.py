@@ -0,0 +1,139 @@
+"""Added lines of a unified diff map to the right path and new-file line."""
+import subprocess
+
+from aiwf.diffs import added_lines, numstat, stream_range_diff, stream_staged_diff, unquote_path
+
+BLOB = "a" * 40
+NULL = "0" * 40
+
+DIFF = f"""diff --git a/src/app.js b/src/app.js
+index {"1" * 40}..{BLOB} 100644
+--- a/src/app.js
++++ b/src/app.js
+@@ -1,4 +1,5 @@
+ line one
+-old two
++new two
+++plus-prefixed content
+ line three
+
+@@ -20,2 +21,3 @@ function tail() {{
+ context
++added at 22
+ more context
+diff --git a/gone.txt b/gone.txt
+deleted file mode 100644
+index {"2" * 40}..{NULL}
+--- a/gone.txt
++++ /dev/null
+@@ -1,2 +0,0 @@
+-bye
+-+not an added line
+diff --git a/new.py b/new.py
+new file mode 100644
+index {NULL}..{"3" * 40}
+--- /dev/null
++++ b/new.py
+@@ -0,0 +1,2 @@
++first
++second
+\\ No newline at end of file
+diff --git "a/odd name.txt" "b/odd name.txt"
+index {"4" * 40}..{"5" * 40} 100644
+--- "a/odd name.txt"
++++ "b/odd name.txt"
+@@ -1 +1 @@
+-x
++y
+"""
+
+def test_added_lines_are_located_in_the_new_file():
+    files = {}
+    found = list(added_lines(DIFF.split("\n"), files))
+    assert found == [
+        ("src/app.js", 2, "new two"),
+        ("src/app.js", 3, "+plus-prefixed content"),
+        ("src/app.js", 22, "added at 22"),
+        ("new.py", 1, "first"),
+        ("new.py", 2, "second"),
+        ("odd name.txt", 1, "y"),
+    ]
+
+def test_file_headers_record_blob_and_new_files():
+    files = {}
+    for _ in added_lines(DIFF.split("\n"), files):
+        pass
+    assert files["src/app.js"].blob == BLOB and not files["src/app.js"].is_new
+    assert files["new.py"].is_new and files["new.py"].blob == "3" * 40
+    assert "gone.txt" not in files
+
+def test_hunk_without_counts_and_blank_context_lines():
+    diff = [
+        "diff --git a/a.txt b/a.txt",
+        "--- a/a.txt",
+        "+++ b/a.txt",
+        "@@ -5 +5,3 @@",
+        "-old",
+        "+one",
+        "",  # Blank context line with its leading space stripped
+        "+three",
+        "@@ -40 +42 @@",
+        "-x",
+        "+forty-two",
+    ]
+    assert list(added_lines(diff)) == [("a.txt", 5, "one"), ("a.txt", 7, "three"), ("a.txt", 42, "forty-two")]
+
+def test_staged_diff_from_git(tmp_path):
+    def git(*args):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-q")
+    git("config", "user.email", "t@example.com")
+    git("config", "user.name", "t")
+    (tmp_path / "a.txt").write_text("".join(f"line {n}\n" for n in range(1, 31)))
+    git("add", "a.txt")
+    git("commit", "-qm", "init")
+    lines = (tmp_path / "a.txt").read_text().splitlines()
+    lines[9] = "changed 10"
+    lines.insert(20, "inserted")
+    (tmp_path / "a.txt").write_text("\n".join(lines) + "\n")
+    git("add", "a.txt")
+    assert list(added_lines(stream_staged_diff(cwd=tmp_path))) == [("a.txt", 10, "changed 10"), ("a.txt", 21, "inserted")]
+
+def test_quoted_paths_are_unescaped():
+    assert unquote_path('"b/caf\\303\\251.py"') == "b/café.py"
+    assert unquote_path('"b/tab\\there \\"q\\" back\\\\slash"') == 'b/tab\there "q" back\\slash'
+    assert unquote_path("b/plain.py") == "b/plain.py"
+
+def test_non_ascii_path_from_git(tmp_path):
+    def git(*args):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-q")
+    (tmp_path / "café.py").write_text("x = 1\n")
+    git("add", "café.py")
+    files = {}
+    assert list(added_lines(stream_staged_diff(cwd=tmp_path), files)) == [("café.py", 1, "x = 1")]
+    assert list(files) == ["café.py"]
+
+def test_push_range_only_holds_the_branch_commits(tmp_path):
+    def git(*args):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-q", "-b", "main")
+    git("config", "user.email", "t@example.com")
+    git("config", "user.name", "t")
+    (tmp_path / "a.txt").write_text("base\n")
+    git("add", "a.txt")
+    git("commit", "-qm", "base")
+    git("checkout", "-qb", "feature")
+    (tmp_path / "b.txt").write_text("mine\n")
+    git("add", "b.txt")
+    git("commit", "-qm", "feature")
+    git("checkout", "-q", "main")
+    (tmp_path / "c.txt").write_text("upstream moved on\n")
+    git("add", "c.txt")
+    git("commit", "-qm", "upstream")
+    git("checkout", "-q", "feature")
+    assert list(added_lines(stream_range_diff("main...HEAD", cwd=tmp_path))) == [("b.txt", 1, "mine")]
+    assert [stat.path for stat in numstat("main...HEAD", cwd=tmp_path)] == ["b.txt"]
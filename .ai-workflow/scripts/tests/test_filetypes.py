@@ -0,0 +1,33 @@
+"""File types: only third-party and binary files are skipped; secrets are checked everywhere else."""
+import pytest
+
+from aiwf.filetypes import disabled_rules, skip_reason
+from aiwf.rules import FILE_RULES, RuleEngine
+
+CRITICAL = {rule.id for rule in FILE_RULES if rule.severity == "critical"}
+
+@pytest.mark.parametrize("path, reason", [
+    ("package-lock.json", "lockfile"),
+    ("web/node_modules/left-pad/index.js", "vendored"),
+    ("static/logo.png", "asset"),
+    ("dist/app.js", None),
+    ("build/bundle.min.js", None),
+    ("static/logo.svg", None),
+    ("docs/setup.md", None),
+])
+def test_skip_reason(path, reason):
+    assert skip_reason(path) == reason
+
+@pytest.mark.parametrize("path", [
+    "dist/app.js", "build/bundle.min.js", "src/app.js.map", "static/logo.svg",
+    "src/__snapshots__/app.test.js.snap", "docs/setup.md", "api/db.py", "config/.env",
+])
+def test_critical_rules_run_on_every_kind(path):
+    assert not disabled_rules(path) & CRITICAL
+
+def test_generated_files_only_get_the_critical_rules():
+    engine = RuleEngine(FILE_RULES)
+    text = 'console.log(x); // TODO: drop\nconst apiKey = "abcdef0123456789";\ndebugger;'
+    found = {f.rule.id for f in engine.scan(text, disabled=disabled_rules("dist/app.js"))}
+    assert found == {"secret-api-key"}
+    assert {f.rule.id for f in engine.scan(text, disabled=disabled_rules("src/app.js"))} >= {"console-log", "todo"}
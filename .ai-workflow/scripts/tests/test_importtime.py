@@ -0,0 +1,21 @@
+"""Entry points keep the modules they only need on demand off their startup path."""
+import pytest
+
+from conftest import load_script
+
+check = load_script("importtime-check.py")
+
+@pytest.fixture(scope="module")
+def baseline():
+    return check.loaded_modules(check.BARE)
+
+@pytest.mark.parametrize("script", sorted(check.FORBIDDEN))
+def test_entry_point_loads_nothing_forbidden(script, baseline):
+    modules = check.startup_modules(script, baseline)
+    assert check.forbidden_in(modules, check.FORBIDDEN[script]) == []
+
+def test_a_top_level_import_is_caught(tmp_path, baseline):
+    script = tmp_path / "hook.py"
+    script.write_text("import difflib\nimport json\n\ndef main():\n    import argparse\n")
+    modules = check.startup_modules("hook.py", baseline, path=script)
+    assert check.forbidden_in(modules, check.COMMON_FORBIDDEN) == ["difflib"]
@@ -0,0 +1,67 @@
+"""Incremental rescans give the same hits, at the same lines, as a full scan."""
+import random
+from argparse import Namespace
+
+from aiwf.fileaudit import ENGINE, IncrementalScanner, changed_range
+from aiwf.rules import decode_text
+from conftest import load_script
+
+LINES = [
+    "let a = 1;",
+    "console.log(a);",
+    "// TODO: tidy",
+    'const token = "abcdefghijklmnopqrstuvwxyz";',
+    "debugger;",
+    "",
+    "return a;",
+]
+
+def full(data: bytes) -> list:
+    return ENGINE.raw_hits(decode_text(data))
+
+def encode(lines) -> bytes:
+    return "\n".join(lines).encode()
+
+def test_insert_above_shifts_later_hits():
+    scanner = IncrementalScanner()
+    old = encode(LINES)
+    scanner.remember("a.js", old, full(old))
+    new_lines = ["// header", "// more"] + LINES
+    new = encode(new_lines)
+    hits, stopped_at = scanner.hits("a.js", new)
+    assert stopped_at is None
+    assert hits == full(new)
+    assert [hit[1] for hit in hits] == [4, 5, 6, 7]
+    assert scanner.stats()["lines_reused"] == len(LINES)
+
+def test_random_edits_match_full_scans():
+    rnd = random.Random(5)
+    scanner = IncrementalScanner()
+    lines = [rnd.choice(LINES) for _ in range(60)]
+    data = encode(lines)
+    scanner.remember("a.js", data, full(data))
+    for _ in range(200):
+        start = rnd.randrange(len(lines) + 1)
+        end = min(len(lines), start + rnd.randrange(4))
+        lines[start:end] = [rnd.choice(LINES) for _ in range(rnd.randrange(4))]
+        data = encode(lines)
+        hits, _ = scanner.hits("a.js", data)
+        assert hits == full(data)
+        scanner.remember("a.js", data, hits)
+
+def test_changed_range():
+    assert changed_range(["a", "b", "c"], ["a", "x", "y", "c"]) == (1, 2, 3)
+    assert changed_range(["a", "b"], ["a", "b"]) == (2, 2, 2)
+    assert changed_range(["a", "a"], ["a", "a", "a"]) == (2, 2, 3)
+
+def test_batches_process_rescans_incrementally(tmp_path):
+    audit_file = load_script("audit-file.py")
+    args = Namespace(server=False, format="ndjson", report=str(tmp_path / "report.ndjson"), jobs=None)
+    path = tmp_path / "app.js"
+    path.write_text("\n".join(LINES * 50))
+    scanner = IncrementalScanner()
+    assert audit_file.audit_batch([str(path)], args, scanner) == "fail"
+    path.write_text("\n".join(["// header"] + LINES * 50))
+    audit_file.audit_batch([str(path)], args, scanner)
+    assert scanner.stats()["lines_scanned"] == len(LINES) * 50 + 1
+    assert scanner.stats()["lines_reused"] == len(LINES) * 50
@@ -0,0 +1,69 @@
+"""Prompt index: appended history is indexed once, and file mentions meet across tree changes."""
+import subprocess
+
+from aiwf.promptindex import Prompt, PromptIndex, extract_files, parse_history
+from aiwf.repopaths import PathResolver
+
+def entry(when: str, text: str) -> str:
+    return f"\n---\n## {when}\n\n```\n{text}\n```\n"
+
+FIRST = entry("2026-01-02 10:00:00", "Task: add login form")
+SECOND = entry("2026-01-02 11:00:00", "Task: fix the payments page")
+
+def test_half_written_header_is_parsed_again():
+    data = (FIRST + "\n---\n## 20").encode()
+    prompts, offset = parse_history(data)
+    assert [p.title for p in prompts] == ["add login form"]
+    assert data[offset:] == b"---\n## 20"
+
+def test_entry_written_in_two_parts_is_indexed(tmp_path):
+    history = tmp_path / "PROMPT_HISTORY.md"
+    index = PromptIndex(tmp_path / "index.db")
+    for cut in (len("\n---\n## 20"), len("\n---\n"), len("\n--"), SECOND.index("```\n") + 4):
+        history.write_text(FIRST + SECOND[:cut])
+        index.update(history)
+        with history.open("a") as f:
+            f.write(SECOND[cut:])
+        index.update(history)
+        assert [p["title"] for p in index.recent()] == ["add login form", "fix the payments page"]
+        history.unlink()
+    index.close()
+
+def git_repo(path, files):
+    subprocess.run(["git", "init", "-q"], cwd=path, check=True)
+    for name in files:
+        add_file(path, name)
+
+def add_file(repo, name):
+    (repo / name).parent.mkdir(parents=True, exist_ok=True)
+    (repo / name).write_text("")
+    subprocess.run(["git", "add", name], cwd=repo, check=True)
+
+def prompt(text: str) -> Prompt:
+    return Prompt(0, "2026-01-02 10:00:00", text, text, extract_files(text), None)
+
+def conflict_paths(index, text, repo):
+    mentions = extract_files(text)
+    keys = PathResolver(mentions, cwd=repo).keys_all(mentions)
+    return [c.path for c in index.conflicts(keys, tracker={})]
+
+def test_mention_of_a_file_created_later_still_conflicts(tmp_path):
+    git_repo(tmp_path, [])
+    index = PromptIndex(tmp_path / "index.db", untracked_window=None)
+    old = prompt("Task: tidy utils.py")
+    index.add([old], PathResolver(old.files, cwd=tmp_path))
+    add_file(tmp_path, "src/utils.py")
+    assert conflict_paths(index, "Task: speed up utils.py", tmp_path) == ["utils.py"]
+    assert conflict_paths(index, "Task: speed up src/utils.py", tmp_path) == []
+    index.close()
+
+def test_name_that_became_ambiguous_still_conflicts(tmp_path):
+    git_repo(tmp_path, ["src/utils.py"])
+    index = PromptIndex(tmp_path / "index.db", untracked_window=None)
+    old = prompt("Task: tidy utils.py")
+    index.add([old], PathResolver(old.files, cwd=tmp_path))
+    add_file(tmp_path, "lib/utils.py")
+    assert conflict_paths(index, "Task: speed up utils.py", tmp_path) == ["utils.py"]
+    assert conflict_paths(index, "Task: speed up src/utils.py", tmp_path) == ["src/utils.py"]
+    assert conflict_paths(index, "Task: speed up lib/utils.py", tmp_path) == []
+    index.close()
@@ -0,0 +1,51 @@
+"""Prompt tracker: the id index follows the append-only log, and the lock serializes writers."""
+import subprocess
+import sys
+
+from aiwf.tracker import PromptTracker, read_tracker
+from conftest import SCRIPT_DIR
+
+def test_latest_line_per_id_wins(tmp_path):
+    path = tmp_path / "PROMPT_TRACKER.log"
+    tracker = PromptTracker(path)
+    first, second = tracker.add("Add login"), tracker.add("Fix payments")
+    assert tracker.set_status(first, "SENT")
+    assert not tracker.set_status("0000:0000:z", "DONE")
+    assert tracker.latest().id == first
+    assert tracker.complete_latest() == first
+    assert tracker.statuses() == {first: ("DONE", "Add login"), second: ("CRAFTED", "Fix payments")}
+    assert len(path.read_text().splitlines()) == 4
+    tracker.close()
+
+def test_lines_from_other_writers_and_rewrites_are_picked_up(tmp_path):
+    path = tmp_path / "PROMPT_TRACKER.log"
+    tracker = PromptTracker(path)
+    prompt_id = tracker.add("Add login")
+    with path.open("a") as f:
+        f.write(f"{prompt_id}|FAILED|2026-01-02T10:00:00|Add login\n1200:0102:b|SENT|2026-01-02T10:01:00|Half")
+    assert read_tracker(path) == {prompt_id: ("FAILED", "Add login")}
+    with path.open("a") as f:
+        f.write(" written\n")
+    assert tracker.statuses()["1200:0102:b"] == ("SENT", "Half written")
+    path.write_text("0900:0102:a|DONE|2026-01-02T09:00:00|Rewritten\n")
+    assert tracker.statuses() == {"0900:0102:a": ("DONE", "Rewritten")}
+    tracker.close()
+
+def test_concurrent_writers_get_distinct_ids(tmp_path):
+    path = tmp_path / "PROMPT_TRACKER.log"
+    code = (
+        "import pathlib, sys\n"
+        "from aiwf.tracker import PromptTracker\n"
+        "tracker = PromptTracker(pathlib.Path(sys.argv[1]))\n"
+        "for n in range(8):\n"
+        "    prompt_id = tracker.add(f'prompt {n}')\n"
+        "    tracker.set_status(prompt_id, 'SENT')\n"
+    )
+    procs = [subprocess.Popen([sys.executable, "-c", code, str(path)], cwd=SCRIPT_DIR) for _ in range(4)]
+    assert all(proc.wait(timeout=60) == 0 for proc in procs)
+    lines = path.read_text().splitlines()
+    assert len(lines) == 64
+    statuses = read_tracker(path)
+    assert len(statuses) == 32
+    assert {status for status, _ in statuses.values()} == {"SENT"}
+    assert (tmp_path / ".prompt-counter").read_text().strip() == "32"